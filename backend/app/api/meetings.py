@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlmodel import Session, select
 from typing import List
 import uuid
@@ -128,6 +128,7 @@ async def get_meeting(
 @router.put("/meetings/{meeting_id}/end")
 async def end_meeting(
     meeting_id: str,
+    request: Request,
     session: Session = Depends(get_session)
 ):
     """End a meeting and finalize transcript."""
@@ -144,6 +145,11 @@ async def end_meeting(
         
         session.commit()
         
+        # Stops live insights and writes the final summary in the background
+        on_meeting_end = getattr(request.app.state, "on_meeting_end", None)
+        if on_meeting_end:
+            await on_meeting_end(meeting_id)
+        
         return {"message": "Meeting ended successfully"}
         
     except HTTPException:
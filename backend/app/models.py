@@ -39,6 +39,20 @@ class Transcript(SQLModel, table=True):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     confidence: Optional[float] = None
 
+class TranscriptionJob(SQLModel, table=True):
+    id: Optional[str] = Field(default=None, primary_key=True)
+    meeting_id: str = Field(index=True)
+    status: str = Field(default="queued", index=True)  # "queued", "running", "completed", "failed"
+    progress: float = 0.0
+    file_path: str
+    filename: Optional[str] = None
+    result_path: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+
 class CalendarEvent(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     meeting_id: str = Field(foreign_key="meeting.id")
@@ -84,6 +98,18 @@ class SentimentResponse(BaseModel):
     score: float
     timestamp: datetime
 
+class TranscriptionJobResponse(BaseModel):
+    id: str
+    meeting_id: str
+    status: str
+    progress: float
+    filename: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime] = None
+
 class CalendarEventCreate(BaseModel):
     title: str
     description: Optional[str] = None
@@ -0,0 +1,74 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SUMMARIZATION_MODEL = "facebook/bart-large-cnn"
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+AI_RUNTIMES = ("torch", "onnx")
+
+
+def onnx_model_path(onnx_dir: str, model_name: str) -> str:
+    """Directory holding the exported (int8) ONNX copy of a Hub model."""
+    return os.path.join(onnx_dir, model_name.replace("/", "--"))
+
+
+def default_device() -> int:
+    """Pipeline device index: the first GPU if torch sees one, else CPU (-1)."""
+    try:
+        import torch
+    except ImportError:
+        return -1
+    return 0 if torch.cuda.is_available() else -1
+
+
+def load_pipeline(task: str, model_name: str, runtime: str = "torch", onnx_dir: str = "data/onnx", device: int = -1) -> Any:
+    """Build a transformers pipeline on the torch or ONNX Runtime backend.
+
+    The ONNX runtime loads the model written by ``scripts/export_onnx.py``;
+    both return a pipeline with the same call signature and output.
+    """
+    from transformers import pipeline
+
+    if runtime == "torch":
+        return pipeline(task, model=model_name, device=device)
+
+    if runtime != "onnx":
+        raise ValueError(f"Unknown AI runtime '{runtime}'. Choose one of: {', '.join(AI_RUNTIMES)}")
+
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+
+    path = onnx_model_path(onnx_dir, model_name)
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"No ONNX export for {model_name} at {path}; run scripts/export_onnx.py")
+
+    model_class = ORTModelForSeq2SeqLM if task == "summarization" else ORTModelForSequenceClassification
+    logger.info(f"Loading ONNX Runtime model from {path}")
+    model = model_class.from_pretrained(path)
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    return pipeline(task, model=model, tokenizer=tokenizer)
+
+
+@lru_cache(maxsize=None)
+def load_tokenizer(model_name: str, runtime: str = "torch", onnx_dir: str = "data/onnx") -> Any:
+    """The model's tokenizer alone, for counting tokens; loaded once per process.
+
+    Uses the ONNX export's copy when the runtime is onnx and the export
+    exists, so no Hub access is needed.
+    """
+    from transformers import AutoTokenizer
+
+    path = onnx_model_path(onnx_dir, model_name)
+    return AutoTokenizer.from_pretrained(path if runtime == "onnx" and os.path.isdir(path) else model_name)
+
+
+def load_embeddings(model_name: str = EMBEDDING_MODEL) -> Any:
+    """Sentence-transformers embeddings for the RAG knowledge base."""
+    from langchain.embeddings import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(model_name=model_name)
@@ -1,68 +1,106 @@
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-from sentence_transformers import SentenceTransformer
-import torch
-import numpy as np
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.vectorstores import FAISS
-from langchain.docstore.document import Document
+from typing import Callable, Dict, Any, Iterable, List, Optional
 import json
 import os
 
+# torch, transformers and langchain are imported on first use so the API
+# can start serving before any of them is loaded
+from app.services.ai_runtime import EMBEDDING_MODEL, SENTIMENT_MODEL, SUMMARIZATION_MODEL, default_device, load_embeddings, load_pipeline
+from app.services.audio_io import parse_size
+from app.services.batching import MicroBatcher
+from app.services.cache import DiskLRUCache, ResultCache, content_key
+from app.services.executors import get_executor
+from app.services.model_registry import ModelRegistry
+from app.services.model_server import ModelClient, RemotePipeline
+from app.services.rolling_summary import RollingSummary
+from app.services.summarization import MapReduceSummarizer
+
 logger = logging.getLogger(__name__)
 
 class AIService:
     """Service for AI-powered meeting insights including summarization, sentiment analysis, and RAG."""
     
-    def __init__(self):
-        self.summarizer = None
-        self.sentiment_analyzer = None
+    def __init__(self, models: Optional[ModelRegistry] = None):
+        # Models are loaded on first use and may be unloaded when idle
+        self.models = models or ModelRegistry()
+        self.lazy_loading = os.getenv("MODEL_LAZY_LOADING", "true").lower() == "true"
+        self.initialized = False
         self.embeddings = None
         self.vectorstore = None
-        self.device = 0 if torch.cuda.is_available() else -1
+        # Bumped on every knowledge base change so cached RAG results expire
+        self.kb_version = 0
         self.knowledge_base_path = "data/knowledge_base"
+        # Append-only segments on disk, folded into the base index every N adds
+        self.knowledge_store = None
+        self.kb_compact_segments = int(os.getenv("KB_COMPACT_SEGMENTS", "16"))
+        self._compaction_task: Optional[asyncio.Task] = None
+        # Bulk ingestion: chunks embedded and committed per batch, splitter processes
+        self.kb_ingest_batch_size = int(os.getenv("KB_INGEST_BATCH_SIZE", "256"))
+        self.kb_ingest_workers = int(os.getenv("KB_INGEST_WORKERS", "2"))
+        # torch (fp32 pipelines) or onnx (int8 exports from scripts/export_onnx.py)
+        self.runtime = os.getenv("AI_RUNTIME", "torch")
+        self.onnx_dir = os.getenv("ONNX_MODEL_DIR", "data/onnx")
+        # Models hosted once by the shared model server instead of in this process
+        self.model_server_socket = os.getenv("MODEL_SERVER_SOCKET")
+        # Incremental per-meeting summaries: meeting_id -> RollingSummary
+        self.rolling_summaries: Dict[str, RollingSummary] = {}
+        self.summary_window_words = int(os.getenv("SUMMARY_WINDOW_WORDS", "400"))
+        self.summary_fan_in = int(os.getenv("SUMMARY_FAN_IN", "4"))
+        # Long texts are summarized in token windows, in parallel when workers > 0
+        self.summary_window_tokens = int(os.getenv("SUMMARY_WINDOW_TOKENS", "1000"))
+        self.summary_workers = 0 if self.model_server_socket else int(os.getenv("SUMMARY_WORKERS", "0"))
+        self.map_reduce = MapReduceSummarizer(
+            lambda: self.models.use("summarizer"),
+            runtime=self.runtime,
+            onnx_dir=self.onnx_dir,
+            workers=self.summary_workers,
+            window_tokens=self.summary_window_tokens,
+            use_pool=lambda: self.models.use_async("summarizer-pool", "nlp")
+        )
+        # Memoized summaries, sentiment and RAG results, optionally backed by disk
+        cache_dir = os.getenv("AI_CACHE_DIR", "")
+        self.result_cache = ResultCache(
+            max_entries=int(os.getenv("AI_CACHE_ENTRIES", "1024")),
+            disk=DiskLRUCache(cache_dir, parse_size(os.getenv("AI_CACHE_DISK_SIZE", "100MB"))) if cache_dir else None
+        )
+        # Memoized embeddings of RAG queries and knowledge base chunks, sharing the disk location
+        self.embedding_cache_entries = int(os.getenv("EMBEDDING_CACHE_ENTRIES", "4096"))
+        self.embedding_cache_disk = DiskLRUCache(
+            os.path.join(cache_dir, "embeddings"),
+            parse_size(os.getenv("EMBEDDING_CACHE_DISK_SIZE", "200MB"))
+        ) if cache_dir else None
+        # Sentiment requests from all meetings run as one padded batch per tick
+        self.sentiment_batcher = MicroBatcher(
+            "sentiment",
+            self._analyze_sentiment_batch,
+            max_batch_size=int(os.getenv("SENTIMENT_BATCH_SIZE", "32")),
+            max_wait_ms=float(os.getenv("SENTIMENT_BATCH_MAX_WAIT_MS", "20")),
+            executor=get_executor("nlp")
+        )
         
     async def initialize(self):
-        """Initialize AI models."""
+        """Register AI models and open the knowledge base.
+        
+        Models load on first use unless MODEL_LAZY_LOADING is false.
+        """
         try:
             logger.info("Initializing AI models...")
             
-            # Initialize models in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            
-            # Load summarization model (BART)
-            logger.info("Loading BART for summarization...")
-            self.summarizer = await loop.run_in_executor(
-                None,
-                lambda: pipeline(
-                    "summarization",
-                    model="facebook/bart-large-cnn",
-                    device=self.device
-                )
-            )
-            
-            # Load sentiment analysis model (DistilBERT)
-            logger.info("Loading DistilBERT for sentiment analysis...")
-            self.sentiment_analyzer = await loop.run_in_executor(
-                None,
-                lambda: pipeline(
-                    "sentiment-analysis",
-                    model="distilbert-base-uncased-finetuned-sst-2-english",
-                    device=self.device
-                )
-            )
+            if self.model_server_socket:
+                self._register_remote_models()
+            else:
+                self._register_local_models()
+            self.initialized = True
             
-            # Load embeddings for RAG
-            logger.info("Loading embeddings for RAG...")
-            self.embeddings = await loop.run_in_executor(
-                None,
-                lambda: HuggingFaceEmbeddings(
-                    model_name="sentence-transformers/all-MiniLM-L6-v2"
-                )
-            )
+            if not self.lazy_loading:
+                # Load the models concurrently in executor to avoid blocking
+                loop = asyncio.get_event_loop()
+                logger.info(f"Loading AI models ({self.runtime})...")
+                await asyncio.gather(*[
+                    loop.run_in_executor(get_executor(lane), self.models.load, name)
+                    for name, lane in (("summarizer", "nlp"), ("sentiment", "nlp"), ("embeddings", "vector"))
+                ])
             
             # Initialize or load knowledge base
             await self._initialize_knowledge_base()
@@ -73,57 +111,167 @@ class AIService:
             logger.error(f"Error initializing AI models: {e}")
             raise
     
+    def _register_local_models(self):
+        # Summarization (BART), sentiment (DistilBERT) and embeddings for RAG
+        self.models.register("summarizer", lambda: load_pipeline(
+            "summarization",
+            SUMMARIZATION_MODEL,
+            runtime=self.runtime,
+            onnx_dir=self.onnx_dir,
+            device=default_device()
+        ))
+        self.models.register("sentiment", lambda: load_pipeline(
+            "sentiment-analysis",
+            SENTIMENT_MODEL,
+            runtime=self.runtime,
+            onnx_dir=self.onnx_dir,
+            device=default_device()
+        ))
+        self.models.register("embeddings", load_embeddings)
+        if self.summary_workers > 0:
+            # Each pool worker holds a BART copy, charged to the memory budget
+            self.models.register(
+                "summarizer-pool",
+                self.map_reduce.start,
+                lambda map_reduce: map_reduce.shutdown(),
+                measure=lambda map_reduce: map_reduce.resident_bytes
+            )
+    
+    def _register_remote_models(self):
+        logger.info(f"Using models from model server at {self.model_server_socket}")
+        client = ModelClient(self.model_server_socket)
+        self.models.register("summarizer", lambda: RemotePipeline(client, "summarizer", tokenizer_model=SUMMARIZATION_MODEL))
+        self.models.register("sentiment", lambda: RemotePipeline(client, "sentiment"))
+        
+        def remote_embeddings():
+            from app.services.embeddings import RemoteEmbeddings
+            return RemoteEmbeddings(client)
+        
+        self.models.register("embeddings", remote_embeddings)
+    
+    async def shutdown(self):
+        """Stop background batching and knowledge base compaction."""
+        await self.sentiment_batcher.stop()
+        if self._compaction_task:
+            # Let a running compaction finish its manifest swap
+            await asyncio.gather(self._compaction_task, return_exceptions=True)
+        if self.map_reduce:
+            self.map_reduce.shutdown()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get caching and batching metrics for the AI models."""
+        return {
+            "runtime": self.runtime,
+            "result_cache": self.result_cache.get_stats(),
+            "sentiment_batching": self.sentiment_batcher.get_stats(),
+            "knowledge_base": self.knowledge_store.get_stats() if self.knowledge_store else None,
+            "embedding_cache": self.embeddings.get_stats() if self.embeddings else None
+        }
+    
     def is_ready(self) -> bool:
-        """Check if all AI services are ready."""
-        return all([
-            self.summarizer is not None,
-            self.sentiment_analyzer is not None,
-            self.embeddings is not None
-        ])
+        """Check if the AI services can accept work (models may still be unloaded)."""
+        return self.initialized
+    
+    def get_model_stats(self) -> Dict[str, Any]:
+        """Load state and resident size of each AI model."""
+        return self.models.get_stats(["summarizer", "sentiment", "embeddings", "summarizer-pool"])
+    
+    def _cache_key(self, operation: str, model: str, params: Dict[str, Any], text: str) -> str:
+        return content_key(operation, f"{model}:{self.runtime}", params, text)
     
     async def generate_summary(self, text: str, max_length: int = 150, min_length: int = 30) -> Dict[str, Any]:
-        """Generate a summary of the meeting transcript."""
-        if not self.summarizer:
+        """Generate a summary of the meeting transcript, however long."""
+        if not self.is_ready():
             raise RuntimeError("Summarizer not initialized")
         
         try:
-            # Truncate text if too long for the model
-            max_input_length = 1024
-            if len(text.split()) > max_input_length:
-                words = text.split()
-                text = " ".join(words[:max_input_length])
+            key = self._cache_key("summary", SUMMARIZATION_MODEL, {"max_length": max_length, "min_length": min_length}, text)
+            return await self.result_cache.get_or_compute(
+                key,
+                lambda: self._generate_summary(text, max_length, min_length)
+            )
             
-            # Run summarization in executor
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.summarizer(
-                    text,
-                    max_length=max_length,
-                    min_length=min_length,
-                    do_sample=False
-                )
+        except Exception as e:
+            logger.error(f"Error generating summary: {e}")
+            raise
+    
+    async def _generate_summary(self, text: str, max_length: int, min_length: int) -> Dict[str, Any]:
+        # Map-reduce over token windows so the whole text is covered
+        summary_text = await self.map_reduce.summarize(text, max_length, min_length)
+        
+        # Extract action items using simple heuristics
+        action_items = self._extract_action_items(text)
+        
+        return {
+            "summary": summary_text,
+            "action_items": action_items,
+            "word_count": len(text.split()),
+            "summary_ratio": len(summary_text.split()) / len(text.split())
+        }
+    
+    async def update_meeting_summary(self, meeting_id: str, text: str, min_words: int = 50) -> Optional[Dict[str, Any]]:
+        """Fold new transcript text into the meeting's rolling summary.
+        
+        Only windows completed by ``text`` and their branch are summarized,
+        so the cost per chunk stays flat as the meeting grows. Returns the
+        same shape as ``generate_summary``, or None below ``min_words``.
+        """
+        if not self.is_ready():
+            raise RuntimeError("Summarizer not initialized")
+        
+        rolling = self.rolling_summaries.get(meeting_id)
+        if rolling is None:
+            rolling = RollingSummary(
+                self._summarize_text,
+                window_words=self.summary_window_words,
+                fan_in=self.summary_fan_in
             )
+            self.rolling_summaries[meeting_id] = rolling
+        
+        try:
+            await rolling.add_text(text)
+            rolling.add_action_items(self._extract_action_items(text))
             
-            summary_text = result[0]["summary_text"]
+            if rolling.word_count <= min_words:
+                return None
             
-            # Extract action items using simple heuristics
-            action_items = self._extract_action_items(text)
+            summary_text = await rolling.get_summary()
             
             return {
                 "summary": summary_text,
-                "action_items": action_items,
-                "word_count": len(text.split()),
-                "summary_ratio": len(summary_text.split()) / len(text.split())
+                "action_items": list(rolling.action_items),
+                "word_count": rolling.word_count,
+                "summary_ratio": len(summary_text.split()) / rolling.word_count
             }
             
         except Exception as e:
-            logger.error(f"Error generating summary: {e}")
+            logger.error(f"Error updating rolling summary for meeting {meeting_id}: {e}")
             raise
     
+    def discard_meeting_summary(self, meeting_id: str):
+        """Drop the rolling summary state of a finished or abandoned meeting."""
+        self.rolling_summaries.pop(meeting_id, None)
+    
+    async def _summarize_text(self, text: str, max_length: int, min_length: int) -> str:
+        """Run the summarization model on text that fits its input window."""
+        # Run summarization in executor
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(get_executor("nlp"), lambda: self._run_summarizer(text, max_length, min_length))
+    
+    def _run_summarizer(self, text: str, max_length: int, min_length: int) -> str:
+        with self.models.use("summarizer") as summarizer:
+            result = summarizer(
+                text,
+                max_length=max_length,
+                min_length=min_length,
+                do_sample=False,
+                truncation=True
+            )
+        return result[0]["summary_text"]
+    
     async def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment of the text."""
-        if not self.sentiment_analyzer:
+        if not self.is_ready():
             raise RuntimeError("Sentiment analyzer not initialized")
         
         try:
@@ -131,38 +279,70 @@ class AIService:
             if len(text) > 512:
                 text = text[:512]
             
-            # Run sentiment analysis in executor
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.sentiment_analyzer(text)
-            )
-            
-            return {
-                "label": result[0]["label"],
-                "score": result[0]["score"],
-                "confidence": "high" if result[0]["score"] > 0.8 else "medium" if result[0]["score"] > 0.6 else "low"
-            }
+            key = self._cache_key("sentiment", SENTIMENT_MODEL, {}, text)
+            return await self.result_cache.get_or_compute(key, lambda: self._analyze_sentiment(text))
             
         except Exception as e:
             logger.error(f"Error analyzing sentiment: {e}")
             return {"label": "NEUTRAL", "score": 0.5, "confidence": "low"}
     
-    async def get_rag_insights(self, transcript: str, k: int = 3) -> Optional[Dict[str, Any]]:
-        """Get RAG-enhanced insights by retrieving relevant context."""
+    async def _analyze_sentiment(self, text: str) -> Dict[str, Any]:
+        # Batched with concurrent requests and run in executor
+        result = await self.sentiment_batcher.submit(text)
+        
+        return {
+            "label": result["label"],
+            "score": result["score"],
+            "confidence": "high" if result["score"] > 0.8 else "medium" if result["score"] > 0.6 else "low"
+        }
+    
+    def _analyze_sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Classify a list of texts in one padded forward pass."""
+        with self.models.use("sentiment") as sentiment_analyzer:
+            return sentiment_analyzer(texts, batch_size=len(texts), truncation=True)
+    
+    async def get_rag_insights(self, transcript: str, k: int = 3, meeting_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get RAG-enhanced insights by retrieving relevant context.
+        
+        For a live meeting (``meeting_id``) only its rolling summary and
+        latest window of words are used, in one summarizer pass, so each
+        run costs the same however long the meeting is. Otherwise the whole
+        transcript is map-reduced.
+        """
         if not self.vectorstore:
             logger.warning("Vector store not available for RAG")
             return None
         
+        live = meeting_id is not None
+        if live:
+            transcript = await self._live_context(meeting_id, transcript)
+        
+        key = self._cache_key("rag", SUMMARIZATION_MODEL, {"k": k, "kb_version": self.kb_version, "live": live}, transcript)
+        return await self.result_cache.get_or_compute(key, lambda: self._get_rag_insights(transcript, k, live))
+    
+    async def _live_context(self, meeting_id: str, transcript: str) -> str:
+        """The meeting's rolling summary followed by its most recent window of words."""
+        # rsplit stops after the last window, so long transcripts are not re-split
+        words = transcript.rsplit(None, self.summary_window_words)
+        recent = " ".join(words[-self.summary_window_words:])
+        
+        rolling = self.rolling_summaries.get(meeting_id)
+        if rolling is None or rolling.word_count <= self.summary_window_words:
+            return recent
+        # Already reduced by update_meeting_summary for this run
+        return f"{await rolling.get_summary()} {recent}"
+    
+    async def _get_rag_insights(self, transcript: str, k: int, live: bool = False) -> Optional[Dict[str, Any]]:
         try:
             # Generate query for relevant context
             query = await self._generate_context_query(transcript)
             
-            # Retrieve relevant documents
+            # Retrieve relevant documents (the knowledge store guards against concurrent adds)
             loop = asyncio.get_event_loop()
+            store = self.knowledge_store or self.vectorstore
             relevant_docs = await loop.run_in_executor(
-                None,
-                lambda: self.vectorstore.similarity_search(query, k=k)
+                get_executor("vector"),
+                lambda: store.similarity_search(query, k=k)
             )
             
             if not relevant_docs:
@@ -172,7 +352,7 @@ class AIService:
             context = "\n".join([doc.page_content for doc in relevant_docs])
             
             # Generate enhanced summary with context
-            enhanced_summary = await self._generate_contextual_summary(transcript, context)
+            enhanced_summary = await self._generate_contextual_summary(transcript, context, live)
             
             return {
                 "enhanced_summary": enhanced_summary,
@@ -190,32 +370,62 @@ class AIService:
             if not self.vectorstore:
                 await self._initialize_knowledge_base()
             
-            # Split content into chunks
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=200
-            )
+            from langchain.docstore.document import Document
+            from app.services.kb_ingest import split_document
             
-            docs = text_splitter.create_documents(
-                [content],
-                metadatas=[metadata or {}]
-            )
+            # Split content into chunks, hashed so bulk ingestion skips them
+            docs = [
+                Document(page_content=text, metadata=chunk_metadata)
+                for text, chunk_metadata in split_document(content, metadata)
+            ]
             
-            # Add to vector store
+            # Append to vector store as a new segment (in memory only for the fallback store)
             loop = asyncio.get_event_loop()
+            store = self.knowledge_store or self.vectorstore
             await loop.run_in_executor(
-                None,
-                lambda: self.vectorstore.add_documents(docs)
+                get_executor("vector"),
+                lambda: store.add_documents(docs)
             )
             
-            # Save updated knowledge base
-            await self._save_knowledge_base()
+            self.kb_version += 1
+            self._schedule_compaction()
             
             logger.info(f"Added {len(docs)} documents to knowledge base")
             
         except Exception as e:
             logger.error(f"Error adding to knowledge base: {e}")
     
+    async def ingest_knowledge(
+        self,
+        records: Iterable[Dict[str, Any]],
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Bulk-add records from ``kb_ingest`` (directory or NDJSON) to the knowledge base.
+        
+        Returns the ingestion report (chunks added, duplicates, chunks/s).
+        """
+        if not self.vectorstore:
+            await self._initialize_knowledge_base()
+        if not self.knowledge_store:
+            raise RuntimeError("Knowledge base is not available")
+        
+        from app.services.kb_ingest import KnowledgeIngestor
+        
+        ingestor = KnowledgeIngestor(
+            self.knowledge_store,
+            batch_size=self.kb_ingest_batch_size,
+            workers=self.kb_ingest_workers,
+            progress=progress
+        )
+        loop = asyncio.get_event_loop()
+        try:
+            # Its own lane, so RAG searches on the vector pool do not queue behind it
+            return await loop.run_in_executor(get_executor("ingest"), ingestor.ingest, records)
+        finally:
+            # Batches committed before a failure are in the knowledge base too
+            self.kb_version += 1
+            self._schedule_compaction()
+    
     def _extract_action_items(self, text: str) -> List[str]:
         """Extract action items from text using simple heuristics."""
         action_indicators = [
@@ -257,76 +467,88 @@ class AIService:
         
         return query
     
-    async def _generate_contextual_summary(self, transcript: str, context: str) -> str:
-        """Generate an enhanced summary using retrieved context."""
+    async def _generate_contextual_summary(self, transcript: str, context: str, live: bool = False) -> str:
+        """Generate an enhanced summary using retrieved context.
+        
+        Live context is bounded, so it takes a single summarizer pass
+        instead of map-reduce.
+        """
         try:
             # Combine transcript and context
             combined_text = f"Context: {context}\n\nCurrent Meeting: {transcript}"
             
             # Generate summary
+            if live:
+                return await self._summarize_text(combined_text, 200, 30)
             summary_result = await self.generate_summary(combined_text, max_length=200)
             return summary_result["summary"]
             
         except Exception as e:
             logger.error(f"Error generating contextual summary: {e}")
             # Fallback to regular summary
+            if live:
+                return await self._summarize_text(transcript, 150, 30)
             summary_result = await self.generate_summary(transcript)
             return summary_result["summary"]
     
     async def _initialize_knowledge_base(self):
         """Initialize or load existing knowledge base."""
         try:
-            os.makedirs(self.knowledge_base_path, exist_ok=True)
-            
-            # Try to load existing knowledge base
-            kb_file = os.path.join(self.knowledge_base_path, "vectorstore")
-            
-            if os.path.exists(kb_file):
-                logger.info("Loading existing knowledge base...")
-                loop = asyncio.get_event_loop()
-                self.vectorstore = await loop.run_in_executor(
-                    None,
-                    lambda: FAISS.load_local(kb_file, self.embeddings)
-                )
-            else:
-                logger.info("Creating new knowledge base...")
-                # Create with initial dummy document
-                initial_docs = [
-                    Document(
-                        page_content="Meeting assistant knowledge base initialized.",
-                        metadata={"source": "system", "type": "init"}
-                    )
-                ]
-                
-                loop = asyncio.get_event_loop()
-                self.vectorstore = await loop.run_in_executor(
-                    None,
-                    lambda: FAISS.from_documents(initial_docs, self.embeddings)
-                )
-                
-                await self._save_knowledge_base()
+            # langchain and FAISS are imported in executor too
+            loop = asyncio.get_event_loop()
+            self.vectorstore = await loop.run_in_executor(
+                get_executor("vector"),
+                self._open_knowledge_store
+            )
+            self._schedule_compaction()
             
         except Exception as e:
             logger.error(f"Error initializing knowledge base: {e}")
             # Create minimal in-memory vectorstore as fallback
-            initial_docs = [
-                Document(
-                    page_content="Fallback knowledge base.",
-                    metadata={"source": "fallback"}
-                )
-            ]
-            self.vectorstore = FAISS.from_documents(initial_docs, self.embeddings)
+            self.knowledge_store = None
+            self.vectorstore = self._create_vectorstore("Fallback knowledge base.", {"source": "fallback"})
+    
+    def _get_embeddings(self):
+        """Cached, registry-backed embeddings for the vector store, created on first use."""
+        if self.embeddings is None:
+            from app.services.embeddings import CachedEmbeddings, RegistryEmbeddings
+            self.embeddings = CachedEmbeddings(
+                RegistryEmbeddings(self.models),
+                EMBEDDING_MODEL,
+                max_entries=self.embedding_cache_entries,
+                disk=self.embedding_cache_disk
+            )
+        return self.embeddings
+    
+    def _open_knowledge_store(self):
+        from app.services.knowledge_store import KnowledgeStore
+        from app.services.vector_index import IndexSettings
+        self.knowledge_store = KnowledgeStore(
+            self.knowledge_base_path,
+            self._get_embeddings(),
+            compact_segments=self.kb_compact_segments,
+            settings=IndexSettings.from_env()
+        )
+        return self.knowledge_store.open(
+            "Meeting assistant knowledge base initialized.",
+            {"source": "system", "type": "init"}
+        )
     
-    async def _save_knowledge_base(self):
-        """Save knowledge base to disk."""
+    def _create_vectorstore(self, content: str, metadata: Dict[str, Any]):
+        from langchain.docstore.document import Document
+        from langchain.vectorstores import FAISS
+        return FAISS.from_documents([Document(page_content=content, metadata=metadata)], self._get_embeddings())
+    
+    def _schedule_compaction(self):
+        """Start a background compaction once enough segments have piled up."""
+        if not self.knowledge_store or not self.knowledge_store.needs_compaction():
+            return
+        if self._compaction_task is None or self._compaction_task.done():
+            self._compaction_task = asyncio.create_task(self._compact_knowledge_base())
+    
+    async def _compact_knowledge_base(self):
         try:
-            if self.vectorstore:
-                kb_file = os.path.join(self.knowledge_base_path, "vectorstore")
-                loop = asyncio.get_event_loop()
-                await loop.run_in_executor(
-                    None,
-                    lambda: self.vectorstore.save_local(kb_file)
-                )
-                logger.info("Knowledge base saved")
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(get_executor("io"), self.knowledge_store.compact)
         except Exception as e:
-            logger.error(f"Error saving knowledge base: {e}")
+            logger.error(f"Error compacting knowledge base: {e}")
@@ -0,0 +1,327 @@
+import logging
+import numpy as np
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+OGG_MAGIC = b"OggS"
+
+# Matroska master elements whose children we need; their headers are consumed
+# and parsing continues inside them. Everything else is skipped by size.
+_MASTER_IDS = {
+    0x18538067,  # Segment
+    0x1654AE6B,  # Tracks
+    0xAE,        # TrackEntry
+    0xE1,        # Audio
+    0x1F43B675,  # Cluster
+    0xA0,        # BlockGroup
+}
+_SIMPLE_BLOCK = 0xA3
+_BLOCK = 0xA1
+_TRACK_NUMBER = 0xD7
+_CODEC_ID = 0x86
+_CODEC_PRIVATE = 0x63A2
+_CHANNELS = 0x9F
+_LEAF_IDS = {_SIMPLE_BLOCK, _BLOCK, _TRACK_NUMBER, _CODEC_ID, _CODEC_PRIVATE, _CHANNELS}
+
+
+def _read_vint(data, pos: int, keep_marker: bool = False) -> Optional[Tuple[int, int, bool]]:
+    """Read an EBML variable-length integer.
+
+    Returns (value, length, is_all_ones) or None if ``data`` ends first.
+    """
+    if pos >= len(data):
+        return None
+    first = data[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ValueError("Invalid EBML variable-length integer")
+    if pos + length > len(data):
+        return None
+
+    value = first if keep_marker else first & (mask - 1)
+    all_ones = (first & (mask - 1)) == mask - 1
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+        all_ones = all_ones and byte == 0xFF
+    return value, length, all_ones
+
+
+class WebMDemuxer:
+    """Incremental Matroska/WebM demuxer that yields codec packets.
+
+    Bytes are fed as they arrive from MediaRecorder; only unparsed bytes are
+    kept, so earlier data is never re-read. Master elements are entered
+    rather than buffered, which also handles the unknown-size Segment and
+    Cluster elements live recordings use.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._skip_remaining = 0
+        self._track_number: Optional[int] = None
+        self._pending_track: Optional[int] = None
+        self.codec_id: Optional[str] = None
+        self.codec_private: Optional[bytes] = None
+        self.channels = 1
+        self.tracks_changed = False
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Consume bytes and return any complete packets of the audio track."""
+        packets: List[bytes] = []
+
+        if self._skip_remaining:
+            skipped = min(self._skip_remaining, len(data))
+            self._skip_remaining -= skipped
+            data = data[skipped:]
+        self._buffer.extend(data)
+
+        pos = 0
+        while pos < len(self._buffer):
+            element_id = _read_vint(self._buffer, pos, keep_marker=True)
+            if element_id is None:
+                break
+            size = _read_vint(self._buffer, pos + element_id[1])
+            if size is None:
+                break
+
+            header = element_id[1] + size[1]
+            element_id, size, unknown_size = element_id[0], size[0], size[2]
+
+            if element_id in _MASTER_IDS:
+                pos += header
+                if element_id == 0xAE:
+                    self._pending_track = None
+                continue
+
+            if unknown_size:
+                raise ValueError(f"Unknown-size element 0x{element_id:X} cannot be skipped")
+
+            if element_id not in _LEAF_IDS:
+                if element_id == int.from_bytes(EBML_MAGIC, "big"):
+                    # A new stream (e.g. recording restarted) will redefine its tracks
+                    self._track_number = None
+                available = len(self._buffer) - pos - header
+                if size > available:
+                    self._skip_remaining = size - available
+                    pos = len(self._buffer)
+                    break
+                pos += header + size
+                continue
+
+            if pos + header + size > len(self._buffer):
+                break
+
+            payload = bytes(self._buffer[pos + header:pos + header + size])
+            pos += header + size
+            packets.extend(self._handle_leaf(element_id, payload))
+
+        del self._buffer[:pos]
+        return packets
+
+    def _handle_leaf(self, element_id: int, payload: bytes) -> List[bytes]:
+        if element_id == _TRACK_NUMBER:
+            self._pending_track = int.from_bytes(payload, "big")
+        elif element_id == _CODEC_ID:
+            codec_id = payload.rstrip(b"\x00").decode("ascii", "ignore")
+            if codec_id.startswith("A_") and self._track_number is None:
+                self._track_number = self._pending_track
+                self.codec_id = codec_id
+                self.tracks_changed = True
+        elif element_id == _CODEC_PRIVATE:
+            if self._pending_track == self._track_number:
+                self.codec_private = payload
+                self.tracks_changed = True
+        elif element_id == _CHANNELS:
+            if self._pending_track == self._track_number:
+                self.channels = int.from_bytes(payload, "big")
+        else:
+            return self._block_frames(payload)
+        return []
+
+    def _block_frames(self, payload: bytes) -> List[bytes]:
+        track = _read_vint(payload, 0)
+        if track is None or (self._track_number is not None and track[0] != self._track_number):
+            return []
+
+        pos = track[1] + 2  # skip the 16-bit relative timecode
+        flags = payload[pos]
+        pos += 1
+        lacing = (flags >> 1) & 0x03
+
+        if lacing == 0:
+            return [payload[pos:]]
+
+        count = payload[pos] + 1
+        pos += 1
+        sizes: List[int] = []
+
+        if lacing == 1:  # Xiph lacing
+            for _ in range(count - 1):
+                size = 0
+                while True:
+                    byte = payload[pos]
+                    pos += 1
+                    size += byte
+                    if byte != 0xFF:
+                        break
+                sizes.append(size)
+        elif lacing == 3:  # EBML lacing
+            first = _read_vint(payload, pos)
+            sizes.append(first[0])
+            pos += first[1]
+            for _ in range(count - 2):
+                delta = _read_vint(payload, pos)
+                bias = (1 << (7 * delta[1] - 1)) - 1
+                sizes.append(sizes[-1] + delta[0] - bias)
+                pos += delta[1]
+        else:  # fixed-size lacing
+            sizes = [(len(payload) - pos) // count] * (count - 1)
+
+        sizes.append(len(payload) - pos - sum(sizes))
+        frames = []
+        for size in sizes:
+            frames.append(payload[pos:pos + size])
+            pos += size
+        return frames
+
+
+class OggDemuxer:
+    """Incremental Ogg demuxer that yields Opus packets (after the two header packets)."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._packet = bytearray()
+        self._header_packets = 0
+        self.codec_id = "A_OPUS"
+        self.codec_private: Optional[bytes] = None
+        self.channels = 1
+        self.tracks_changed = False
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Consume bytes and return any complete audio packets."""
+        self._buffer.extend(data)
+        packets: List[bytes] = []
+        pos = 0
+
+        while len(self._buffer) - pos >= 27:
+            if self._buffer[pos:pos + 4] != OGG_MAGIC:
+                raise ValueError("Lost Ogg page sync")
+
+            n_segments = self._buffer[pos + 26]
+            if len(self._buffer) - pos < 27 + n_segments:
+                break
+            lacing = self._buffer[pos + 27:pos + 27 + n_segments]
+            body = pos + 27 + n_segments
+            if len(self._buffer) < body + sum(lacing):
+                break
+
+            if self._buffer[pos + 5] & 0x02:  # beginning of stream
+                self._header_packets = 0
+                self._packet.clear()
+
+            for segment in lacing:
+                self._packet.extend(self._buffer[body:body + segment])
+                body += segment
+                if segment < 255:
+                    packets.extend(self._handle_packet(bytes(self._packet)))
+                    self._packet.clear()
+            pos = body
+
+        del self._buffer[:pos]
+        return packets
+
+    def _handle_packet(self, packet: bytes) -> List[bytes]:
+        if self._header_packets < 2:
+            self._header_packets += 1
+            if packet.startswith(b"OpusHead"):
+                self.codec_private = packet
+                self.channels = packet[9]
+                self.tracks_changed = True
+            return []
+        return [packet]
+
+
+class StreamingAudioDecoder:
+    """Per-connection decoder from browser audio to 16 kHz mono float32 PCM.
+
+    The container is detected from the first bytes: WebM/Matroska or Ogg
+    carrying Opus (what MediaRecorder produces), otherwise the stream is
+    treated as raw 16-bit PCM. Demuxer and codec state live for the whole
+    connection, so each WebSocket message is decoded on its own without
+    re-parsing earlier bytes or spawning a subprocess.
+    """
+
+    def __init__(self, target_sample_rate: int = 16000):
+        self.target_sample_rate = target_sample_rate
+        self.container: Optional[str] = None
+        self._demuxer = None
+        self._codec = None
+        self._resampler = None
+        self._pcm_remainder = b""
+        self.packets_decoded = 0
+
+    def decode(self, data: bytes) -> np.ndarray:
+        """Decode one incoming message into float32 samples."""
+        if self.container is None:
+            self._detect(data)
+
+        if self.container == "pcm":
+            data = self._pcm_remainder + data
+            usable = len(data) - (len(data) % 2)
+            self._pcm_remainder = data[usable:]
+            return np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+
+        packets = self._demuxer.feed(data)
+        if self._demuxer.tracks_changed:
+            self._demuxer.tracks_changed = False
+            self._open_codec()
+
+        if not packets or self._codec is None:
+            return np.zeros(0, dtype=np.float32)
+
+        return self._decode_packets(packets)
+
+    def _detect(self, data: bytes):
+        if data.startswith(EBML_MAGIC):
+            self.container = "webm"
+            self._demuxer = WebMDemuxer()
+        elif data.startswith(OGG_MAGIC):
+            self.container = "ogg"
+            self._demuxer = OggDemuxer()
+        else:
+            self.container = "pcm"
+        logger.info(f"Detected {self.container} audio stream")
+
+    def _open_codec(self):
+        import av
+
+        if self._demuxer.codec_id != "A_OPUS":
+            raise ValueError(f"Unsupported audio codec: {self._demuxer.codec_id}")
+
+        self._codec = av.CodecContext.create("opus", "r")
+        self._codec.sample_rate = 48000
+        self._codec.layout = "stereo" if self._demuxer.channels == 2 else "mono"
+        if self._demuxer.codec_private:
+            self._codec.extradata = self._demuxer.codec_private
+
+        self._resampler = av.AudioResampler(format="flt", layout="mono", rate=self.target_sample_rate)
+
+    def _decode_packets(self, packets: List[bytes]) -> np.ndarray:
+        import av
+
+        chunks = []
+        for packet in packets:
+            for frame in self._codec.decode(av.Packet(packet)):
+                for resampled in self._resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            self.packets_decoded += 1
+
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(chunks).astype(np.float32, copy=False)
@@ -0,0 +1,185 @@
+import logging
+import os
+import re
+import struct
+import uuid
+import numpy as np
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size cap."""
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as ``200MB`` or ``1048576`` into bytes."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*", value.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+async def spool_upload(upload, spool_dir: str, max_bytes: int, chunk_size: int = 1024 * 1024) -> str:
+    """Stream an UploadFile to a uniquely named file in fixed-size chunks.
+
+    Only one chunk is held in memory at a time. Raises UploadTooLargeError
+    (after removing the partial file) once more than ``max_bytes`` arrive.
+    """
+    os.makedirs(spool_dir, exist_ok=True)
+    extension = os.path.splitext(upload.filename or "")[1].lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,5}", extension):
+        extension = ""
+    path = os.path.join(spool_dir, f"{uuid.uuid4().hex}{extension}")
+
+    written = 0
+    try:
+        with open(path, "wb") as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+                f.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    logger.info(f"Spooled {written} bytes to {path}")
+    return path
+
+
+class MappedAudio:
+    """Mono float audio backed by a memory-mapped file.
+
+    Samples are only paged in when a window is read, so a long recording
+    does not need to fit in memory.
+    """
+
+    def __init__(self, samples: np.memmap, sample_rate: int, scale: float = 1.0, sidecar_path: Optional[str] = None):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.scale = scale
+        # Decoded copy created for formats that cannot be mapped directly
+        self.sidecar_path = sidecar_path
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    def describe(self) -> Dict[str, Any]:
+        """Picklable description that lets another process map the same file."""
+        return {
+            "filename": self.samples.filename,
+            "dtype": self.samples.dtype.str,
+            "offset": self.samples.offset,
+            "length": len(self.samples),
+            "sample_rate": self.sample_rate,
+            "scale": self.scale
+        }
+
+    @classmethod
+    def open(cls, description: Dict[str, Any]) -> "MappedAudio":
+        """Map a file described by ``describe`` (read-only, never deletes it)."""
+        samples = np.memmap(
+            description["filename"],
+            dtype=np.dtype(description["dtype"]),
+            mode="r",
+            offset=description["offset"],
+            shape=(description["length"],)
+        )
+        return cls(samples, description["sample_rate"], scale=description["scale"])
+
+    def window(self, start: int, end: int) -> np.ndarray:
+        """Read samples [start, end) as a float32 array."""
+        return np.asarray(self.samples[start:end], dtype=np.float32) * self.scale
+
+    def close(self):
+        """Release the mapping and delete any decoded sidecar file."""
+        mmap = getattr(self.samples, "_mmap", None)
+        self.samples = np.zeros(0, dtype=np.float32)
+        if mmap is not None:
+            mmap.close()
+        if self.sidecar_path and os.path.exists(self.sidecar_path):
+            os.remove(self.sidecar_path)
+
+
+def _wav_pcm16_data(path: str, sample_rate: int) -> Optional[tuple]:
+    """Return (offset, n_samples) if ``path`` is a mono 16-bit PCM WAV at ``sample_rate``."""
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            return None
+
+        fmt = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, chunk_size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", f.read(16))
+                f.seek(chunk_size - 16 + (chunk_size % 2), os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    return None
+                format_tag, channels, rate, _, _, bits = fmt
+                if format_tag not in (1, 0xFFFE) or channels != 1 or rate != sample_rate or bits != 16:
+                    return None
+                file_size = os.fstat(f.fileno()).st_size
+                data_size = min(chunk_size, file_size - f.tell())
+                return f.tell(), data_size // 2
+            else:
+                f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+
+def _decode_to_sidecar(path: str, sidecar_path: str, sample_rate: int):
+    """Stream-decode any container/codec to raw float32 mono PCM on disk."""
+    import av
+
+    resampler = av.AudioResampler(format="flt", layout="mono", rate=sample_rate)
+    with av.open(path) as container, open(sidecar_path, "wb") as out:
+        for frame in container.decode(audio=0):
+            for resampled in resampler.resample(frame):
+                out.write(resampled.to_ndarray().astype(np.float32, copy=False).tobytes())
+        for resampled in resampler.resample(None):
+            out.write(resampled.to_ndarray().astype(np.float32, copy=False).tobytes())
+
+
+def load_audio_mmap(path: str, sample_rate: int = 16000) -> MappedAudio:
+    """Open an audio file as memory-mapped mono samples at ``sample_rate``.
+
+    Mono 16-bit WAV at the target rate is mapped in place. Anything else is
+    decoded once, frame by frame, into a float32 sidecar file next to it,
+    which is then mapped.
+    """
+    wav = _wav_pcm16_data(path, sample_rate)
+    if wav is not None:
+        offset, n_samples = wav
+        samples = np.memmap(path, dtype=np.int16, mode="r", offset=offset, shape=(n_samples,))
+        return MappedAudio(samples, sample_rate, scale=1.0 / 32768.0)
+
+    sidecar_path = f"{path}.f32"
+    try:
+        _decode_to_sidecar(path, sidecar_path, sample_rate)
+    except BaseException:
+        if os.path.exists(sidecar_path):
+            os.remove(sidecar_path)
+        raise
+
+    if os.path.getsize(sidecar_path) == 0:
+        os.remove(sidecar_path)
+        raise ValueError(f"No audio decoded from {path}")
+
+    samples = np.memmap(sidecar_path, dtype=np.float32, mode="r")
+    return MappedAudio(samples, sample_rate, sidecar_path=sidecar_path)
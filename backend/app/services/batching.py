@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+import numpy as np
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collects requests from many callers and runs them as one batch.
+
+    Callers ``await submit(item)``. A single collector task waits for the
+    first pending item, keeps collecting until ``max_batch_size`` items are
+    queued or ``max_wait_ms`` has passed, then runs ``process_batch`` on the
+    whole list in ``executor`` (the loop's default if None) and resolves each caller's future with its
+    result.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 50.0,
+        work_units: Optional[Callable[[Any], float]] = None,
+        latency_window: int = 1000,
+        executor: Optional[Executor] = None
+    ):
+        self.name = name
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        # Measures how much work an item represents (e.g. seconds of audio)
+        self.work_units = work_units
+        self.executor = executor
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.items = 0
+        self.total_work = 0.0
+        self.total_busy_seconds = 0.0
+        self.latencies = deque(maxlen=latency_window)
+        self.last_batch: Dict[str, Any] = {}
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result from the next batch."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the collector task and fail any queued requests."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while self._queue and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError(f"{self.name} batcher stopped"))
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future, float]]:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect()
+            items = [item for item, _, _ in batch]
+
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, lambda: self.process_batch(items))
+            except Exception as e:
+                logger.error(f"Error running {self.name} batch of {len(items)}: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            for (_, future, submitted), result in zip(batch, results):
+                self.latencies.append(finished - submitted)
+                if not future.done():
+                    future.set_result(result)
+
+            self._record_batch(items, finished - started)
+
+    def _record_batch(self, items: List[Any], elapsed: float):
+        work = sum(self.work_units(item) for item in items) if self.work_units else float(len(items))
+
+        self.batches += 1
+        self.items += len(items)
+        self.total_work += work
+        self.total_busy_seconds += elapsed
+
+        self.last_batch = {
+            "size": len(items),
+            "seconds": elapsed,
+            "items_per_second": len(items) / elapsed if elapsed > 0 else None,
+            "work_per_second": work / elapsed if elapsed > 0 else None,
+            "p95_latency_seconds": self.p95_latency()
+        }
+
+        logger.info(
+            f"{self.name} batch: size={len(items)} time={elapsed:.3f}s "
+            f"throughput={self.last_batch['work_per_second'] or 0:.2f}/s "
+            f"p95={self.last_batch['p95_latency_seconds']:.3f}s"
+        )
+
+    def p95_latency(self) -> float:
+        """95th percentile submit-to-result latency over the recent window."""
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(np.fromiter(self.latencies, dtype=np.float64), 95))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cumulative batching counters and the most recent batch report."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "work_per_busy_second": self.total_work / self.total_busy_seconds if self.total_busy_seconds else 0.0,
+            "p95_latency_seconds": self.p95_latency(),
+            "last_batch": self.last_batch
+        }
@@ -0,0 +1,282 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from app.services.executors import get_executor
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(*parts: Any) -> str:
+    """Stable SHA-256 key over strings, bytes and JSON-serializable parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            digest.update(part)
+        elif isinstance(part, str):
+            digest.update(part.encode("utf-8"))
+        else:
+            digest.update(json.dumps(part, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def update_digest(digest, chunks: Iterable[Any]):
+    """Feed buffer-like chunks (bytes, numpy arrays) into a hashlib digest."""
+    for chunk in chunks:
+        digest.update(memoryview(chunk).cast("B"))
+    return digest
+
+
+class DiskLRUCache:
+    """Size-bounded JSON cache on disk with least-recently-used eviction.
+
+    Each entry is one ``<key>.json`` file. Recency is kept in memory and
+    mirrored to file modification times, so the LRU order survives a
+    restart. Safe to use from executor threads.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append((stat.st_mtime, name[:-len(".json")], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._size += size
+        self._evict()
+
+    def get(self, key: str, count: bool = True) -> Optional[Any]:
+        """Return the cached value, or None on a miss.
+
+        With ``count=False`` the lookup is left out of the hit/miss
+        counters, for callers that probe several keys per request and
+        ``record`` the outcome once.
+        """
+        with self._lock:
+            if key not in self._entries:
+                if count:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Dropping unreadable cache entry {key}: {e}")
+            self.delete(key)
+            if count:
+                self.record(False)
+            return None
+
+        if count:
+            self.record(True)
+        return value
+
+    def record(self, hit: bool):
+        """Count one lookup made with ``count=False``."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def set(self, key: str, value: Any):
+        """Store a JSON-serializable value and evict old entries over the size cap."""
+        data = json.dumps(value).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+
+        # Write atomically so readers never see a partial entry
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._size += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def update(self, key: str, fields: Dict[str, Any]) -> bool:
+        """Merge fields into an existing dict entry without counting a lookup."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+        try:
+            with open(self._path(key)) as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return False
+        value.update(fields)
+        self.set(key, value)
+        return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._size -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+# In-flight result of a computation whose caller was cancelled
+_ABANDONED = object()
+
+
+class ResultCache:
+    """In-memory LRU of computed results with an optional DiskLRUCache tier.
+
+    ``get_or_compute`` checks memory, then disk (promoting hits back into
+    memory), and otherwise runs the computation once even if several
+    callers ask for the same key concurrently. If the caller running the
+    computation is cancelled, the callers waiting on it are released and
+    the next one computes it instead. None results are not cached.
+    Values kept on disk must be JSON-serializable.
+    """
+
+    def __init__(self, max_entries: int = 1024, disk: Optional[DiskLRUCache] = None):
+        self.max_entries = max_entries
+        self.disk = disk
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        # Share the result of an identical computation already running
+        while key in self._inflight:
+            value = await asyncio.shield(self._inflight[key])
+            if value is not _ABANDONED:
+                self.hits += 1
+                return value
+
+        future = asyncio.get_event_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load_disk(key)
+            if value is None:
+                self.misses += 1
+                value = await compute()
+                if value is not None:
+                    await self._store_disk(key, value)
+            else:
+                self.disk_hits += 1
+
+            if value is not None:
+                self._remember(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            # One caller going away must not fail the others
+            future.set_result(_ABANDONED)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged as a warning
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def _remember(self, key: str, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _load_disk(self, key: str) -> Optional[Any]:
+        if not self.disk:
+            return None
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(get_executor("io"), lambda: self.disk.get(key))
+
+    async def _store_disk(self, key: str, value: Any):
+        if not self.disk:
+            return
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(get_executor("io"), lambda: self.disk.set(key, value))
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Error writing result cache entry: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "disk": self.disk.get_stats() if self.disk else None
+        }
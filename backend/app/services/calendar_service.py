@@ -10,6 +10,8 @@ import json
 import os
 from datetime import datetime, timedelta
 
+from app.services.executors import get_executor
+
 logger = logging.getLogger(__name__)
 
 class CalendarService:
@@ -46,7 +48,7 @@ class CalendarService:
             # Build the service
             loop = asyncio.get_event_loop()
             self.service = await loop.run_in_executor(
-                None,
+                get_executor("io"),
                 lambda: build('calendar', 'v3', credentials=creds)
             )
             
@@ -101,7 +103,7 @@ class CalendarService:
             # Initialize service with new credentials
             loop = asyncio.get_event_loop()
             self.service = await loop.run_in_executor(
-                None,
+                get_executor("io"),
                 lambda: build('calendar', 'v3', credentials=creds)
             )
             
@@ -150,7 +152,7 @@ class CalendarService:
             # Create the event
             loop = asyncio.get_event_loop()
             created_event = await loop.run_in_executor(
-                None,
+                get_executor("io"),
                 lambda: self.service.events().insert(calendarId='primary', body=event).execute()
             )
             
@@ -206,7 +208,7 @@ class CalendarService:
             
             loop = asyncio.get_event_loop()
             events_result = await loop.run_in_executor(
-                None,
+                get_executor("io"),
                 lambda: self.service.events().list(
                     calendarId='primary',
                     timeMin=now,
@@ -244,7 +246,7 @@ class CalendarService:
         try:
             loop = asyncio.get_event_loop()
             await loop.run_in_executor(
-                None,
+                get_executor("io"),
                 lambda: self.service.events().delete(calendarId='primary', eventId=event_id).execute()
             )
             
@@ -0,0 +1,148 @@
+"""Document storage behind the knowledge base's FAISS index.
+
+Documents of a compacted base live in an immutable SQLite file keyed by
+index position and are read only for search hits, so opening a base costs
+the same whatever its size and every worker shares the page cache.
+Documents of the delta segments (bounded by compaction) stay in memory.
+Chunks added by bulk ingestion carry a ``chunk_hash`` in their metadata,
+indexed in SQLite so re-ingested chunks are found without a scan.
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from langchain.docstore.base import Docstore
+from langchain.docstore.document import Document
+
+# (id, page_content, metadata)
+DocumentRow = Tuple[str, str, Dict[str, Any]]
+
+_CHUNK_HASH = "json_extract(metadata, '$.chunk_hash')"
+# Below SQLite's default limit on query parameters
+_LOOKUP_BATCH = 500
+
+
+def write_documents_db(path: str, rows: Iterable[DocumentRow]) -> int:
+    """Write base documents, in index order, to a new SQLite file."""
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        # Written once and never modified, so no journal is needed
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute(
+            "CREATE TABLE documents ("
+            "position INTEGER PRIMARY KEY, id TEXT NOT NULL, text TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        connection.executemany(
+            "INSERT INTO documents VALUES (?, ?, ?, ?)",
+            (
+                (position, doc_id, text, json.dumps(metadata))
+                for position, (doc_id, text, metadata) in enumerate(rows)
+            )
+        )
+        connection.execute(f"CREATE INDEX documents_chunk_hash ON documents ({_CHUNK_HASH})")
+        connection.commit()
+        count = connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    finally:
+        connection.close()
+
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+def read_documents_db(path: str) -> Iterator[DocumentRow]:
+    """Every document of a base file in index order."""
+    connection = sqlite3.connect(f"{Path(path).absolute().as_uri()}?immutable=1", uri=True)
+    try:
+        for doc_id, text, metadata in connection.execute("SELECT id, text, metadata FROM documents ORDER BY position"):
+            yield doc_id, text, json.loads(metadata)
+    finally:
+        connection.close()
+
+
+class KnowledgeDocstore(Docstore):
+    """Base documents looked up in SQLite by position, delta documents in memory by id.
+
+    Keys are ints (base positions) or id strings (delta documents), as
+    handed out by ``IndexToDocstoreId``.
+    """
+
+    def __init__(self, base_path: Optional[str] = None):
+        self._connection = None
+        self._lock = threading.Lock()
+        self.base_count = 0
+        if base_path:
+            # The file is replaced, never modified, so SQLite can skip locking
+            self._connection = sqlite3.connect(
+                f"{Path(base_path).absolute().as_uri()}?immutable=1", uri=True, check_same_thread=False
+            )
+            self.base_count = self._connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+        self.delta: Dict[str, Document] = {}
+        self.delta_ids: List[str] = []
+        self.delta_hashes: Set[str] = set()
+
+    def add_delta(self, ids: List[str], documents: List[Document]):
+        self.delta.update(zip(ids, documents))
+        self.delta_ids.extend(ids)
+        self.delta_hashes.update(doc.metadata["chunk_hash"] for doc in documents if "chunk_hash" in doc.metadata)
+
+    def find_hashes(self, hashes: List[str]) -> Set[str]:
+        """Which of the chunk hashes are already stored."""
+        found = self.delta_hashes.intersection(hashes)
+        if self._connection:
+            missing = [digest for digest in hashes if digest not in found]
+            for start in range(0, len(missing), _LOOKUP_BATCH):
+                batch = missing[start:start + _LOOKUP_BATCH]
+                with self._lock:
+                    rows = self._connection.execute(
+                        f"SELECT {_CHUNK_HASH} FROM documents WHERE {_CHUNK_HASH} IN ({', '.join('?' * len(batch))})",
+                        batch
+                    ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def search(self, search: Union[int, str]) -> Union[str, Document]:
+        if isinstance(search, int):
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT text, metadata FROM documents WHERE position = ?", (search,)
+                ).fetchone() if self._connection else None
+            if row is None:
+                return f"ID {search} not found."
+            return Document(page_content=row[0], metadata=json.loads(row[1]))
+        return self.delta.get(search, f"ID {search} not found.")
+
+    def __len__(self) -> int:
+        return self.base_count + len(self.delta_ids)
+
+
+class IndexToDocstoreId(Mapping):
+    """FAISS position -> docstore key, without loading the base's ids."""
+
+    def __init__(self, docstore: KnowledgeDocstore):
+        self.docstore = docstore
+
+    def __getitem__(self, position: int) -> Union[int, str]:
+        position = int(position)
+        if 0 <= position < self.docstore.base_count:
+            return position
+        offset = position - self.docstore.base_count
+        if 0 <= offset < len(self.docstore.delta_ids):
+            return self.docstore.delta_ids[offset]
+        raise KeyError(position)
+
+    def __len__(self) -> int:
+        return len(self.docstore)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self)))
@@ -0,0 +1,167 @@
+"""LangChain embedding proxies and their cache for the knowledge base.
+
+Kept apart from the services so langchain is only imported once the
+knowledge base is opened, not when the API starts.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from app.services.cache import DiskLRUCache, content_key
+from app.services.kb_ingest import normalize_text
+from app.services.model_registry import ModelRegistry
+from app.services.model_server import ModelClient
+
+logger = logging.getLogger(__name__)
+
+
+class RegistryEmbeddings(Embeddings):
+    """Embeddings that fetch the model from the registry on every call.
+
+    The vector store keeps this proxy rather than the model itself, so the
+    model can be unloaded while the store stays open.
+    """
+
+    def __init__(self, models: ModelRegistry, name: str = "embeddings"):
+        self.models = models
+        self.name = name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self.models.use(self.name) as embeddings:
+            return embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with self.models.use(self.name) as embeddings:
+            return embeddings.embed_query(text)
+
+
+class RemoteEmbeddings(Embeddings):
+    """LangChain embeddings computed by the model server."""
+
+    def __init__(self, client: ModelClient):
+        self.client = client
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.client.call("embeddings", "embed_documents", texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.client.call("embeddings", "embed_query", text)
+
+
+class CachedEmbeddings(Embeddings):
+    """Memoizes another Embeddings by model name and normalized text.
+
+    RAG queries repeat while a meeting stays on a topic and re-added
+    documents share chunks, so both are looked up before the model runs.
+    Vectors are kept as float32 in a bounded in-memory LRU, with an
+    optional DiskLRUCache tier that survives restarts. Safe to use from
+    executor threads.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        max_entries: int = 4096,
+        disk: Optional[DiskLRUCache] = None
+    ):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk = disk
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, kind: str, text: str) -> str:
+        # Models may embed queries and documents differently
+        return content_key("embedding", self.model_name, kind, normalize_text(text))
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+        vector = self.disk.get(key) if self.disk else None
+        if vector is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, vector)
+        return vector
+
+    def _store(self, key: str, vector: List[float]):
+        with self._lock:
+            self._remember(key, np.asarray(vector, dtype=np.float32))
+        if self.disk:
+            try:
+                self.disk.set(key, list(vector))
+            except (OSError, TypeError, ValueError) as e:
+                logger.error(f"Error writing embedding cache entry: {e}")
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        # Each distinct missing text is embedded once, in one batch
+        missing: Dict[str, List[int]] = {}
+        for position, text in enumerate(texts):
+            key = self._key("document", text)
+            if key in missing:
+                missing[key].append(position)
+                continue
+            vector = self._lookup(key)
+            if vector is None:
+                missing[key] = [position]
+            else:
+                results[position] = vector.tolist()
+
+        if missing:
+            vectors = self.embeddings.embed_documents([texts[positions[0]] for positions in missing.values()])
+            for (key, positions), vector in zip(missing.items(), vectors):
+                self._store(key, vector)
+                for position in positions:
+                    results[position] = list(vector)
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key("query", text)
+        vector = self._lookup(key)
+        if vector is not None:
+            return vector.tolist()
+        vector = self.embeddings.embed_query(text)
+        self._store(key, vector)
+        return list(vector)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "model": self.model_name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "disk": self.disk.get_stats() if self.disk else None
+        }
@@ -0,0 +1,154 @@
+"""Named thread pools that keep each kind of blocking work in its own lane.
+
+Instead of sharing the event loop's default executor, blocking calls go to
+the pool for their workload, so a burst of slow calendar requests cannot
+occupy the threads Whisper needs:
+
+    await loop.run_in_executor(get_executor("audio"), lambda: ...)
+
+Pools are sized with ``EXECUTOR_<NAME>_WORKERS``. Threads of the inference
+pools also cap torch's intra-op threads (``EXECUTOR_<NAME>_TORCH_THREADS``,
+by default the cores split evenly between all inference threads) so
+concurrent models do not oversubscribe the CPU.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# name -> (default workers, runs torch inference)
+EXECUTORS = {
+    "audio": (2, True),    # live Whisper inference and VAD
+    "files": (1, True),    # uploaded-file transcription, kept below the audio pool so live chunks get a thread
+    "nlp": (2, True),      # summarization and sentiment pipelines
+    "vector": (2, True),   # embeddings and FAISS search
+    "ingest": (1, True),   # bulk knowledge base ingestion, kept off the vector pool live RAG searches use
+    "io": (8, False)       # Google Calendar HTTP, disk caches, hashing, ffmpeg decoding
+}
+
+_executors: Dict[str, "InstrumentedExecutor"] = {}
+_executors_lock = threading.Lock()
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """Thread pool that records queue depth, queue wait and run time."""
+
+    def __init__(self, name: str, max_workers: int, torch_threads: int = 0, wait_window: int = 1000):
+        super().__init__(max_workers=max_workers, thread_name_prefix=f"{name}-executor", initializer=self._init_thread)
+        self.name = name
+        self.workers = max_workers
+        self.torch_threads = torch_threads
+        self._stats_lock = threading.Lock()
+
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+        self.waits = deque(maxlen=wait_window)
+
+    def _init_thread(self):
+        if not self.torch_threads:
+            return
+        try:
+            import torch
+        except ImportError:
+            return
+        # OpenMP thread counts are per calling thread, so each worker keeps its share
+        torch.set_num_threads(self.torch_threads)
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        submitted = time.perf_counter()
+        with self._stats_lock:
+            self.queued += 1
+
+        def run():
+            started = time.perf_counter()
+            with self._stats_lock:
+                self.queued -= 1
+                self.running += 1
+                self.waits.append(started - submitted)
+                self.max_wait_seconds = max(self.max_wait_seconds, started - submitted)
+
+            failed = False
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                with self._stats_lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.failed += failed
+                    self.total_run_seconds += time.perf_counter() - started
+
+        return super().submit(run)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            waits = np.fromiter(self.waits, dtype=np.float64)
+            return {
+                "workers": self.workers,
+                "torch_threads": self.torch_threads or None,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "p50_wait_seconds": float(np.percentile(waits, 50)) if len(waits) else 0.0,
+                "p95_wait_seconds": float(np.percentile(waits, 95)) if len(waits) else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+                "mean_run_seconds": self.total_run_seconds / self.completed if self.completed else 0.0
+            }
+
+
+def _configured_workers(name: str) -> int:
+    return max(1, int(os.getenv(f"EXECUTOR_{name.upper()}_WORKERS") or EXECUTORS[name][0]))
+
+
+def _create_executor(name: str) -> InstrumentedExecutor:
+    workers = _configured_workers(name)
+    torch_threads = 0
+    if EXECUTORS[name][1]:
+        inference_workers = sum(_configured_workers(lane) for lane, (_, inference) in EXECUTORS.items() if inference)
+        default_threads = max(1, (os.cpu_count() or 1) // inference_workers)
+        torch_threads = int(os.getenv(f"EXECUTOR_{name.upper()}_TORCH_THREADS") or default_threads)
+
+    logger.info(f"Created {name} executor with {workers} workers" + (
+        f", {torch_threads} torch threads each" if torch_threads else ""
+    ))
+    return InstrumentedExecutor(name, workers, torch_threads)
+
+
+def get_executor(name: str) -> InstrumentedExecutor:
+    """The pool for a workload: audio, files, nlp, vector, ingest or io."""
+    if name not in EXECUTORS:
+        raise ValueError(f"Unknown executor '{name}'. Choose one of: {', '.join(EXECUTORS)}")
+
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = _executors[name] = _create_executor(name)
+        return executor
+
+
+def get_executor_stats() -> Dict[str, Any]:
+    """Queue depth, wait and run times of every pool."""
+    return {name: get_executor(name).get_stats() for name in EXECUTORS}
+
+
+def shutdown_executors():
+    """Stop all pools, dropping work that has not started."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# process(meeting_id, transcript_chunk) -> insights
+InsightProcessor = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class _MeetingState:
+    def __init__(self):
+        self.pending: List[Dict[str, Any]] = []
+        self.waiters: List[asyncio.Future] = []
+        self.task: Optional[asyncio.Task] = None
+        # Event loop times of the oldest pending chunk and the newest trigger
+        self.first_pending = 0.0
+        self.last_trigger = 0.0
+
+
+class InsightScheduler:
+    """Runs AI insight processing with at most one job in flight per meeting.
+
+    A run starts once no new chunk has arrived for ``debounce_ms``, but
+    never more than ``max_wait_ms`` after the oldest pending chunk, so a
+    meeting that never goes quiet still gets insights. Triggers arriving
+    while a meeting is waiting or already running are queued and
+    coalesced: the next run receives all of their text as a single chunk,
+    so results are produced in order and reflect the latest transcript
+    state. A ``complete`` chunk (a whole uploaded transcript) is never
+    merged with live chunks; it gets a run of its own.
+    """
+
+    def __init__(self, process: InsightProcessor, debounce_ms: float = 2000.0, max_wait_ms: float = 10000.0):
+        self.process = process
+        self.debounce = debounce_ms / 1000.0
+        self.max_wait = max(max_wait_ms, debounce_ms) / 1000.0
+        self._meetings: Dict[str, _MeetingState] = {}
+        self.triggers = 0
+        self.runs = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.run_seconds = 0.0
+
+    def trigger(self, meeting_id: str, transcript_chunk: Dict[str, Any]) -> asyncio.Future:
+        """Queue a chunk for the meeting's next run.
+
+        Returns a future resolved with the insights of the run that covers
+        this chunk (or cancelled along with the meeting).
+        """
+        state = self._meetings.get(meeting_id)
+        if state is None:
+            state = self._meetings[meeting_id] = _MeetingState()
+
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        if not state.pending:
+            state.first_pending = loop.time()
+        state.last_trigger = loop.time()
+        state.pending.append(transcript_chunk)
+        state.waiters.append(future)
+        self.triggers += 1
+
+        if state.task is None:
+            state.task = asyncio.create_task(self._run_meeting(meeting_id, state))
+        return future
+
+    def cancel(self, meeting_id: str):
+        """Drop pending triggers and cancel the running job for a meeting."""
+        state = self._meetings.pop(meeting_id, None)
+        if state is None:
+            return
+
+        if state.task:
+            state.task.cancel()
+        for future in state.waiters:
+            future.cancel()
+        self.cancelled += len(state.pending)
+        logger.info(f"Cancelled AI insights for meeting {meeting_id} ({len(state.pending)} pending)")
+
+    async def stop(self):
+        """Cancel all meetings' pending and running jobs."""
+        tasks = [state.task for state in self._meetings.values() if state.task]
+        for meeting_id in list(self._meetings):
+            self.cancel(meeting_id)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_meeting(self, meeting_id: str, state: _MeetingState):
+        try:
+            while state.pending:
+                await self._wait_for_quiet(state)
+
+                chunks, waiters = self._take_batch(state)
+                merged = {
+                    **chunks[-1],
+                    "text": " ".join(chunk.get("text", "") for chunk in chunks).strip()
+                }
+
+                started = time.perf_counter()
+                try:
+                    insights = await self.process(meeting_id, merged)
+                except asyncio.CancelledError:
+                    for future in waiters:
+                        future.cancel()
+                    raise
+                except Exception as e:
+                    logger.error(f"Error processing AI insights for meeting {meeting_id}: {e}")
+                    insights = {}
+                self.runs += 1
+                self.run_seconds += time.perf_counter() - started
+
+                self.coalesced += len(chunks) - 1
+                for future in waiters:
+                    if not future.done():
+                        future.set_result(insights)
+        finally:
+            if self._meetings.get(meeting_id) is state:
+                # Only left with waiters if the task itself was cancelled
+                for future in state.waiters:
+                    future.cancel()
+                del self._meetings[meeting_id]
+
+    def _take_batch(self, state: _MeetingState) -> Tuple[List[Dict[str, Any]], List[asyncio.Future]]:
+        """Pending live chunks up to the next complete transcript, or that transcript alone."""
+        count = 1
+        if not state.pending[0].get("complete"):
+            while count < len(state.pending) and not state.pending[count].get("complete"):
+                count += 1
+        chunks, waiters = state.pending[:count], state.waiters[:count]
+        del state.pending[:count], state.waiters[:count]
+        return chunks, waiters
+
+    async def _wait_for_quiet(self, state: _MeetingState):
+        """Sleep until the debounce interval passes without a trigger, or max wait."""
+        loop = asyncio.get_event_loop()
+        while True:
+            deadline = min(state.last_trigger + self.debounce, state.first_pending + self.max_wait)
+            delay = deadline - loop.time()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "debounce_ms": self.debounce * 1000.0,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "active_meetings": len(self._meetings),
+            "pending_chunks": sum(len(state.pending) for state in self._meetings.values()),
+            "triggers": self.triggers,
+            "runs": self.runs,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "avg_run_seconds": self.run_seconds / self.runs if self.runs else 0.0
+        }
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from sqlmodel import Session, select
+
+from app.database import engine
+from app.models import TranscriptionJob
+
+logger = logging.getLogger(__name__)
+
+JobCallback = Callable[[TranscriptionJob], Awaitable[None]]
+JobResultCallback = Callable[[TranscriptionJob, Dict[str, Any]], Awaitable[None]]
+
+
+class TranscriptionJobQueue:
+    """Durable background queue for uploaded-audio transcription.
+
+    Jobs are persisted in the ``transcriptionjob`` table, so anything queued
+    or running when the process stops is picked up again on the next start,
+    unless it has used up its attempts (e.g. it keeps crashing the process).
+    A job's spooled upload is deleted once it completes or finally fails.
+    A fixed number of worker tasks drain the queue; results are written to
+    ``results_dir`` as JSON and referenced from the job row.
+    """
+
+    def __init__(
+        self,
+        transcription_service,
+        on_progress: Optional[JobCallback] = None,
+        on_complete: Optional[JobResultCallback] = None
+    ):
+        self.transcription_service = transcription_service
+        self.on_progress = on_progress
+        self.on_complete = on_complete
+        self.workers = int(os.getenv("TRANSCRIPTION_JOB_WORKERS", "2"))
+        self.max_attempts = int(os.getenv("TRANSCRIPTION_JOB_MAX_ATTEMPTS", "3"))
+        self.results_dir = os.getenv("TRANSCRIPTION_RESULTS_DIR", "data/transcripts")
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Requeue unfinished jobs from a previous run and start the workers."""
+        os.makedirs(self.results_dir, exist_ok=True)
+        self._queue = asyncio.Queue()
+
+        with Session(engine) as session:
+            jobs = session.exec(
+                select(TranscriptionJob)
+                .where(TranscriptionJob.status.in_(["queued", "running"]))
+                .order_by(TranscriptionJob.created_at)
+            ).all()
+
+            pending = 0
+            for job in jobs:
+                if job.attempts >= self.max_attempts:
+                    logger.error(f"Transcription job {job.id} was interrupted on its last attempt; marking failed")
+                    job.status = "failed"
+                    job.error = job.error or f"Interrupted after {job.attempts} attempts"
+                    job.updated_at = datetime.utcnow()
+                    self._discard_upload(job)
+                    continue
+                if job.status == "running":
+                    logger.info(f"Resuming interrupted transcription job {job.id}")
+                    job.status = "queued"
+                    job.updated_at = datetime.utcnow()
+                self._queue.put_nowait(job.id)
+                pending += 1
+            session.commit()
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Transcription job queue started with {self.workers} workers, {pending} pending jobs")
+
+    async def stop(self):
+        """Stop the workers; running jobs stay marked and resume on next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, meeting_id: str, file_path: str, filename: Optional[str] = None) -> TranscriptionJob:
+        """Persist a new job for a spooled file and queue it."""
+        job = TranscriptionJob(
+            id=str(uuid.uuid4()),
+            meeting_id=meeting_id,
+            file_path=file_path,
+            filename=filename,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow()
+        )
+
+        with Session(engine) as session:
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+
+        # Before start() the stored row is enough: start() queues it from the table
+        if self._queue is not None:
+            await self._queue.put(job.id)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[TranscriptionJob]:
+        """Load a job by id."""
+        with Session(engine) as session:
+            return session.get(TranscriptionJob, job_id)
+
+    def get_result(self, job: TranscriptionJob) -> Optional[Dict[str, Any]]:
+        """Load the stored result of a completed job."""
+        if not job.result_path or not os.path.exists(job.result_path):
+            return None
+        with open(job.result_path) as f:
+            return json.load(f)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and per-status job counts."""
+        with Session(engine) as session:
+            statuses = session.exec(select(TranscriptionJob.status)).all()
+
+        counts: Dict[str, int] = {}
+        for status in statuses:
+            counts[status] = counts.get(status, 0) + 1
+
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "jobs": counts
+        }
+
+    def _update(self, job_id: str, **fields) -> TranscriptionJob:
+        with Session(engine) as session:
+            job = session.get(TranscriptionJob, job_id)
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated_at = datetime.utcnow()
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            return job
+
+    def _discard_upload(self, job: TranscriptionJob):
+        """Delete a finished job's spooled upload."""
+        try:
+            os.remove(job.file_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error deleting upload of transcription job {job.id}: {e}")
+
+    async def _notify(self, job: TranscriptionJob):
+        if self.on_progress:
+            try:
+                await self.on_progress(job)
+            except Exception as e:
+                logger.error(f"Error reporting progress for job {job.id}: {e}")
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Unexpected error in transcription job {job_id}: {e}")
+
+    async def _run_job(self, job_id: str):
+        job = self.get_job(job_id)
+        if job is None or job.status not in ("queued", "running"):
+            return
+
+        if not os.path.exists(job.file_path):
+            await self._notify(self._update(job_id, status="failed", error="Audio file is missing"))
+            return
+
+        job = self._update(job_id, status="running", progress=0.0, attempts=job.attempts + 1)
+        await self._notify(job)
+
+        async def report_progress(fraction: float):
+            await self._notify(self._update(job_id, progress=fraction))
+
+        try:
+            result = await self.transcription_service.transcribe_file(job.file_path, report_progress)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Transcription job {job_id} failed (attempt {job.attempts}): {e}")
+            if job.attempts < self.max_attempts:
+                job = self._update(job_id, status="queued", error=str(e))
+                await self._queue.put(job_id)
+            else:
+                job = self._update(job_id, status="failed", error=str(e))
+                self._discard_upload(job)
+            await self._notify(job)
+            return
+
+        # Write the result atomically before pointing the job at it
+        result_path = os.path.join(self.results_dir, f"{job_id}.json")
+        temp_path = f"{result_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(result, f)
+        os.replace(temp_path, result_path)
+
+        job = self._update(
+            job_id,
+            status="completed",
+            progress=1.0,
+            result_path=result_path,
+            error=None,
+            completed_at=datetime.utcnow()
+        )
+        self._discard_upload(job)
+
+        await self._notify(job)
+        if self.on_complete:
+            try:
+                await self.on_complete(job, result)
+            except Exception as e:
+                logger.error(f"Error handling completed job {job_id}: {e}")
@@ -0,0 +1,236 @@
+"""Bulk knowledge base ingestion.
+
+Documents (the text files of a directory, or NDJSON records) are split
+into chunks in a process pool that runs ahead of embedding, deduplicated
+by a hash of their normalized text, embedded in fixed-size batches and
+appended to the ``KnowledgeStore`` as one segment per batch. Whenever the
+store reaches its compaction threshold the segments are folded into the
+base before ingestion continues, so a large run does not pile up segments
+or grow the in-memory delta. A failure loses at most the batch in flight,
+and running an ingestion again skips every chunk that is already in the
+knowledge base.
+
+langchain is imported on first use, so importing this module stays cheap
+for the API and for the pool's worker processes.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+TEXT_SUFFIXES = (".txt", ".md")
+
+# (text, metadata including chunk_hash)
+Chunk = Tuple[str, Dict[str, Any]]
+
+_splitter = None
+
+
+def get_splitter() -> Any:
+    """The text splitter, created once per process."""
+    global _splitter
+    if _splitter is None:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        _splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    return _splitter
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so reformatted copies of a text compare equal."""
+    return " ".join(text.split())
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def split_document(text: str, metadata: Optional[Dict[str, Any]] = None) -> List[Chunk]:
+    """Chunks of one document, each with its metadata plus ``chunk_hash``."""
+    return [
+        (chunk, {**(metadata or {}), "chunk_hash": chunk_hash(chunk)})
+        for chunk in get_splitter().split_text(text)
+    ]
+
+
+def _split_record(record: Dict[str, Any]) -> List[Chunk]:
+    """Pool task: read the document if it is a file, then split it."""
+    if "path" in record:
+        with open(record["path"], encoding="utf-8", errors="replace") as f:
+            text = f.read()
+    else:
+        text = record["text"]
+    return split_document(text, record.get("metadata"))
+
+
+def directory_records(directory: str, suffixes: Tuple[str, ...] = TEXT_SUFFIXES) -> Iterator[Dict[str, Any]]:
+    """One record per text file under ``directory``; files are read by the pool."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(suffixes):
+                path = os.path.join(root, name)
+                yield {"path": path, "metadata": {"source": os.path.relpath(path, directory)}}
+
+
+def ndjson_records(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Records from NDJSON lines of ``{"text" (or "content"), "metadata"}``."""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"NDJSON line {number} is not valid JSON: {e}")
+        text = record.get("text", record.get("content")) if isinstance(record, dict) else None
+        if not isinstance(text, str):
+            raise ValueError(f"NDJSON line {number} has no text")
+        yield {"text": text, "metadata": record.get("metadata") or {}}
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Split a stream of byte chunks into decoded lines."""
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8")
+    if buffer:
+        yield buffer.decode("utf-8")
+
+
+def sync_iter(aiterable: AsyncIterable[Any], loop: asyncio.AbstractEventLoop) -> Iterator[Any]:
+    """Consume an async iterable on ``loop`` from a worker thread."""
+    iterator = aiterable.__aiter__()
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(iterator.__anext__(), loop).result()
+        except StopAsyncIteration:
+            return
+
+
+class KnowledgeIngestor:
+    """Feeds records into a KnowledgeStore in batches of ``batch_size`` new chunks.
+
+    ``workers`` processes split documents (0 splits in the calling
+    thread). ``progress`` is called with the running report after every
+    committed batch.
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        batch_size: int = 256,
+        workers: int = 2,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.store = store
+        self.batch_size = max(1, batch_size)
+        self.workers = max(0, workers)
+        self.progress = progress
+
+    def ingest(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Split, dedupe, embed and commit every record; returns the final report."""
+        started = time.perf_counter()
+        report = {
+            "documents": 0,
+            "failed_documents": 0,
+            "chunks": 0,
+            "duplicates": 0,
+            "added": 0,
+            "batches": 0,
+            "compactions": 0,
+            "seconds": 0.0,
+            "chunks_per_second": 0.0
+        }
+        # Hashes of the uncommitted batch; committed chunks are found in the store
+        pending: List[Chunk] = []
+        pending_hashes: Set[str] = set()
+
+        for chunks in self._split(records):
+            if chunks is None:
+                report["failed_documents"] += 1
+                continue
+            report["documents"] += 1
+            report["chunks"] += len(chunks)
+
+            existing = self.store.existing_hashes([metadata["chunk_hash"] for _, metadata in chunks])
+            for text, metadata in chunks:
+                digest = metadata["chunk_hash"]
+                if digest in existing or digest in pending_hashes:
+                    report["duplicates"] += 1
+                    continue
+                pending.append((text, metadata))
+                pending_hashes.add(digest)
+                if len(pending) >= self.batch_size:
+                    self._commit(pending, report, started)
+                    pending, pending_hashes = [], set()
+
+        if pending:
+            self._commit(pending, report, started)
+        self._update_timing(report, started)
+        logger.info(
+            f"Ingested {report['documents']} documents: {report['added']} chunks added, "
+            f"{report['duplicates']} duplicates, {report['chunks_per_second']:.1f} chunks/s"
+        )
+        return report
+
+    def _split(self, records: Iterable[Dict[str, Any]]) -> Iterator[Optional[List[Chunk]]]:
+        """Chunks per record in input order, or None for a record that failed."""
+        if not self.workers:
+            for record in records:
+                yield self._result(record, lambda: _split_record(record))
+            return
+
+        # Spawned workers import only this module, not the parent's models
+        with ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # Keep the pool a bounded distance ahead of embedding
+            in_flight = deque()
+            for record in records:
+                in_flight.append((record, pool.submit(_split_record, record)))
+                if len(in_flight) >= self.workers * 8:
+                    record, future = in_flight.popleft()
+                    yield self._result(record, future.result)
+            while in_flight:
+                record, future = in_flight.popleft()
+                yield self._result(record, future.result)
+
+    def _result(self, record: Dict[str, Any], split: Callable[[], List[Chunk]]) -> Optional[List[Chunk]]:
+        try:
+            return split()
+        except Exception as e:
+            logger.error(f"Error splitting {record.get('path', 'document')}: {e}")
+            return None
+
+    def _commit(self, chunks: List[Chunk], report: Dict[str, Any], started: float):
+        from langchain.docstore.document import Document
+
+        # One embedding call and one segment per batch
+        self.store.add_documents([Document(page_content=text, metadata=metadata) for text, metadata in chunks])
+        report["added"] += len(chunks)
+        report["batches"] += 1
+        # Fold segments now rather than after the run, keeping the delta bounded
+        if self.store.needs_compaction() and self.store.compact():
+            report["compactions"] += 1
+        self._update_timing(report, started)
+        logger.info(
+            f"Knowledge base ingestion: batch {report['batches']}, {report['added']} chunks added "
+            f"({report['chunks_per_second']:.1f} chunks/s)"
+        )
+        if self.progress:
+            self.progress(dict(report))
+
+    def _update_timing(self, report: Dict[str, Any], started: float):
+        report["seconds"] = time.perf_counter() - started
+        report["chunks_per_second"] = report["chunks"] / report["seconds"] if report["seconds"] else 0.0
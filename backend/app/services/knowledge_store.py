@@ -0,0 +1,465 @@
+"""Append-only on-disk format for the FAISS knowledge base.
+
+    manifest.json        {"version", "base", "segments", "dimension", "index_type", "next_id"}
+    base-000007.faiss    compacted FAISS index (flat, IVF-PQ or HNSW)
+    base-000007.npy      its raw vectors (float32, n x dimension), for retraining
+    base-000007.sqlite   its documents keyed by index position
+    seg-000008.npy       vectors of one add
+    seg-000008.jsonl     their documents
+
+An add writes one small segment and then swaps in a new manifest with
+``os.replace``, so its cost does not depend on the size of the knowledge
+base and a crash leaves either the old or the new manifest, never a torn
+index. Files the manifest does not reference are ignored. Compaction folds
+the segments into a new base from the files on disk, without blocking
+adds; a rebuild does the same with a freshly trained index.
+
+The base index is opened memory-mapped (its inverted lists; flat bases
+are stored as a single-list IVF index for this, HNSW graphs are read into
+memory) and its documents are fetched from SQLite only for search hits,
+so startup and RSS do not grow with the base and workers share the page
+cache. Segments are loaded into a small in-memory delta index searched
+alongside it.
+
+Manifest changes take an ``flock`` and re-read the manifest, so several
+API workers (and ``scripts/kb_index.py``) can share one directory. FAISS
+does not allow adds during a search, so in-process searches share a read
+lock that delta adds and base swaps take exclusively.
+"""
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Set
+
+import faiss
+import numpy as np
+from langchain.docstore.document import Document
+from langchain.embeddings.base import Embeddings
+from langchain.vectorstores import FAISS
+
+from app.services.docstore import (
+    DocumentRow,
+    IndexToDocstoreId,
+    KnowledgeDocstore,
+    read_documents_db,
+    write_documents_db,
+)
+from app.services.vector_index import IndexSettings, build_index, index_type_of, set_search_params
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+LOCK_FILE = "manifest.lock"
+# Folder written by FAISS.save_local before segments existed
+LEGACY_DIR = "vectorstore"
+
+
+def _write_atomic(path: str, write: Callable[[IO], None], mode: str = "w"):
+    """Write a file under a temporary name, sync it and rename it into place."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, mode) as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _write_index(path: str, index: Any):
+    tmp_path = f"{path}.tmp"
+    faiss.write_index(index, tmp_path)
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _document_line(doc_id: str, text: str, metadata: Dict[str, Any]) -> str:
+    return json.dumps({"id": doc_id, "text": text, "metadata": metadata}) + "\n"
+
+
+def _read_documents(path: str) -> Iterator[DocumentRow]:
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            yield record["id"], record["text"], record["metadata"]
+
+
+class _ReadWriteLock:
+    """Any number of readers or one writer; waiting writers hold off new readers."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class KnowledgeStore:
+    """Keeps a LangChain FAISS vector store persisted as a base plus delta segments.
+
+    ``open`` maps the base index and loads the segments' stored vectors
+    into the delta index (no re-embedding). ``add_documents`` embeds,
+    appends a segment and adds it to the delta. Search through
+    ``similarity_search``, which is safe while other threads add. Once ``compact_segments``
+    segments have piled up, ``needs_compaction`` tells the caller to run
+    ``compact`` in the background. ``settings`` picks the index type built
+    by ``rebuild`` and its search parameters.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        embeddings: Optional[Embeddings] = None,
+        compact_segments: int = 16,
+        settings: Optional[IndexSettings] = None
+    ):
+        self.directory = directory
+        self.embeddings = embeddings
+        self.compact_segments = max(1, compact_segments)
+        self.settings = settings or IndexSettings()
+        self.vectorstore: Optional[FAISS] = None
+        self.manifest: Dict[str, Any] = {
+            "version": 0,
+            "base": None,
+            "segments": [],
+            "dimension": None,
+            "index_type": "flat",
+            "next_id": 1
+        }
+        # Shards of the vector store's index, and the segments in the delta
+        self._base_index: Any = None
+        self._delta_index: Any = None
+        self.loaded_segments: List[str] = []
+        # Orders manifest changes and in-memory adds within this process
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        # Searches read the FAISS index while delta adds and base swaps change it
+        self._index_lock = _ReadWriteLock()
+
+        self.compactions = 0
+        self.last_compaction_seconds: Optional[float] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _locked(self) -> Iterator[Dict[str, Any]]:
+        """Hold the manifest lock and yield the manifest as currently on disk."""
+        with self._lock, open(self._path(LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if os.path.exists(self._path(MANIFEST)):
+                with open(self._path(MANIFEST)) as f:
+                    self.manifest = json.load(f)
+            yield self.manifest
+
+    def _write_manifest(self, manifest: Dict[str, Any]):
+        _write_atomic(self._path(MANIFEST), lambda f: json.dump(manifest, f))
+        self.manifest = manifest
+
+    def open(self, initial_text: str, initial_metadata: Dict[str, Any]) -> FAISS:
+        """Load the knowledge base, creating it with one document if there is none."""
+        os.makedirs(self.directory, exist_ok=True)
+
+        if os.path.exists(self._path(MANIFEST)):
+            self._load()
+        elif os.path.isdir(self._path(LEGACY_DIR)):
+            self._migrate_legacy()
+        else:
+            vectors = np.asarray(self.embeddings.embed_documents([initial_text]), dtype=np.float32)
+            self._install(None, vectors.shape[1], [])
+            self._append([initial_text], [initial_metadata], vectors)
+
+        index_type = index_type_of(self._base_index) if self._base_index is not None else "flat"
+        if index_type != self.settings.index_type:
+            logger.warning(
+                f"Knowledge base index is {index_type} but KB_INDEX_TYPE is {self.settings.index_type}; "
+                f"run `python -m scripts.kb_index rebuild` to convert it"
+            )
+
+        logger.info(
+            f"Opened knowledge base with {self.vectorstore.index.ntotal} vectors "
+            f"({index_type}, {len(self.manifest['segments'])} segments)"
+        )
+        return self.vectorstore
+
+    def _load(self):
+        with self._locked() as manifest:
+            base = manifest["base"]
+            if base and not os.path.exists(self._path(f"{base}.sqlite")):
+                # Bases written before the SQLite docstore kept their documents as JSON lines
+                write_documents_db(self._path(f"{base}.sqlite"), _read_documents(self._path(f"{base}.jsonl")))
+                os.remove(self._path(f"{base}.jsonl"))
+            self._install(base, manifest["dimension"], manifest["segments"])
+
+    def _install(self, base: Optional[str], dimension: int, segments: List[str]):
+        """Point the vector store at a memory-mapped base plus the given segments.
+
+        The vector store object is updated in place, since callers keep it.
+        """
+        base_index = faiss.read_index(self._path(f"{base}.faiss"), faiss.IO_FLAG_MMAP) if base else None
+        docstore = KnowledgeDocstore(self._path(f"{base}.sqlite") if base else None)
+        if base_index is not None and base_index.ntotal != docstore.base_count:
+            raise ValueError(f"Knowledge base {base} has {base_index.ntotal} vectors but {docstore.base_count} documents")
+
+        delta_index = faiss.IndexFlatL2(dimension)
+        for segment in segments:
+            ids, texts, metadatas = zip(*_read_documents(self._path(f"{segment}.jsonl")))
+            docstore.add_delta(list(ids), [
+                Document(page_content=text, metadata=metadata) for text, metadata in zip(texts, metadatas)
+            ])
+            delta_index.add(np.load(self._path(f"{segment}.npy")))
+
+        # Positions continue from the base into the delta, as in one index
+        index = faiss.IndexShards(dimension, False, True)
+        if base_index is not None:
+            set_search_params(base_index, self.settings)
+            index.add_shard(base_index)
+        index.add_shard(delta_index)
+        index.syncWithSubIndexes()
+
+        # The shards must outlive the IndexShards that points to them
+        with self._index_lock.write():
+            self._base_index, self._delta_index = base_index, delta_index
+            self.loaded_segments = list(segments)
+            if self.vectorstore is None:
+                self.vectorstore = FAISS(self.embeddings, index, docstore, IndexToDocstoreId(docstore))
+            else:
+                self.vectorstore.docstore = docstore
+                self.vectorstore.index_to_docstore_id = IndexToDocstoreId(docstore)
+                self.vectorstore.index = index
+
+    def _migrate_legacy(self):
+        """Convert a FAISS.save_local folder into the first base."""
+        logger.info("Migrating knowledge base to the segment format...")
+        vectorstore = FAISS.load_local(self._path(LEGACY_DIR), self.embeddings)
+
+        def rows() -> Iterator[DocumentRow]:
+            for position in range(vectorstore.index.ntotal):
+                doc_id = vectorstore.index_to_docstore_id[position]
+                doc = vectorstore.docstore.search(doc_id)
+                yield doc_id, doc.page_content, doc.metadata
+
+        with self._locked():
+            name = "base-000001"
+            vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+            _write_atomic(self._path(f"{name}.npy"), lambda f: np.save(f, vectors), mode="wb")
+            _write_index(self._path(f"{name}.faiss"), build_index(vectors, IndexSettings()))
+            write_documents_db(self._path(f"{name}.sqlite"), rows())
+            self._write_manifest({
+                "version": 1,
+                "base": name,
+                "segments": [],
+                "dimension": vectorstore.index.d,
+                "index_type": "flat",
+                "next_id": 2
+            })
+            self._install(name, vectorstore.index.d, [])
+
+    def add_documents(self, documents: List[Document]) -> List[str]:
+        """Embed documents and append them as a new segment."""
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        return self._append(texts, metadatas, vectors)
+
+    def _append(self, texts: List[str], metadatas: List[Dict[str, Any]], vectors: np.ndarray) -> List[str]:
+        ids = [str(uuid.uuid4()) for _ in texts]
+
+        with self._locked() as manifest:
+            number = manifest["next_id"]
+            segment = f"seg-{number:06d}"
+            _write_atomic(self._path(f"{segment}.npy"), lambda f: np.save(f, vectors), mode="wb")
+            _write_atomic(self._path(f"{segment}.jsonl"), lambda f: f.writelines(
+                _document_line(doc_id, text, metadata) for doc_id, text, metadata in zip(ids, texts, metadatas)
+            ))
+            # The segment exists once the manifest lists it
+            self._write_manifest({
+                **manifest,
+                "version": manifest["version"] + 1,
+                "segments": manifest["segments"] + [segment],
+                "dimension": int(vectors.shape[1]),
+                "next_id": number + 1
+            })
+
+            documents = [
+                Document(page_content=text, metadata=metadata) for text, metadata in zip(texts, metadatas)
+            ]
+            with self._index_lock.write():
+                self.vectorstore.docstore.add_delta(ids, documents)
+                self._delta_index.add(vectors)
+                self.vectorstore.index.syncWithSubIndexes()
+                self.loaded_segments.append(segment)
+
+        return ids
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        """The ``k`` documents nearest to ``query``; safe while other threads add or compact."""
+        # Embed outside the lock so a slow model does not hold up adds
+        embedding = self.embeddings.embed_query(query)
+        with self._index_lock.read():
+            return self.vectorstore.similarity_search_by_vector(embedding, k=k)
+
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """Which chunk hashes (see ``kb_ingest``) the knowledge base already holds."""
+        with self._index_lock.read():
+            return self.vectorstore.docstore.find_hashes(hashes)
+
+    def needs_compaction(self) -> bool:
+        return len(self.manifest["segments"]) >= self.compact_segments
+
+    def compact(self) -> bool:
+        """Fold the current segments into a new base; adds continue meanwhile."""
+        return self._fold(rebuild=False)
+
+    def rebuild(self) -> bool:
+        """Fold everything into a new base with an index trained per ``settings``."""
+        os.makedirs(self.directory, exist_ok=True)
+        return self._fold(rebuild=True)
+
+    def _fold(self, rebuild: bool) -> bool:
+        with self._compact_lock:
+            with self._locked() as manifest:
+                if not manifest["segments"] and not (rebuild and manifest["base"]):
+                    return False
+                # Reserve a name for the new base
+                number = manifest["next_id"]
+                self._write_manifest({**manifest, "next_id": number + 1})
+                snapshot = self.manifest
+
+            started = time.perf_counter()
+            old_base, folded = snapshot["base"], snapshot["segments"]
+            sources = ([old_base] if old_base else []) + folded
+            name = f"base-{number:06d}"
+
+            self._write_vectors(self._path(f"{name}.npy"), sources)
+            vectors = np.load(self._path(f"{name}.npy"), mmap_mode="r")
+            if not rebuild and old_base and snapshot.get("index_type", "flat") != "flat":
+                # Trained indexes take new vectors without retraining
+                index = faiss.read_index(self._path(f"{old_base}.faiss"))
+                for segment in folded:
+                    index.add(np.load(self._path(f"{segment}.npy")))
+            else:
+                index = build_index(vectors, self.settings if rebuild else IndexSettings())
+            _write_index(self._path(f"{name}.faiss"), index)
+            index_type = index_type_of(index)
+            del index
+
+            write_documents_db(self._path(f"{name}.sqlite"), self._source_documents(sources))
+
+            with self._locked() as manifest:
+                if manifest["base"] != old_base or manifest["segments"][:len(folded)] != folded:
+                    logger.warning(f"Knowledge base changed during compaction; discarding {name}")
+                    self._remove_files([name])
+                    return False
+
+                self._write_manifest({
+                    **manifest,
+                    "version": manifest["version"] + 1,
+                    "base": name,
+                    "segments": manifest["segments"][len(folded):],
+                    "index_type": index_type
+                })
+                remaining = self.manifest["segments"]
+                if self.vectorstore is not None and self.loaded_segments == folded + remaining:
+                    # Same vectors in the same order, so positions seen by searches still line up
+                    self._install(name, self.manifest["dimension"], remaining)
+                self._remove_files(sources)
+
+            self.compactions += 1
+            self.last_compaction_seconds = time.perf_counter() - started
+            logger.info(
+                f"{'Rebuilt' if rebuild else 'Compacted'} {len(sources)} knowledge base files into {name} "
+                f"({index_type}, {len(vectors)} vectors) in {self.last_compaction_seconds:.1f}s"
+            )
+            return True
+
+    def _source_documents(self, sources: List[str]) -> Iterator[DocumentRow]:
+        for source in sources:
+            documents_db = self._path(f"{source}.sqlite")
+            if os.path.exists(documents_db):
+                yield from read_documents_db(documents_db)
+            else:
+                yield from _read_documents(self._path(f"{source}.jsonl"))
+
+    def _base_vectors(self, name: str) -> np.ndarray:
+        path = self._path(f"{name}.npy")
+        if os.path.exists(path):
+            return np.load(path, mmap_mode="r")
+        # Bases written before raw vectors were kept are always IndexFlatL2
+        index = faiss.read_index(self._path(f"{name}.faiss"))
+        return index.reconstruct_n(0, index.ntotal)
+
+    def _write_vectors(self, path: str, sources: List[str]):
+        """Concatenate the vectors of bases/segments into one .npy without loading them all."""
+        parts = [
+            self._base_vectors(source) if source.startswith("base-") else np.load(self._path(f"{source}.npy"), mmap_mode="r")
+            for source in sources
+        ]
+        tmp_path = f"{path}.tmp"
+        combined = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32,
+            shape=(sum(len(part) for part in parts), parts[0].shape[1])
+        )
+        offset = 0
+        for part in parts:
+            combined[offset:offset + len(part)] = part
+            offset += len(part)
+        combined.flush()
+        del combined
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _remove_files(self, names: List[str]):
+        for name in names:
+            for extension in (".faiss", ".npy", ".sqlite", ".jsonl"):
+                path = self._path(f"{name}{extension}")
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                except OSError as e:
+                    logger.error(f"Error removing knowledge base file {path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.manifest["version"],
+            "base": self.manifest["base"],
+            "index_type": self.manifest.get("index_type", "flat"),
+            "segments": len(self.manifest["segments"]),
+            "vectors": self.vectorstore.index.ntotal if self.vectorstore else 0,
+            "compactions": self.compactions,
+            "last_compaction_seconds": self.last_compaction_seconds
+        }
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.audio_io import MappedAudio
+from app.services.model_registry import warm_process_pool
+from app.services.vad import VoiceActivityDetector
+from app.services.whisper_backends import create_backend
+
+logger = logging.getLogger(__name__)
+
+# Whisper backend held by each pool worker process
+_worker_backend = None
+
+ProgressCallback = Callable[[float], Awaitable[None]]
+
+
+def find_silence_cuts(
+    audio: MappedAudio,
+    vad: VoiceActivityDetector,
+    target_seconds: float,
+    search_seconds: float = 10.0,
+    smooth_ms: float = 300.0
+) -> List[Tuple[int, int]]:
+    """Split audio into segments of roughly ``target_seconds`` at quiet points.
+
+    Each boundary is placed at the quietest stretch (energy smoothed over
+    ``smooth_ms``) within ``search_seconds`` of the nominal cut, so words are
+    not split between segments. The search never reaches back past half a
+    target from the segment start, so every segment makes progress even when
+    ``search_seconds`` exceeds the target. Only the search windows are read.
+    """
+    sample_rate = audio.sample_rate
+    target = int(target_seconds * sample_rate)
+    search = int(search_seconds * sample_rate)
+    frame = vad.frame_size
+    smooth = np.ones(vad.frames_for(smooth_ms))
+
+    segments = []
+    start = 0
+    while len(audio) - start > target + search:
+        # A long silence at the segment start must not pull the cut back to it
+        lo = max(start + max(1, target // 2), start + target - search)
+        hi = start + target + search
+        energy_db, _ = vad.frame_features(audio.window(lo, hi))
+        quietest = int(np.argmin(np.convolve(energy_db, smooth, mode="same")))
+        cut = lo + quietest * frame
+        segments.append((start, cut))
+        start = cut
+
+    if start < len(audio):
+        segments.append((start, len(audio)))
+    return segments
+
+
+def _init_worker(backend_name: str, model_size: str, torch_threads: int):
+    """Load a private Whisper backend in a pool worker process."""
+    global _worker_backend
+    import torch
+
+    torch.set_num_threads(torch_threads)
+    _worker_backend = create_backend(backend_name, model_size)
+    _worker_backend.load()
+
+
+def _transcribe_segment(description: Dict[str, Any], start: int, end: int) -> Dict[str, Any]:
+    """Transcribe one segment of a mapped file inside a pool worker."""
+    audio = MappedAudio.open(description)
+    try:
+        result = _worker_backend.transcribe(audio.window(start, end))
+    finally:
+        audio.close()
+
+    offset = start / audio.sample_rate
+    return {
+        **result,
+        "segments": [
+            {**segment, "start": segment["start"] + offset, "end": segment["end"] + offset}
+            for segment in result["segments"]
+        ]
+    }
+
+
+def stitch_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Join per-segment results (already in audio order) into one transcript."""
+    return {
+        "text": " ".join(result["text"] for result in results if result["text"]),
+        "segments": [segment for result in results for segment in result["segments"]],
+        "language": next((result["language"] for result in results if result.get("language")), None)
+    }
+
+
+class ParallelTranscriber:
+    """Transcribes long recordings across a pool of processes, one model per worker.
+
+    Every worker keeps its own model, so the pool is registered with the
+    ModelRegistry: ``start`` (its loader) spawns the workers and measures
+    them, and ``shutdown`` (its unloader) frees them when idle or over budget.
+    """
+
+    def __init__(self, backend_name: str, model_size: str, workers: int, torch_threads: Optional[int] = None):
+        self.backend_name = backend_name
+        self.model_size = model_size
+        self.workers = workers
+        # Split the cores between workers instead of letting each use all of them
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // max(1, workers))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Summed RSS of the workers, measured by start()
+        self.resident_bytes = 0
+
+    def start(self) -> "ParallelTranscriber":
+        """Spawn every worker and load its model; blocks until they are ready."""
+        self.resident_bytes = warm_process_pool(self._get_pool(), self.workers)
+        logger.info(f"Started {self.workers} transcription workers ({self.resident_bytes / 2 ** 20:.0f} MiB)")
+        return self
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.backend_name, self.model_size, self.torch_threads)
+            )
+        return self._pool
+
+    async def transcribe(
+        self,
+        audio: MappedAudio,
+        segments: List[Tuple[int, int]],
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """Transcribe ``segments`` of ``audio`` in parallel and stitch them in order."""
+        loop = asyncio.get_event_loop()
+        pool = self._get_pool()
+        description = audio.describe()
+        completed = 0
+
+        async def run_segment(start: int, end: int) -> Dict[str, Any]:
+            nonlocal completed
+            result = await loop.run_in_executor(pool, _transcribe_segment, description, start, end)
+            completed += 1
+            if progress_callback:
+                await progress_callback(completed / len(segments))
+            return result
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*[run_segment(start, end) for start, end in segments])
+        elapsed = time.perf_counter() - started
+
+        logger.info(
+            f"Transcribed {audio.duration:.0f}s in {len(segments)} segments on {self.workers} workers "
+            f"in {elapsed:.1f}s (RTF {elapsed / max(audio.duration, 1e-9):.3f})"
+        )
+        return stitch_results(results)
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,301 @@
+import asyncio
+import ctypes
+import gc
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.services.executors import get_executor
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_bytes() -> int:
+    import psutil
+
+    return psutil.Process(os.getpid()).memory_info().rss
+
+
+def _process_memory() -> Tuple[int, int]:
+    """(pid, RSS) of the calling process; run inside pool workers."""
+    return os.getpid(), _rss_bytes()
+
+
+def warm_process_pool(pool: Executor, workers: int) -> int:
+    """Start a process pool's workers (running their initializers) and return their total RSS.
+
+    Workers that took more than one of the probes are counted once; the
+    total is their mean RSS times ``workers``.
+    """
+    sizes = dict(future.result() for future in [pool.submit(_process_memory) for _ in range(workers)])
+    return int(sum(sizes.values()) / len(sizes) * workers)
+
+
+def _weight_bytes(model: Any) -> int:
+    """Size of the torch weights held by a loaded model, or 0 if it has none.
+
+    Looks at the object itself and the attributes our wrappers keep the
+    module under (pipeline/Whisper ``model``, sentence-transformers ``client``).
+    """
+    for candidate in (model, getattr(model, "model", None), getattr(model, "client", None)):
+        if hasattr(candidate, "parameters") and hasattr(candidate, "buffers"):
+            try:
+                tensors = itertools.chain(candidate.parameters(), candidate.buffers())
+                return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+            except Exception:
+                return 0
+    return 0
+
+
+def _release_memory():
+    """Collect garbage and hand freed heap pages back to the OS where possible."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class _ModelEntry:
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        unloader: Optional[Callable[[Any], None]],
+        measure: Optional[Callable[[Any], int]]
+    ):
+        self.name = name
+        self.loader = loader
+        self.unloader = unloader
+        self.measure = measure
+        self.model: Any = None
+        self.state = "unloaded"
+        # Held while loading, so each model loads once however many callers wait
+        self.load_lock = threading.Lock()
+        self.in_use = 0
+        self.last_used: Optional[float] = None
+        self.resident_bytes = 0
+        self.load_seconds: Optional[float] = None
+        self.loads = 0
+        self.evictions = 0
+
+
+class ModelRegistry:
+    """Loads models on first use and unloads them when idle or over budget.
+
+    Models are registered with a loader (and optional unloader) and used via
+    ``with registry.use(name) as model``, which loads the model if needed
+    and pins it for the duration of the block. Loading is blocking, so call
+    ``use`` from executor threads; different models load in parallel. When
+    the summed resident size of loaded models would exceed ``memory_budget``
+    bytes, the least recently used models that are not in use are unloaded
+    first. Resident size is the size of the model's torch weights, or the
+    process RSS growth while loading for models without any (ONNX,
+    CTranslate2, remote proxies); the latter over-counts when loads overlap.
+    Models held outside this process (worker pools) are registered with a
+    ``measure`` callable that reports their size instead.
+    """
+
+    def __init__(self, memory_budget: int = 0, idle_seconds: float = 0.0):
+        # 0 disables the budget / idle eviction respectively
+        self.memory_budget = memory_budget
+        self.idle_seconds = idle_seconds
+        self._models: Dict[str, _ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._idle_task: Optional[asyncio.Task] = None
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        unloader: Optional[Callable[[Any], None]] = None,
+        measure: Optional[Callable[[Any], int]] = None
+    ):
+        self._models[name] = _ModelEntry(name, loader, unloader, measure)
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._models.get(name)
+        return entry is not None and entry.state == "loaded"
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Any]:
+        """Pin a model (loading it if needed) for the duration of the block."""
+        model = self._acquire(name)
+        try:
+            yield model
+        finally:
+            self._release(name)
+
+    @asynccontextmanager
+    async def use_async(self, name: str, executor: str = "io") -> AsyncIterator[Any]:
+        """``use`` for coroutines: loads on the named executor, pins while the block runs."""
+        loop = asyncio.get_event_loop()
+        model = await loop.run_in_executor(get_executor(executor), self._acquire, name)
+        try:
+            yield model
+        finally:
+            self._release(name)
+
+    def _release(self, name: str):
+        with self._lock:
+            entry = self._models[name]
+            entry.in_use -= 1
+            entry.last_used = time.time()
+
+    def load(self, name: str):
+        """Load a model ahead of its first use."""
+        with self.use(name):
+            pass
+
+    def _acquire(self, name: str) -> Any:
+        entry = self._models[name]
+        with self._lock:
+            if entry.state == "loaded":
+                entry.in_use += 1
+                return entry.model
+
+        with entry.load_lock:
+            with self._lock:
+                if entry.state == "loaded":
+                    entry.in_use += 1
+                    return entry.model
+                entry.state = "loading"
+
+            # Make room using the size measured the last time it was loaded
+            self._enforce_budget(reserve=entry.resident_bytes, keep=name)
+
+            started = time.perf_counter()
+            rss_before = _rss_bytes()
+            try:
+                model = entry.loader()
+            except Exception:
+                with self._lock:
+                    entry.state = "unloaded"
+                raise
+            load_seconds = time.perf_counter() - started
+
+            with self._lock:
+                entry.model = model
+                entry.state = "loaded"
+                if entry.measure:
+                    entry.resident_bytes = entry.measure(model)
+                else:
+                    entry.resident_bytes = _weight_bytes(model) or max(0, _rss_bytes() - rss_before)
+                entry.load_seconds = load_seconds
+                entry.loads += 1
+                entry.in_use += 1
+                entry.last_used = time.time()
+
+            logger.info(
+                f"Loaded model {name} in {load_seconds:.1f}s "
+                f"({entry.resident_bytes / 2 ** 20:.0f} MiB resident)"
+            )
+            self._enforce_budget(keep=name)
+            return model
+
+    def _loaded_bytes(self) -> int:
+        return sum(entry.resident_bytes for entry in self._models.values() if entry.state == "loaded")
+
+    def _enforce_budget(self, reserve: int = 0, keep: Optional[str] = None):
+        """Unload least recently used idle models until the budget is met."""
+        if not self.memory_budget:
+            return
+
+        while self._loaded_bytes() + reserve > self.memory_budget:
+            with self._lock:
+                candidates = [
+                    entry for entry in self._models.values()
+                    if entry.state == "loaded" and entry.in_use == 0 and entry.name != keep
+                ]
+            if not candidates:
+                logger.warning(
+                    f"Model memory budget of {self.memory_budget / 2 ** 20:.0f} MiB exceeded; "
+                    f"all other loaded models are in use"
+                )
+                return
+            victim = min(candidates, key=lambda entry: entry.last_used or 0.0)
+            self.unload(victim.name, reason="memory budget")
+
+    def unload(self, name: str, reason: str = "requested") -> bool:
+        """Unload a model unless it is in use."""
+        entry = self._models[name]
+        with self._lock:
+            if entry.state != "loaded" or entry.in_use:
+                return False
+            model, entry.model = entry.model, None
+            entry.state = "unloaded"
+            entry.evictions += 1
+
+        if entry.unloader:
+            entry.unloader(model)
+        del model
+        _release_memory()
+        logger.info(f"Unloaded model {name} ({reason})")
+        return True
+
+    def evict_idle(self) -> List[str]:
+        """Unload models not used for ``idle_seconds``."""
+        if not self.idle_seconds:
+            return []
+
+        cutoff = time.time() - self.idle_seconds
+        with self._lock:
+            idle = [
+                entry.name for entry in self._models.values()
+                if entry.state == "loaded" and entry.in_use == 0 and (entry.last_used or 0.0) < cutoff
+            ]
+        return [name for name in idle if self.unload(name, reason="idle")]
+
+    def start(self):
+        """Start the background idle-eviction task."""
+        if self.idle_seconds and self._idle_task is None:
+            self._idle_task = asyncio.create_task(self._run_idle_eviction())
+
+    async def stop(self):
+        if self._idle_task:
+            self._idle_task.cancel()
+            try:
+                await self._idle_task
+            except asyncio.CancelledError:
+                pass
+            self._idle_task = None
+
+    async def _run_idle_eviction(self):
+        loop = asyncio.get_event_loop()
+        interval = min(60.0, max(1.0, self.idle_seconds / 2))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(get_executor("io"), self.evict_idle)
+            except Exception as e:
+                logger.error(f"Error evicting idle models: {e}")
+
+    def get_stats(self, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Per-model state, resident size and usage, for ``names`` or all models."""
+        now = time.time()
+        return {
+            entry.name: {
+                "state": entry.state,
+                "resident_mb": entry.resident_bytes / 2 ** 20 if entry.state == "loaded" else 0.0,
+                "in_use": entry.in_use,
+                "idle_seconds": now - entry.last_used if entry.last_used else None,
+                "load_seconds": entry.load_seconds,
+                "loads": entry.loads,
+                "evictions": entry.evictions
+            }
+            for entry in self._models.values()
+            if names is None or entry.name in names
+        }
+
+    def get_summary(self) -> Dict[str, Any]:
+        return {
+            "memory_budget_mb": self.memory_budget / 2 ** 20 if self.memory_budget else None,
+            "loaded_mb": self._loaded_bytes() / 2 ** 20,
+            "idle_seconds": self.idle_seconds or None,
+            "models": self.get_stats()
+        }
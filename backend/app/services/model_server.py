@@ -0,0 +1,280 @@
+"""Shared model server for running several API workers on one set of models.
+
+Start it once per host, then point every API worker at its socket:
+
+    python -m app.services.model_server
+    MODEL_SERVER_SOCKET=data/model-server.sock uvicorn main:app --workers 4
+
+The server hosts Whisper and the transformers pipelines in a ModelRegistry
+(same lazy loading, memory budget and idle eviction as in-process) and
+answers requests over a Unix socket. Clients use the thin proxies below in
+place of the local models (``RemoteEmbeddings`` lives in ``embeddings``).
+
+Requests are pickled, so every connection must authenticate first: with
+``MODEL_SERVER_AUTHKEY``, or else with a random key the server writes to
+``<socket>.key`` (readable by its user only) for clients on the same host.
+The socket itself is created accessible to the server's user only.
+"""
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.services.ai_runtime import (
+    SENTIMENT_MODEL,
+    SUMMARIZATION_MODEL,
+    default_device,
+    load_embeddings,
+    load_pipeline,
+    load_tokenizer,
+)
+from app.services.audio_io import parse_size
+from app.services.model_registry import ModelRegistry
+from app.services.whisper_backends import WhisperBackend, create_backend
+
+logger = logging.getLogger(__name__)
+
+# Methods clients may call on each hosted model
+ALLOWED_METHODS = {
+    "whisper": {"transcribe", "transcribe_batch"},
+    "summarizer": {"__call__"},
+    "sentiment": {"__call__"},
+    "embeddings": {"embed_documents", "embed_query"},
+}
+
+
+class ModelServerError(Exception):
+    """Raised on the client when the model server fails a request."""
+
+
+def _key_path(socket_path: str) -> str:
+    return f"{socket_path}.key"
+
+
+@contextmanager
+def _private_files() -> Iterator[None]:
+    """Create files (and sockets) readable and writable by this user only."""
+    previous = os.umask(0o177)
+    try:
+        yield
+    finally:
+        os.umask(previous)
+
+
+def _server_authkey(socket_path: str) -> bytes:
+    """The configured key, or a new random one published in the key file."""
+    key = os.getenv("MODEL_SERVER_AUTHKEY")
+    if key:
+        return key.encode()
+
+    key = secrets.token_hex(32)
+    tmp_path = f"{_key_path(socket_path)}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    with _private_files(), open(tmp_path, "w") as f:
+        f.write(key)
+    os.replace(tmp_path, _key_path(socket_path))
+    return key.encode()
+
+
+def _client_authkey(socket_path: str) -> bytes:
+    key = os.getenv("MODEL_SERVER_AUTHKEY")
+    if key:
+        return key.encode()
+    try:
+        with open(_key_path(socket_path)) as f:
+            return f.read().strip().encode()
+    except FileNotFoundError:
+        raise ModelServerError(
+            f"No model server key at {_key_path(socket_path)}; start the model server or set MODEL_SERVER_AUTHKEY"
+        )
+
+
+class ModelServer:
+    """Serves inference requests for registry models over a Unix socket.
+
+    Each client connection gets a thread. A request is a tuple
+    ``(op, model, method, args, kwargs)``; the reply is ``("ok", result)``
+    or ``("error", message)``. Calls on one model are serialized, since
+    Whisper's decoder installs hooks on the shared module.
+    """
+
+    def __init__(self, socket_path: str, models: ModelRegistry, info: Optional[Dict[str, Any]] = None):
+        self.socket_path = socket_path
+        self.models = models
+        self.info = info or {}
+        self._model_locks = {name: threading.Lock() for name in ALLOWED_METHODS}
+        self.requests = 0
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+
+        authkey = _server_authkey(self.socket_path)
+        # Bound with the umask applied, so the socket is never open to other users
+        with _private_files():
+            listener = Listener(self.socket_path, family="AF_UNIX", authkey=authkey)
+        with listener:
+            logger.info(f"Model server listening on {self.socket_path}")
+            while True:
+                try:
+                    connection = listener.accept()
+                except Exception as e:
+                    logger.error(f"Rejected model server connection: {e}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+
+    def _serve_connection(self, connection: Connection):
+        with connection:
+            while True:
+                try:
+                    op, model, method, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return
+
+                try:
+                    reply = ("ok", self._handle(op, model, method, args, kwargs))
+                except Exception as e:
+                    logger.error(f"Model server error in {model}.{method}: {e}")
+                    reply = ("error", f"{type(e).__name__}: {e}")
+
+                try:
+                    connection.send(reply)
+                except (EOFError, OSError):
+                    return
+
+    def _handle(self, op: str, model: str, method: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        self.requests += 1
+        if op == "info":
+            return {**self.info, "models": self.models.get_stats(), "requests": self.requests}
+        if op != "call" or method not in ALLOWED_METHODS.get(model, ()):
+            raise ValueError(f"Unsupported request {op} {model}.{method}")
+
+        with self.models.use(model) as instance, self._model_locks[model]:
+            return getattr(instance, method)(*args, **kwargs)
+
+
+class ModelClient:
+    """Client side of the model server, safe to share between threads.
+
+    Keeps a small pool of socket connections so concurrent executor
+    threads do not wait on each other's round trips.
+    """
+
+    def __init__(self, socket_path: str, pool_size: int = 8):
+        self.socket_path = socket_path
+        self._idle: "queue.LifoQueue[Connection]" = queue.LifoQueue(maxsize=pool_size)
+
+    def _connect(self) -> Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            # Read per connection, so a restarted server's new key is picked up
+            return Client(self.socket_path, family="AF_UNIX", authkey=_client_authkey(self.socket_path))
+
+    def _request(self, op: str, model: str = "", method: str = "", args=(), kwargs=None) -> Any:
+        connection = self._connect()
+        try:
+            connection.send((op, model, method, list(args), kwargs or {}))
+            status, result = connection.recv()
+        except BaseException:
+            # A half-finished exchange leaves the connection unusable
+            connection.close()
+            raise
+
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+        if status != "ok":
+            raise ModelServerError(result)
+        return result
+
+    def call(self, model: str, method: str, *args, **kwargs) -> Any:
+        return self._request("call", model, method, args, kwargs)
+
+    def info(self) -> Dict[str, Any]:
+        return self._request("info")
+
+
+class RemotePipeline:
+    """Stands in for a transformers pipeline hosted by the model server."""
+
+    def __init__(self, client: ModelClient, name: str, tokenizer_model: Optional[str] = None):
+        self.client = client
+        self.name = name
+        self.tokenizer_model = tokenizer_model
+
+    @property
+    def tokenizer(self):
+        """Local tokenizer for token counting (small, unlike the model)."""
+        return load_tokenizer(self.tokenizer_model)
+
+    def __call__(self, inputs: Any, **kwargs) -> Any:
+        return self.client.call(self.name, "__call__", inputs, **kwargs)
+
+
+def _evict_idle_forever(models: ModelRegistry):
+    interval = min(60.0, max(1.0, models.idle_seconds / 2))
+    while True:
+        time.sleep(interval)
+        try:
+            models.evict_idle()
+        except Exception as e:
+            logger.error(f"Error evicting idle models: {e}")
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    socket_path = os.getenv("MODEL_SERVER_SOCKET", "data/model-server.sock")
+    runtime = os.getenv("AI_RUNTIME", "torch")
+    onnx_dir = os.getenv("ONNX_MODEL_DIR", "data/onnx")
+    device = default_device()
+
+    models = ModelRegistry(
+        memory_budget=parse_size(os.getenv("MODEL_MEMORY_BUDGET", "0")),
+        idle_seconds=float(os.getenv("MODEL_IDLE_SECONDS", "900"))
+    )
+
+    whisper = create_backend(os.getenv("WHISPER_BACKEND", "openai-whisper"), os.getenv("WHISPER_MODEL_SIZE", "base"))
+
+    def load_whisper() -> WhisperBackend:
+        whisper.load()
+        return whisper
+
+    def unload_whisper(backend: WhisperBackend):
+        backend.model = None
+
+    models.register("whisper", load_whisper, unload_whisper)
+    models.register("summarizer", lambda: load_pipeline(
+        "summarization", SUMMARIZATION_MODEL, runtime=runtime, onnx_dir=onnx_dir, device=device
+    ))
+    models.register("sentiment", lambda: load_pipeline(
+        "sentiment-analysis", SENTIMENT_MODEL, runtime=runtime, onnx_dir=onnx_dir, device=device
+    ))
+    models.register("embeddings", load_embeddings)
+
+    if os.getenv("MODEL_LAZY_LOADING", "true").lower() != "true":
+        for name in ALLOWED_METHODS:
+            models.load(name)
+
+    if models.idle_seconds:
+        threading.Thread(target=_evict_idle_forever, args=(models,), daemon=True).start()
+
+    server = ModelServer(socket_path, models, info={"whisper": whisper.model_name, "runtime": runtime})
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
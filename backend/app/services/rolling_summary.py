@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# summarize(text, max_length, min_length) -> summary text
+SummarizeFn = Callable[[str, int, int], Awaitable[str]]
+
+
+class RollingSummary:
+    """Incremental hierarchical summary of one meeting's transcript.
+
+    New text collects in a tail buffer. Each time ``window_words`` words have
+    arrived the window is summarized into a level-0 node; whenever a level
+    holds ``fan_in`` nodes they are reduced into one node on the level
+    above. Nodes are never revisited, so each chunk costs at most one
+    window summary, an occasional branch reduction and the final reduction
+    of the open frontier (older levels first, then the raw tail).
+    """
+
+    def __init__(
+        self,
+        summarize: SummarizeFn,
+        window_words: int = 400,
+        fan_in: int = 4,
+        node_max_length: int = 80,
+        node_min_length: int = 20
+    ):
+        self.summarize = summarize
+        self.window_words = window_words
+        self.fan_in = fan_in
+        self.node_max_length = node_max_length
+        self.node_min_length = node_min_length
+        # levels[0] holds window summaries; higher levels cover more of the meeting
+        self.levels: List[List[str]] = []
+        self.tail: List[str] = []
+        self.word_count = 0
+        self.action_items: List[str] = []
+        self.summary: Optional[str] = None
+        self.summary_calls = 0
+        self._lock = asyncio.Lock()
+
+    async def add_text(self, text: str) -> bool:
+        """Append transcript text, summarizing any windows it completes.
+
+        Returns True if the frontier changed and the summary is stale.
+        """
+        words = text.split()
+        if not words:
+            return False
+
+        async with self._lock:
+            self.tail.extend(words)
+            self.word_count += len(words)
+
+            while len(self.tail) >= self.window_words:
+                window = " ".join(self.tail[:self.window_words])
+                del self.tail[:self.window_words]
+                await self._push(0, await self._summarize_node(window))
+
+            self.summary = None
+            return True
+
+    async def _push(self, level: int, node: str):
+        """Add a node to a level, reducing the branch upward when it fills."""
+        while len(self.levels) <= level:
+            self.levels.append([])
+        self.levels[level].append(node)
+
+        if len(self.levels[level]) >= self.fan_in:
+            children = self.levels[level]
+            self.levels[level] = []
+            await self._push(level + 1, await self._summarize_node(" ".join(children)))
+
+    async def _summarize_node(self, text: str) -> str:
+        self.summary_calls += 1
+        return await self.summarize(text, self.node_max_length, self.node_min_length)
+
+    def frontier(self) -> List[str]:
+        """Open nodes in chronological order, followed by the unsummarized tail."""
+        parts = [node for level in reversed(self.levels) for node in level]
+        if self.tail:
+            parts.append(" ".join(self.tail))
+        return parts
+
+    async def get_summary(self, max_length: int = 150, min_length: int = 30) -> str:
+        """Reduce the frontier into one summary covering the whole meeting."""
+        async with self._lock:
+            if self.summary is None:
+                parts = self.frontier()
+                if len(parts) == 1 and not self.tail:
+                    self.summary = parts[0]
+                else:
+                    self.summary_calls += 1
+                    self.summary = await self.summarize(" ".join(parts), max_length, min_length)
+            return self.summary
+
+    def add_action_items(self, items: List[str], limit: int = 10):
+        """Keep the most recent distinct action items."""
+        for item in items:
+            if item in self.action_items:
+                self.action_items.remove(item)
+            self.action_items.append(item)
+        del self.action_items[:-limit]
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncContextManager, Callable, ContextManager, List, Optional
+
+from app.services.ai_runtime import SUMMARIZATION_MODEL, load_pipeline, load_tokenizer
+from app.services.executors import get_executor
+from app.services.model_registry import warm_process_pool
+
+logger = logging.getLogger(__name__)
+
+# Summarization pipeline owned by each pool worker process
+_worker_summarizer = None
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_token_windows(tokenizer, text: str, max_tokens: int) -> List[str]:
+    """Pack whole sentences into windows of at most ``max_tokens`` tokens.
+
+    Token counts come from the model's own tokenizer, so windows fill the
+    model's input instead of approximating it with words. A sentence longer
+    than a window is cut at token boundaries.
+    """
+    sentences = [sentence for sentence in _SENTENCE_END.split(text.strip()) if sentence]
+    if not sentences:
+        return []
+
+    token_ids = tokenizer(sentences, add_special_tokens=False)["input_ids"]
+
+    windows = []
+    current: List[str] = []
+    current_tokens = 0
+    for sentence, ids in zip(sentences, token_ids):
+        if len(ids) > max_tokens:
+            if current:
+                windows.append(" ".join(current))
+                current, current_tokens = [], 0
+            for start in range(0, len(ids), max_tokens):
+                windows.append(tokenizer.decode(ids[start:start + max_tokens]).strip())
+            continue
+
+        if current_tokens + len(ids) > max_tokens:
+            windows.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += len(ids)
+
+    if current:
+        windows.append(" ".join(current))
+    return windows
+
+
+def _init_worker(runtime: str, onnx_dir: str, torch_threads: int):
+    """Load a private summarization pipeline in a pool worker process."""
+    global _worker_summarizer
+    import torch
+
+    torch.set_num_threads(torch_threads)
+    _worker_summarizer = load_pipeline("summarization", SUMMARIZATION_MODEL, runtime=runtime, onnx_dir=onnx_dir)
+
+
+def _summarize_window(text: str, max_length: int, min_length: int) -> str:
+    """Summarize one window inside a pool worker."""
+    result = _worker_summarizer(text, max_length=max_length, min_length=min_length, do_sample=False, truncation=True)
+    return result[0]["summary_text"]
+
+
+class MapReduceSummarizer:
+    """Summarizes text of any length by map-reducing over token windows.
+
+    The text is split into model-sized windows, each window is summarized
+    (across a process pool when ``workers`` > 0, otherwise in padded
+    batches on the in-process pipeline), and the joined partial summaries
+    are reduced the same way until they fit a single window.
+    ``use_summarizer`` returns a context manager yielding that pipeline;
+    windows are counted with the tokenizer alone, so splitting never loads
+    the model.
+    Pool workers each keep their own pipeline; ``use_pool`` returns an
+    async context manager that pins the pool while it is used, so it can
+    be registered with the ModelRegistry (``start`` loads it, ``shutdown``
+    frees it).
+    """
+
+    def __init__(
+        self,
+        use_summarizer: Callable[[], ContextManager[Any]],
+        runtime: str = "torch",
+        onnx_dir: str = "data/onnx",
+        workers: int = 0,
+        window_tokens: int = 1000,
+        partial_max_length: int = 120,
+        partial_min_length: int = 30,
+        batch_size: int = 4,
+        torch_threads: Optional[int] = None,
+        use_pool: Optional[Callable[[], AsyncContextManager[Any]]] = None
+    ):
+        self.use_summarizer = use_summarizer
+        self.use_pool = use_pool
+        self.runtime = runtime
+        self.onnx_dir = onnx_dir
+        self.workers = workers
+        self.window_tokens = window_tokens
+        self.partial_max_length = partial_max_length
+        self.partial_min_length = partial_min_length
+        self.batch_size = batch_size
+        # Split the cores between workers instead of letting each use all of them
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // max(1, workers))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Summed RSS of the workers, measured by start()
+        self.resident_bytes = 0
+
+    def start(self) -> "MapReduceSummarizer":
+        """Spawn every worker and load its pipeline; blocks until they are ready."""
+        self.resident_bytes = warm_process_pool(self._get_pool(), self.workers)
+        logger.info(f"Started {self.workers} summarization workers ({self.resident_bytes / 2 ** 20:.0f} MiB)")
+        return self
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.runtime, self.onnx_dir, self.torch_threads)
+            )
+        return self._pool
+
+    def split(self, text: str) -> List[str]:
+        tokenizer = load_tokenizer(SUMMARIZATION_MODEL, self.runtime, self.onnx_dir)
+        return split_token_windows(tokenizer, text, self.window_tokens)
+
+    async def summarize(self, text: str, max_length: int = 150, min_length: int = 30) -> str:
+        """Summarize ``text`` whatever its length."""
+        loop = asyncio.get_event_loop()
+        windows = await loop.run_in_executor(get_executor("nlp"), lambda: self.split(text))
+        if not windows:
+            return ""
+
+        level = 0
+        started = time.perf_counter()
+        while len(windows) > 1:
+            partials = await self._summarize_all(windows, self.partial_max_length, self.partial_min_length)
+            logger.info(f"Map-reduce level {level}: {len(windows)} windows -> {len(partials)} partial summaries")
+            joined = " ".join(partials)
+            windows = await loop.run_in_executor(get_executor("nlp"), lambda: self.split(joined))
+            level += 1
+
+        summary = (await self._summarize_all(windows, max_length, min_length))[0]
+        if level:
+            logger.info(f"Map-reduce summary over {level} levels in {time.perf_counter() - started:.1f}s")
+        return summary
+
+    async def _summarize_all(self, windows: List[str], max_length: int, min_length: int) -> List[str]:
+        loop = asyncio.get_event_loop()
+
+        if self.workers > 0 and len(windows) > 1:
+            if self.use_pool:
+                async with self.use_pool():
+                    return await self._summarize_on_pool(windows, max_length, min_length)
+            return await self._summarize_on_pool(windows, max_length, min_length)
+
+        results = await loop.run_in_executor(get_executor("nlp"), lambda: self._summarize_batch(windows, max_length, min_length))
+        return [result["summary_text"] for result in results]
+
+    async def _summarize_on_pool(self, windows: List[str], max_length: int, min_length: int) -> List[str]:
+        loop = asyncio.get_event_loop()
+        pool = self._get_pool()
+        return list(await asyncio.gather(*[
+            loop.run_in_executor(pool, _summarize_window, window, max_length, min_length)
+            for window in windows
+        ]))
+
+    def _summarize_batch(self, windows: List[str], max_length: int, min_length: int) -> List[dict]:
+        with self.use_summarizer() as summarizer:
+            return summarizer(
+                windows,
+                max_length=max_length,
+                min_length=min_length,
+                do_sample=False,
+                truncation=True,
+                batch_size=min(len(windows), self.batch_size)
+            )
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -1,115 +1,435 @@
-import whisper
-import torch
 import asyncio
+import hashlib
 import logging
 import io
 import wave
 import numpy as np
 from pydub import AudioSegment
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 import tempfile
 import os
 
+from app.services.audio_decoder import StreamingAudioDecoder
+from app.services.audio_io import MappedAudio, load_audio_mmap, parse_size
+from app.services.batching import MicroBatcher
+from app.services.cache import DiskLRUCache, content_key, file_digest, update_digest
+from app.services.executors import get_executor
+from app.services.model_registry import ModelRegistry
+from app.services.long_form import ParallelTranscriber, ProgressCallback, find_silence_cuts, stitch_results
+from app.services.transcription_session import TranscriptionSession, TranscriptCallback
+from app.services.vad import VoiceActivityDetector
+from app.services.whisper_backends import MAX_CHUNK_SECONDS, WhisperBackend, create_backend
+
 logger = logging.getLogger(__name__)
 
 class TranscriptionService:
     """Service for real-time audio transcription using Whisper."""
     
-    def __init__(self, model_size: str = "base"):
+    def __init__(self, model_size: str = "base", backend: Optional[str] = None, models: Optional[ModelRegistry] = None):
         self.model_size = model_size
-        self.model = None
-        self.audio_buffer = bytearray()
-        self.is_processing = False
+        # Whisper is loaded on first use and may be unloaded when idle
+        self.models = models or ModelRegistry()
+        self.lazy_loading = os.getenv("MODEL_LAZY_LOADING", "true").lower() == "true"
+        self.initialized = False
+        # Inference engine: openai-whisper, torch-int8 or faster-whisper, or
+        # the shared model server when MODEL_SERVER_SOCKET is set
+        self.remote = bool(os.getenv("MODEL_SERVER_SOCKET"))
+        self.backend_name = backend or ("remote" if self.remote else os.getenv("WHISPER_BACKEND", "openai-whisper"))
+        self.backend: WhisperBackend = create_backend(self.backend_name, model_size)
         self.sample_rate = 16000
-        self.chunk_duration = 3.0  # seconds
-        self.min_chunk_size = int(self.sample_rate * self.chunk_duration)
+        # Chunks end at speech pauses, or are force-cut at this length
+        self.max_chunk_duration = float(os.getenv("TRANSCRIPTION_MAX_CHUNK_SECONDS", "10"))
+        if self.max_chunk_duration > MAX_CHUNK_SECONDS:
+            logger.warning(
+                f"TRANSCRIPTION_MAX_CHUNK_SECONDS={self.max_chunk_duration:g} exceeds Whisper's "
+                f"{MAX_CHUNK_SECONDS:g} s window; using {MAX_CHUNK_SECONDS:g}"
+            )
+            self.max_chunk_duration = MAX_CHUNK_SECONDS
+        self.min_silence_ms = float(os.getenv("VAD_MIN_SILENCE_MS", "500"))
+        # Audio repeated at the start of the next chunk after a forced cut
+        self.overlap_ms = float(os.getenv("TRANSCRIPTION_OVERLAP_MS", "1000"))
+        # Streaming mode emits partial hypotheses for speech still in progress
+        self.streaming = os.getenv("TRANSCRIPTION_STREAMING", "false").lower() == "true"
+        self.partial_interval_ms = float(os.getenv("TRANSCRIPTION_PARTIAL_INTERVAL_MS", "1000"))
+        self.vad = VoiceActivityDetector(
+            sample_rate=self.sample_rate,
+            energy_threshold_db=float(os.getenv("VAD_ENERGY_THRESHOLD_DB", "-50"))
+        )
+        self.max_buffer_seconds = float(os.getenv("TRANSCRIPTION_MAX_BUFFER_SECONDS", "60"))
+        # Uploaded files are transcribed in windows of this length to keep memory flat;
+        # a live chunk may wait for one window's decode on a shared model
+        self.file_window_seconds = float(os.getenv("TRANSCRIPTION_FILE_WINDOW_SECONDS", "120"))
+        # Files at least this long are split at silences and spread over a process pool
+        self.long_file_seconds = float(os.getenv("TRANSCRIPTION_LONG_FILE_SECONDS", "300"))
+        self.file_segment_seconds = float(os.getenv("TRANSCRIPTION_FILE_SEGMENT_SECONDS", "120"))
+        # Local worker processes would only queue on the model server
+        file_workers = 0 if self.remote else int(os.getenv("TRANSCRIPTION_FILE_WORKERS", "2"))
+        self.parallel = ParallelTranscriber(self.backend_name, model_size, file_workers) if file_workers > 0 else None
+        # Finished file transcripts keyed by decoded audio, model and options
+        cache_size = parse_size(os.getenv("TRANSCRIPT_CACHE_SIZE", "500MB"))
+        self.cache = DiskLRUCache(
+            os.getenv("TRANSCRIPT_CACHE_DIR", "data/cache/transcripts"),
+            cache_size
+        ) if cache_size > 0 else None
+        # Per-meeting sessions: meeting_id -> session
+        self.sessions: Dict[str, TranscriptionSession] = {}
+        # Chunks from all meetings are decoded together in padded batches
+        self.batcher = MicroBatcher(
+            "whisper",
+            self._transcribe_batch,
+            max_batch_size=int(os.getenv("WHISPER_BATCH_SIZE", "8")),
+            max_wait_ms=float(os.getenv("WHISPER_BATCH_MAX_WAIT_MS", "50")),
+            work_units=lambda request: len(request[0]) / self.sample_rate,
+            executor=get_executor("audio")
+        )
     
     async def initialize(self):
-        """Initialize the Whisper model."""
+        """Register the Whisper model, loading it now unless lazy loading is on."""
         try:
-            logger.info(f"Loading Whisper model: {self.model_size}")
-            # Load model in a thread to avoid blocking
+            self.models.register("whisper", self._load_backend, self._unload_backend)
+            if self.parallel:
+                # Each pool worker holds a Whisper copy, charged to the memory budget
+                self.models.register(
+                    "whisper-pool",
+                    self.parallel.start,
+                    lambda parallel: parallel.shutdown(),
+                    measure=lambda parallel: parallel.resident_bytes
+                )
+            # Resolve the model name used in cache keys before the first request
             loop = asyncio.get_event_loop()
-            self.model = await loop.run_in_executor(
-                None, 
-                lambda: whisper.load_model(self.model_size)
-            )
-            logger.info("Whisper model loaded successfully")
+            await loop.run_in_executor(get_executor("io"), self.backend.connect)
+            self.initialized = True
+            
+            if not self.lazy_loading:
+                logger.info(f"Loading Whisper model: {self.backend.model_name}")
+                # Load model in a thread to avoid blocking
+                await loop.run_in_executor(get_executor("audio"), lambda: self.models.load("whisper"))
+                logger.info("Whisper model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading Whisper model: {e}")
             raise
     
+    def _load_backend(self) -> WhisperBackend:
+        self.backend.load()
+        return self.backend
+    
+    def _unload_backend(self, backend: WhisperBackend):
+        backend.model = None
+    
     def is_ready(self) -> bool:
-        """Check if the service is ready."""
-        return self.model is not None
+        """Check if the service can accept work (the model may still be unloaded)."""
+        return self.initialized
     
-    async def process_audio_chunk(self, audio_data: bytes) -> Optional[Dict[str, Any]]:
-        """Process incoming audio chunk for transcription."""
-        if not self.is_ready():
-            logger.warning("Transcription service not ready")
-            return None
+    def get_model_stats(self) -> Dict[str, Any]:
+        """Load state and resident size of the Whisper model and its file worker pool."""
+        return self.models.get_stats(["whisper", "whisper-pool"])
+    
+    def open_session(self, meeting_id: str, on_transcript: Optional[TranscriptCallback] = None) -> TranscriptionSession:
+        """Get or create the transcription session for a meeting."""
+        session = self.sessions.get(meeting_id)
         
-        # Add to buffer
-        self.audio_buffer.extend(audio_data)
+        if session is None:
+            session = TranscriptionSession(
+                meeting_id,
+                self.vad,
+                on_transcript=on_transcript,
+                sample_rate=self.sample_rate,
+                max_chunk_duration=self.max_chunk_duration,
+                min_silence_ms=self.min_silence_ms,
+                max_buffer_seconds=self.max_buffer_seconds,
+                streaming=self.streaming,
+                partial_interval_ms=self.partial_interval_ms,
+                overlap_ms=self.overlap_ms
+            )
+            session.worker = asyncio.create_task(self._run_session(session))
+            self.sessions[meeting_id] = session
+            logger.info(f"Opened transcription session for meeting {meeting_id}")
         
-        # Check if we have enough data to process
-        if len(self.audio_buffer) < self.min_chunk_size * 2:  # 2 bytes per sample
-            return None
+        session.connections += 1
+        return session
+    
+    async def close_session(self, meeting_id: str):
+        """Release a connection's hold on a session, tearing it down after the last one."""
+        session = self.sessions.get(meeting_id)
+        if session is None:
+            return
         
-        # Don't process if already processing
-        if self.is_processing:
-            return None
+        session.connections -= 1
+        if session.connections > 0:
+            return
         
-        try:
-            self.is_processing = True
-            
-            # Extract chunk for processing
-            chunk_data = bytes(self.audio_buffer[:self.min_chunk_size * 2])
-            self.audio_buffer = self.audio_buffer[self.min_chunk_size:]
+        del self.sessions[meeting_id]
+        
+        # Let the worker transcribe any trailing speech before it exits
+        session.closed = True
+        session.data_ready.set()
+        if session.worker:
+            try:
+                await asyncio.wait_for(session.worker, timeout=30.0)
+            except asyncio.TimeoutError:
+                logger.warning(f"Timed out flushing transcription session for meeting {meeting_id}")
+            except asyncio.CancelledError:
+                pass
+        
+        stats = session.get_stats()
+        logger.info(
+            f"Closed transcription session for meeting {meeting_id}: "
+            f"{stats['chunks_transcribed']} chunks, {stats['skipped_seconds']:.1f}s silence skipped, "
+            f"{stats['dropped_seconds']:.1f}s dropped"
+        )
+    
+    def create_decoder(self) -> StreamingAudioDecoder:
+        """Create decoder state for one audio connection."""
+        return StreamingAudioDecoder(target_sample_rate=self.sample_rate)
+    
+    async def process_audio_chunk(
+        self,
+        meeting_id: str,
+        audio_data: bytes,
+        decoder: Optional[StreamingAudioDecoder] = None
+    ):
+        """Decode an incoming audio chunk into the meeting's session buffer.
+        
+        With a connection ``decoder`` the bytes may be WebM/Ogg Opus from
+        MediaRecorder; without one they are taken as raw 16-bit PCM.
+        Transcription happens on the session's worker task; results are
+        delivered through the session's ``on_transcript`` callback with a
+        ``status`` of ``final`` (or ``partial`` in streaming mode).
+        """
+        session = self.sessions.get(meeting_id)
+        if session is None:
+            logger.warning(f"No transcription session for meeting {meeting_id}")
+            return
+        
+        if decoder is None:
+            session.write_pcm(audio_data)
+            return
+        
+        samples = decoder.decode(audio_data)
+        if len(samples):
+            session.write_samples(samples)
+    
+    async def _run_session(self, session: TranscriptionSession):
+        """Transcribe speech segments for one session as they become available."""
+        while True:
+            await session.data_ready.wait()
+            session.data_ready.clear()
             
-            # Convert to numpy array
-            audio_np = self._bytes_to_numpy(chunk_data)
+            if not self.is_ready():
+                logger.warning("Transcription service not ready")
+                if session.closed:
+                    return
+                continue
             
-            # Transcribe
-            result = await self._transcribe_audio(audio_np)
+            while True:
+                chunk = session.next_chunk(flush=session.closed)
+                if chunk is None:
+                    break
+                
+                try:
+                    session.is_processing = True
+                    transcript_chunk = await self._transcribe_chunk(chunk, prompt=session.prompt)
+                    session.chunks_transcribed += 1
+                    
+                    if transcript_chunk:
+                        transcript_chunk = session.make_final(transcript_chunk)
+                    
+                    if transcript_chunk and session.on_transcript:
+                        await session.on_transcript(transcript_chunk)
+                        
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error processing audio for meeting {session.meeting_id}: {e}")
+                finally:
+                    session.is_processing = False
             
-            if result and result.get("text", "").strip():
-                return {
-                    "text": result["text"].strip(),
-                    "confidence": getattr(result, 'confidence', None),
-                    "language": getattr(result, 'language', 'en')
-                }
+            # Speech is still in progress: offer the growing window as a partial
+            window = None if session.closed else session.next_partial()
+            if window is not None:
+                try:
+                    transcript_chunk = await self._transcribe_chunk(window)
+                    if transcript_chunk and session.on_transcript:
+                        await session.on_transcript(session.make_partial(transcript_chunk))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error decoding partial for meeting {session.meeting_id}: {e}")
             
-        except Exception as e:
-            logger.error(f"Error processing audio chunk: {e}")
-        finally:
-            self.is_processing = False
+            if session.closed:
+                return
+    
+    async def _transcribe_chunk(self, audio_np: np.ndarray, prompt: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Transcribe one chunk of session audio into a transcript message."""
+        result = await self._transcribe_audio(audio_np, prompt=prompt)
+        
+        # Same rule Whisper uses to discard hallucinated text on silent windows
+        if result and result.get("no_speech_prob", 0.0) > 0.6 and result.get("confidence", 1.0) < np.exp(-1.0):
+            return None
+        
+        if result and result.get("text", "").strip():
+            return {
+                "text": result["text"].strip(),
+                "confidence": result.get("confidence"),
+                "language": result.get("language", "en")
+            }
         
         return None
     
-    async def transcribe_file(self, file_path: str) -> str:
-        """Transcribe an entire audio file."""
+    async def transcribe_file(self, file_path: str, progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Transcribe an entire audio file.
+        
+        Returns the transcript text, timestamped segments and detected
+        language. ``progress_callback`` is awaited with the completed
+        fraction after each window or segment.
+        
+        Results are cached by content: ``cache_key`` identifies the entry,
+        ``cached`` marks a hit, and a hit carries any ``insights`` stored
+        for it with ``store_insights``.
+        """
         if not self.is_ready():
             raise RuntimeError("Transcription service not ready")
         
         try:
             logger.info(f"Transcribing file: {file_path}")
-            
-            # Run transcription in executor to avoid blocking
             loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.model.transcribe(file_path)
+            
+            # A byte-identical re-upload is answered without decoding
+            if self.cache:
+                file_key = await loop.run_in_executor(get_executor("io"), lambda: self._file_cache_key(file_path))
+                cached = await loop.run_in_executor(get_executor("io"), lambda: self._cached_result(file_key))
+                if cached:
+                    self.cache.record(True)
+                    logger.info(f"Transcript cache hit for {file_path}")
+                    return cached
+            
+            # Decode/map from disk and transcribe in executor to avoid blocking
+            audio = await loop.run_in_executor(
+                get_executor("io"),
+                lambda: load_audio_mmap(file_path, self.sample_rate)
             )
             
-            return result["text"]
+            try:
+                cache_key = None
+                if self.cache:
+                    cache_key = await loop.run_in_executor(get_executor("io"), lambda: self._audio_cache_key(audio))
+                    cached = await loop.run_in_executor(get_executor("io"), lambda: self._cached_result(cache_key))
+                    # Both lookups together count as one hit or miss
+                    self.cache.record(bool(cached))
+                    if cached:
+                        # Same audio under different bytes (re-encoded, renamed container)
+                        await loop.run_in_executor(get_executor("io"), lambda: self.cache.set(file_key, {"key": cache_key}))
+                        logger.info(f"Transcript cache hit for decoded audio of {file_path}")
+                        return cached
+                
+                result = await self._transcribe_mapped(audio, progress_callback)
+            finally:
+                audio.close()
+            
+            if self.cache:
+                await loop.run_in_executor(get_executor("io"), lambda: self._cache_result(file_key, cache_key, result))
+            
+            return {**result, "cache_key": cache_key, "cached": False}
             
         except Exception as e:
             logger.error(f"Error transcribing file: {e}")
             raise
     
-    async def _transcribe_audio(self, audio_np: np.ndarray) -> Optional[Dict[str, Any]]:
-        """Transcribe numpy audio array."""
+    async def _transcribe_mapped(self, audio: MappedAudio, progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Run Whisper over mapped audio on the process pool or window by window."""
+        loop = asyncio.get_event_loop()
+        
+        if self.parallel and audio.duration >= self.long_file_seconds:
+            segments = await loop.run_in_executor(
+                get_executor("files"),
+                lambda: find_silence_cuts(audio, self.vad, self.file_segment_seconds)
+            )
+            async with self.models.use_async("whisper-pool", "files") as parallel:
+                return await parallel.transcribe(audio, segments, progress_callback)
+        
+        # Windows are cut at quiet points and transcribed one at a time,
+        # so only the current window is paged in
+        windows = await loop.run_in_executor(
+            get_executor("files"),
+            lambda: find_silence_cuts(audio, self.vad, self.file_window_seconds)
+        )
+        results = []
+        for start, end in windows:
+            results.append(await loop.run_in_executor(
+                get_executor("files"),
+                lambda: self._transcribe_window(audio, start, end)
+            ))
+            if progress_callback:
+                await progress_callback(len(results) / len(windows))
+        
+        return stitch_results(results)
+    
+    def _cache_options(self) -> Dict[str, Any]:
+        """Settings that change the transcript of a file."""
+        return {
+            "model": self.backend.model_name,
+            "sample_rate": self.sample_rate,
+            "window_seconds": self.file_window_seconds,
+            "segment_seconds": self.file_segment_seconds,
+            "long_file_seconds": self.long_file_seconds if self.parallel else None,
+            "vad_threshold_db": self.vad.energy_threshold_db
+        }
+    
+    def _file_cache_key(self, file_path: str) -> str:
+        """Key for the raw file bytes; found without decoding the audio."""
+        return content_key("file", file_digest(file_path), self._cache_options())
+    
+    def _audio_cache_key(self, audio: MappedAudio) -> str:
+        """Key for the decoded PCM, hashed window by window from the memory map."""
+        step = self.sample_rate * 60
+        windows = (audio.window(start, start + step) for start in range(0, len(audio), step))
+        pcm_digest = update_digest(hashlib.sha256(), windows).hexdigest()
+        return content_key("pcm", pcm_digest, self._cache_options())
+    
+    def _cached_result(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached transcript, following file-key aliases.
+        
+        Lookups are not counted; ``transcribe_file`` records one hit or
+        miss per request.
+        """
+        entry = self.cache.get(key, count=False)
+        if entry and "key" in entry:
+            key = entry["key"]
+            entry = self.cache.get(key, count=False)
+        if not entry:
+            return None
+        return {**entry, "cache_key": key, "cached": True}
+    
+    def _cache_result(self, file_key: str, cache_key: str, result: Dict[str, Any]):
+        try:
+            self.cache.set(cache_key, result)
+            self.cache.set(file_key, {"key": cache_key})
+        except OSError as e:
+            logger.error(f"Error caching transcript: {e}")
+    
+    async def store_insights(self, cache_key: str, insights: Dict[str, Any]):
+        """Attach AI insights to a cached transcript so a repeat upload can replay them."""
+        if not self.cache or not cache_key or not insights:
+            return
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(get_executor("io"), lambda: self.cache.update(cache_key, {"insights": insights}))
+    
+    def _transcribe_window(self, audio: MappedAudio, start: int, end: int) -> Dict[str, Any]:
+        """Transcribe one window of memory-mapped audio with absolute timestamps."""
+        with self.models.use("whisper") as backend:
+            result = backend.transcribe(audio.window(start, end))
+        offset = start / self.sample_rate
+        
+        return {
+            **result,
+            "segments": [
+                {**segment, "start": segment["start"] + offset, "end": segment["end"] + offset}
+                for segment in result["segments"]
+            ]
+        }
+    
+    async def _transcribe_audio(self, audio_np: np.ndarray, prompt: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Transcribe numpy audio array as part of the next cross-meeting batch."""
         try:
             # Ensure audio is in the right format
             audio_np = audio_np.astype(np.float32)
@@ -118,19 +438,32 @@ class TranscriptionService:
             if audio_np.max() > 1.0:
                 audio_np = audio_np / np.max(np.abs(audio_np))
             
-            # Run transcription in executor
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.model.transcribe(audio_np, fp16=False)
-            )
-            
-            return result
+            return await self.batcher.submit((audio_np, prompt))
             
         except Exception as e:
             logger.error(f"Error in transcription: {e}")
             return None
     
+    def _transcribe_batch(self, batch: List[Tuple[np.ndarray, Optional[str]]]) -> List[Dict[str, Any]]:
+        """Decode a batch of (audio, prompt) requests with as few Whisper passes as possible.
+        
+        Whisper applies one prompt to a whole decode, so requests are grouped
+        by prompt; unprompted requests (all partials, and every chunk outside
+        streaming mode) share one backend call.
+        """
+        groups: Dict[Optional[str], List[int]] = {}
+        for index, (_, prompt) in enumerate(batch):
+            groups.setdefault(prompt, []).append(index)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+        with self.models.use("whisper") as backend:
+            for prompt, indices in groups.items():
+                group_results = backend.transcribe_batch([batch[i][0] for i in indices], prompt=prompt)
+                for i, result in zip(indices, group_results):
+                    results[i] = result
+        
+        return results
+    
     def _bytes_to_numpy(self, audio_bytes: bytes) -> np.ndarray:
         """Convert raw audio bytes to numpy array."""
         try:
@@ -160,11 +493,33 @@ class TranscriptionService:
             logger.error(f"Error converting audio format: {e}")
             return audio_data
     
-    def clear_buffer(self):
-        """Clear the audio buffer."""
-        self.audio_buffer.clear()
-        logger.info("Audio buffer cleared")
+    def clear_buffer(self, meeting_id: str):
+        """Clear the audio buffer of a meeting's session."""
+        session = self.sessions.get(meeting_id)
+        if session:
+            session.buffer.clear()
+            logger.info(f"Audio buffer cleared for meeting {meeting_id}")
+    
+    def get_buffer_size(self, meeting_id: str) -> int:
+        """Get current buffer size of a meeting's session in samples."""
+        session = self.sessions.get(meeting_id)
+        return session.buffer.available if session else 0
+    
+    def get_session_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-meeting session counters."""
+        return {meeting_id: session.get_stats() for meeting_id, session in self.sessions.items()}
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get session and batching metrics."""
+        return {
+            "backend": self.backend.model_name,
+            "sessions": self.get_session_stats(),
+            "batching": self.batcher.get_stats(),
+            "cache": self.cache.get_stats() if self.cache else None
+        }
     
-    def get_buffer_size(self) -> int:
-        """Get current buffer size in bytes."""
-        return len(self.audio_buffer)
+    async def shutdown(self):
+        """Stop background batching and file transcription workers."""
+        await self.batcher.stop()
+        if self.parallel:
+            self.parallel.shutdown()
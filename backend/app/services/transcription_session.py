@@ -0,0 +1,316 @@
+import asyncio
+import logging
+import re
+import numpy as np
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+from app.services.vad import VoiceActivityDetector
+
+logger = logging.getLogger(__name__)
+
+TranscriptCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def merge_overlap(previous: str, current: str, max_words: int = 20) -> str:
+    """Drop the words at the start of ``current`` that repeat the end of ``previous``.
+
+    Used when consecutive chunks share overlapping audio, so words decoded in
+    both are emitted once.
+    """
+    previous_words = [_normalize_word(w) for w in previous.split()[-max_words:]]
+    current_words = current.split()
+    normalized = [_normalize_word(w) for w in current_words[:max_words]]
+
+    for k in range(min(len(previous_words), len(normalized)), 0, -1):
+        if previous_words[-k:] == normalized[:k]:
+            return " ".join(current_words[k:])
+
+    return current
+
+
+class AudioRingBuffer:
+    """Fixed-capacity ring buffer of float32 mono samples.
+
+    Writes never allocate; when the buffer is full the oldest unread samples
+    are overwritten and counted in ``dropped_samples``.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._start = 0  # index of the oldest unread sample
+        self._size = 0
+        self.total_written = 0
+        self.dropped_samples = 0
+
+    @property
+    def available(self) -> int:
+        """Number of unread samples."""
+        return self._size
+
+    @property
+    def read_cursor(self) -> int:
+        """Absolute index (since session start) of the oldest unread sample."""
+        return self.total_written - self._size
+
+    def write(self, samples: np.ndarray):
+        """Append samples, overwriting the oldest unread audio on overflow."""
+        n = len(samples)
+        if n == 0:
+            return
+
+        if n >= self.capacity:
+            self.dropped_samples += self._size + n - self.capacity
+            self._data[:] = samples[-self.capacity:]
+            self._start = 0
+            self._size = self.capacity
+            self.total_written += n
+            return
+
+        overflow = self._size + n - self.capacity
+        if overflow > 0:
+            self.dropped_samples += overflow
+            self._start = (self._start + overflow) % self.capacity
+            self._size -= overflow
+
+        end = (self._start + self._size) % self.capacity
+        first = min(n, self.capacity - end)
+        self._data[end:end + first] = samples[:first]
+        if first < n:
+            self._data[:n - first] = samples[first:]
+
+        self._size += n
+        self.total_written += n
+
+    def peek(self, n: int) -> np.ndarray:
+        """Return a copy of up to ``n`` unread samples without consuming them."""
+        n = min(n, self._size)
+        first = min(n, self.capacity - self._start)
+        out = np.empty(n, dtype=np.float32)
+        out[:first] = self._data[self._start:self._start + first]
+        if first < n:
+            out[first:] = self._data[:n - first]
+        return out
+
+    def consume(self, n: int):
+        """Advance the read cursor by ``n`` samples."""
+        n = min(n, self._size)
+        self._start = (self._start + n) % self.capacity
+        self._size -= n
+
+    def read(self, n: int) -> np.ndarray:
+        """Return and consume up to ``n`` unread samples."""
+        samples = self.peek(n)
+        self.consume(len(samples))
+        return samples
+
+    def clear(self):
+        """Drop all unread samples."""
+        self.consume(self._size)
+
+
+class TranscriptionSession:
+    """Transcription state owned by a single meeting.
+
+    Each session has its own ring buffer, read cursor and in-flight flag, so
+    meetings never share audio and a slow chunk in one meeting does not cause
+    another meeting's audio to be dropped. Buffered audio is gated by a
+    voice activity detector: silence is skipped and chunks are cut at speech
+    boundaries. Chunks that had to be force-cut mid-speech keep a short
+    overlap with the next chunk, whose repeated words are merged away.
+
+    In streaming mode the growing segment is also offered for ``partial``
+    decodes before its ``final`` transcript is emitted.
+    """
+
+    def __init__(
+        self,
+        meeting_id: str,
+        vad: VoiceActivityDetector,
+        on_transcript: Optional[TranscriptCallback] = None,
+        sample_rate: int = 16000,
+        max_chunk_duration: float = 10.0,
+        min_silence_ms: float = 500.0,
+        max_buffer_seconds: float = 60.0,
+        streaming: bool = False,
+        partial_interval_ms: float = 1000.0,
+        overlap_ms: float = 1000.0,
+        prompt_words: int = 50
+    ):
+        self.meeting_id = meeting_id
+        self.vad = vad
+        self.on_transcript = on_transcript
+        self.sample_rate = sample_rate
+        self.max_chunk_size = int(sample_rate * max_chunk_duration)
+        self.min_silence_frames = vad.frames_for(min_silence_ms)
+        self.pre_roll_frames = vad.hangover_frames
+        self.buffer = AudioRingBuffer(int(sample_rate * max_buffer_seconds))
+        self.is_processing = False
+        self.closed = False
+        self.connections = 0
+        self.chunks_transcribed = 0
+        self.speech_samples = 0
+        self.skipped_samples = 0
+        self.noise_floor_db: Optional[float] = None
+        self.streaming = streaming
+        self.partial_interval = int(sample_rate * partial_interval_ms / 1000)
+        self.overlap_size = int(sample_rate * overlap_ms / 1000)
+        self.prompt_words = prompt_words
+        self.segment_id = 0
+        self.previous_text = ""
+        # Whether the chunk last returned by next_chunk starts with audio repeated from the one before
+        self.last_chunk_overlaps = False
+        self._overlap_next = False
+        self._partial_size = 0
+        self.partials_emitted = 0
+        self._analyzed_until = 0  # absolute sample index already folded into the noise floor
+        self.created_at = datetime.utcnow()
+        self.data_ready = asyncio.Event()
+        self.worker: Optional[asyncio.Task] = None
+        self._pcm_remainder = b""
+
+    def write_pcm(self, audio_bytes: bytes):
+        """Append raw 16-bit PCM bytes to the ring buffer."""
+        audio_bytes = self._pcm_remainder + audio_bytes
+        usable = len(audio_bytes) - (len(audio_bytes) % 2)
+        self._pcm_remainder = audio_bytes[usable:]
+
+        if usable:
+            samples = np.frombuffer(audio_bytes[:usable], dtype=np.int16)
+            self.write_samples(samples.astype(np.float32) / 32768.0)
+
+    def write_samples(self, samples: np.ndarray):
+        """Append float32 samples and wake the session worker."""
+        self.buffer.write(samples)
+        self.data_ready.set()
+
+    def _skip(self, n_samples: int):
+        self.buffer.consume(n_samples)
+        self.skipped_samples += n_samples
+
+    def _take(self, audio: np.ndarray, start: int, end: int, keep: int = 0) -> np.ndarray:
+        # ``keep`` samples at the end stay buffered and start the next chunk
+        keep = min(keep, (end - start) // 2)
+        self._skip(start)
+        self.buffer.consume(end - start - keep)
+        self.speech_samples += end - start - keep
+        self.last_chunk_overlaps = self._overlap_next
+        self._overlap_next = keep > 0
+        self._partial_size = 0
+        return audio[start:end]
+
+    def next_chunk(self, flush: bool = False) -> Optional[np.ndarray]:
+        """Consume the next speech segment from the buffer, if one is complete.
+
+        Leading non-speech frames are dropped. A segment ends at the first
+        pause of at least ``min_silence_ms``; speech that runs past
+        ``max_chunk_duration`` is cut at its quietest frame. With ``flush``
+        any trailing speech is returned even if it has not ended yet.
+        """
+        frame = self.vad.frame_size
+        lookahead = self.max_chunk_size + self.min_silence_frames * frame
+        audio = self.buffer.peek(min(self.buffer.available, lookahead))
+
+        # Track the background level using only frames not seen by a previous call
+        energy_db, _ = self.vad.frame_features(audio)
+        n_frames = len(energy_db)
+        new_from = max(0, self._analyzed_until - self.buffer.read_cursor) // frame
+        self.noise_floor_db = self.vad.update_noise_floor(self.noise_floor_db, energy_db[new_from:])
+        self._analyzed_until = self.buffer.read_cursor + n_frames * frame
+
+        mask, energy_db = self.vad.analyze(audio, self.noise_floor_db)
+
+        if not mask.any():
+            # Keep a short tail in case speech is just starting
+            keep = 0 if flush else self.pre_roll_frames
+            if n_frames > keep:
+                self._skip((n_frames - keep) * frame)
+            return None
+
+        first = int(np.argmax(mask))
+        start = max(0, first - self.pre_roll_frames)
+
+        # A pause is min_silence_frames consecutive non-speech frames
+        silence = ~mask[first:]
+        if len(silence) >= self.min_silence_frames:
+            pauses = np.convolve(silence, np.ones(self.min_silence_frames), mode="valid") >= self.min_silence_frames
+            if pauses.any():
+                end = first + int(np.argmax(pauses))
+                return self._take(audio, start * frame, end * frame)
+
+        max_frames = self.max_chunk_size // frame
+        if n_frames - start >= max_frames:
+            # No pause within the limit: cut at the quietest frame in the back half
+            lo = start + max_frames // 2
+            cut = lo + int(np.argmin(energy_db[lo:start + max_frames]))
+            return self._take(audio, start * frame, cut * frame, keep=self.overlap_size)
+
+        if flush:
+            return self._take(audio, start * frame, n_frames * frame)
+
+        # Speech is still in progress; drop the silence before it and wait
+        self._skip(start * frame)
+        return None
+
+    def next_partial(self) -> Optional[np.ndarray]:
+        """Return the in-progress speech window if it grew enough for a new partial.
+
+        Only meaningful after ``next_chunk`` returned None, when the buffer
+        starts at the current segment.
+        """
+        size = min(self.buffer.available, self.max_chunk_size)
+        if not self.streaming or size - self._partial_size < self.partial_interval:
+            return None
+
+        self._partial_size = size
+        return self.buffer.peek(size)
+
+    @property
+    def prompt(self) -> Optional[str]:
+        """Tail of the finalized transcript, used as decoding context."""
+        if not self.streaming or not self.previous_text:
+            return None
+        return " ".join(self.previous_text.split()[-self.prompt_words:])
+
+    def make_partial(self, transcript_chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Tag a decoded in-progress window as a partial hypothesis."""
+        self.partials_emitted += 1
+        return {**transcript_chunk, "status": "partial", "segment_id": self.segment_id}
+
+    def make_final(self, transcript_chunk: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Tag a decoded chunk as final, removing words repeated from the previous chunk."""
+        text = transcript_chunk["text"]
+        if self.last_chunk_overlaps:
+            text = merge_overlap(self.previous_text, text)
+
+        segment_id = self.segment_id
+        self.segment_id += 1
+        if not text:
+            return None
+
+        self.previous_text = f"{self.previous_text} {text}".strip()[-4096:]
+        return {**transcript_chunk, "text": text, "status": "final", "segment_id": segment_id}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer, VAD and throughput counters for this session."""
+        analyzed = self.speech_samples + self.skipped_samples
+        return {
+            "meeting_id": self.meeting_id,
+            "connections": self.connections,
+            "is_processing": self.is_processing,
+            "buffered_seconds": self.buffer.available / self.sample_rate,
+            "received_seconds": self.buffer.total_written / self.sample_rate,
+            "dropped_seconds": self.buffer.dropped_samples / self.sample_rate,
+            "speech_seconds": self.speech_samples / self.sample_rate,
+            "skipped_seconds": self.skipped_samples / self.sample_rate,
+            "skipped_ratio": self.skipped_samples / analyzed if analyzed else 0.0,
+            "noise_floor_db": self.noise_floor_db,
+            "chunks_transcribed": self.chunks_transcribed,
+            "partials_emitted": self.partials_emitted,
+            "created_at": self.created_at.isoformat()
+        }
@@ -0,0 +1,105 @@
+import numpy as np
+from typing import Optional, Tuple
+
+
+class VoiceActivityDetector:
+    """Frame-level speech detector based on short-time energy and zero-crossing rate.
+
+    Everything is computed on whole arrays of frames at once, so classifying a
+    few seconds of audio costs a handful of NumPy calls.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: float = 30.0,
+        energy_threshold_db: float = -50.0,
+        noise_margin_db: float = 10.0,
+        max_zcr: float = 0.25,
+        min_speech_ms: float = 90.0,
+        hangover_ms: float = 180.0,
+        noise_floor_tau: float = 30.0
+    ):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.energy_threshold_db = energy_threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.max_zcr = max_zcr
+        self.min_speech_frames = max(1, int(round(min_speech_ms / frame_ms)))
+        self.hangover_frames = int(round(hangover_ms / frame_ms))
+        # Seconds for a running noise floor to rise most of the way to a louder background
+        self.noise_floor_tau = noise_floor_tau
+
+    def frames_for(self, milliseconds: float) -> int:
+        """Convert a duration to a whole number of frames."""
+        return max(1, int(round(milliseconds * self.sample_rate / 1000 / self.frame_size)))
+
+    def frame_features(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-frame energy in dBFS and zero-crossing rate for complete frames."""
+        n_frames = len(audio) // self.frame_size
+        frames = audio[:n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+
+        energy_db = 10.0 * np.log10(np.mean(np.square(frames, dtype=np.float32), axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_size - 1)
+
+        return energy_db, zcr
+
+    def update_noise_floor(self, noise_floor_db: Optional[float], energy_db: np.ndarray) -> Optional[float]:
+        """Fold newly seen frame energies into a running noise floor estimate.
+
+        The floor drops immediately to a quieter background but rises slowly,
+        so a long stretch of continuous speech is not mistaken for noise.
+        """
+        if len(energy_db) == 0:
+            return noise_floor_db
+
+        window_floor = float(np.percentile(energy_db, 10))
+        if noise_floor_db is None or window_floor < noise_floor_db:
+            return window_floor
+
+        seconds = len(energy_db) * self.frame_size / self.sample_rate
+        rate = 1.0 - np.exp(-seconds / self.noise_floor_tau)
+        return noise_floor_db + rate * (window_floor - noise_floor_db)
+
+    def analyze(self, audio: np.ndarray, noise_floor_db: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Classify complete frames as speech.
+
+        Returns a boolean speech mask and the per-frame energy used to make
+        the decision (callers use the energy to pick quiet cut points).
+        Without a running ``noise_floor_db`` the floor is estimated from
+        ``audio`` itself, which suits whole recordings but not short windows.
+        """
+        energy_db, zcr = self.frame_features(audio)
+        if len(energy_db) == 0:
+            return np.zeros(0, dtype=bool), energy_db
+
+        # Adapt to the background level, but never below the absolute floor
+        noise_floor = np.percentile(energy_db, 10) if noise_floor_db is None else noise_floor_db
+        threshold = max(self.energy_threshold_db, noise_floor + self.noise_margin_db)
+
+        # High-ZCR frames are only speech (fricatives) when clearly louder than the noise
+        mask = ((energy_db > threshold) & (zcr < self.max_zcr)) | (energy_db > threshold + self.noise_margin_db)
+        mask = self._drop_short_runs(mask, self.min_speech_frames)
+
+        if self.hangover_frames:
+            mask = np.convolve(mask, np.ones(self.hangover_frames + 1), mode="full")[:len(mask)] > 0
+
+        return mask, energy_db
+
+    def speech_mask(self, audio: np.ndarray) -> np.ndarray:
+        """Boolean speech mask for the complete frames of ``audio``."""
+        return self.analyze(audio)[0]
+
+    @staticmethod
+    def _drop_short_runs(mask: np.ndarray, min_frames: int) -> np.ndarray:
+        """Clear runs of speech frames shorter than ``min_frames``."""
+        padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+        edges = np.flatnonzero(np.diff(padded))
+        starts, ends = edges[0::2], edges[1::2]
+        keep = (ends - starts) >= min_frames
+
+        delta = np.zeros(len(mask) + 1, dtype=np.int32)
+        np.add.at(delta, starts[keep], 1)
+        np.add.at(delta, ends[keep], -1)
+        return np.cumsum(delta[:-1]) > 0
@@ -0,0 +1,130 @@
+"""FAISS index types for the knowledge base and their build/search settings.
+
+``flat`` is exact brute-force search and needs no training; it is stored
+as an IVF index with a single list so FAISS can memory-map it. ``ivfpq``
+clusters vectors into ``nlist`` inverted lists and stores them
+product-quantized (``pq_m`` codes of ``pq_bits`` bits), searching the
+``nprobe`` nearest lists. ``hnsw`` is a graph index over the full vectors,
+searched with a beam of ``ef_search``. Raising ``nprobe``/``ef_search``
+trades query speed for recall and can be changed without a rebuild.
+"""
+import logging
+import math
+import os
+from typing import Any, Dict
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "ivfpq", "hnsw")
+
+# Vectors added to a new index per call, to bound temporary copies
+_ADD_BATCH = 65536
+
+
+class IndexSettings:
+    """Index type plus build and search parameters."""
+
+    def __init__(
+        self,
+        index_type: str = "flat",
+        nlist: int = 0,
+        pq_m: int = 48,
+        pq_bits: int = 8,
+        hnsw_m: int = 32,
+        ef_construction: int = 200,
+        nprobe: int = 16,
+        ef_search: int = 64
+    ):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}'. Choose one of: {', '.join(INDEX_TYPES)}")
+        self.index_type = index_type
+        # 0 picks about 4 * sqrt(vectors) lists when the index is built
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self.pq_bits = pq_bits
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+
+    @classmethod
+    def from_env(cls) -> "IndexSettings":
+        return cls(
+            index_type=os.getenv("KB_INDEX_TYPE", "flat"),
+            nlist=int(os.getenv("KB_IVF_NLIST", "0")),
+            pq_m=int(os.getenv("KB_PQ_M", "48")),
+            pq_bits=int(os.getenv("KB_PQ_BITS", "8")),
+            hnsw_m=int(os.getenv("KB_HNSW_M", "32")),
+            ef_construction=int(os.getenv("KB_HNSW_EF_CONSTRUCTION", "200")),
+            nprobe=int(os.getenv("KB_IVF_NPROBE", "16")),
+            ef_search=int(os.getenv("KB_HNSW_EF_SEARCH", "64"))
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+def index_type_of(index: Any) -> str:
+    """Which of INDEX_TYPES a loaded FAISS index is."""
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    return "flat"
+
+
+def _pq_subquantizers(dimension: int, wanted: int) -> int:
+    """Largest divisor of the dimension not above ``wanted`` (PQ needs an even split)."""
+    return max(m for m in range(1, min(wanted, dimension) + 1) if dimension % m == 0)
+
+
+def build_index(vectors: np.ndarray, settings: IndexSettings) -> Any:
+    """Create, train and fill an index of the configured type.
+
+    ``vectors`` may be a read-only memory map; IVF-PQ is trained on a
+    sample of at most 256 vectors per list. Too few vectors to train
+    IVF-PQ falls back to a flat index.
+    """
+    count, dimension = vectors.shape
+    index_type = settings.index_type
+
+    if index_type == "ivfpq":
+        nlist = settings.nlist or int(4 * math.sqrt(count))
+        nlist = max(1, min(nlist, count // 39))
+        if count < max(39 * nlist, 2 ** settings.pq_bits):
+            logger.warning(f"{count} vectors are too few to train IVF-PQ; building a flat index")
+            index_type = "flat"
+
+    if index_type == "flat":
+        # One list holding every vector: still exhaustive, but memory-mappable
+        quantizer = faiss.IndexFlatL2(dimension)
+        quantizer.add(np.zeros((1, dimension), dtype=np.float32))
+        index = faiss.IndexIVFFlat(quantizer, dimension, 1)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, settings.hnsw_m)
+        index.hnsw.efConstruction = settings.ef_construction
+    else:
+        pq_m = _pq_subquantizers(dimension, settings.pq_m)
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dimension), dimension, nlist, pq_m, settings.pq_bits)
+        sample_size = min(count, 256 * nlist)
+        sample = np.sort(np.random.default_rng(0).choice(count, sample_size, replace=False))
+        logger.info(f"Training IVF-PQ (nlist={nlist}, m={pq_m}) on {sample_size} of {count} vectors")
+        index.train(np.ascontiguousarray(vectors[sample], dtype=np.float32))
+
+    for start in range(0, count, _ADD_BATCH):
+        index.add(np.ascontiguousarray(vectors[start:start + _ADD_BATCH], dtype=np.float32))
+
+    set_search_params(index, settings)
+    return index
+
+
+def set_search_params(index: Any, settings: IndexSettings):
+    """Apply the runtime recall/latency knobs for the index's type."""
+    index_type = index_type_of(index)
+    if index_type == "ivfpq":
+        faiss.ParameterSpace().set_index_parameter(index, "nprobe", settings.nprobe)
+    elif index_type == "hnsw":
+        faiss.ParameterSpace().set_index_parameter(index, "efSearch", settings.ef_search)
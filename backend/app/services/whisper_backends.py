@@ -0,0 +1,247 @@
+import logging
+import os
+import threading
+import numpy as np
+from typing import Any, Dict, List, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+# Whisper's input window; longer chunks are truncated by the decoder
+MAX_CHUNK_SECONDS = 30.0
+
+
+class WhisperBackend:
+    """Interface for a Whisper inference engine.
+
+    ``transcribe`` handles arbitrary-length audio and returns text, segments
+    and language. ``transcribe_batch`` decodes short chunks (at most 30 s)
+    that share one prompt and returns text, language, confidence and
+    no-speech probability for each. Both may be called from several
+    executor threads at once; engines that are not thread-safe serialize
+    their decodes.
+    """
+
+    name = "base"
+
+    def __init__(self, model_size: str):
+        self.model_size = model_size
+        self.model = None
+
+    @property
+    def model_name(self) -> str:
+        """Identifier of the engine and weights, e.g. for cache keys."""
+        return f"{self.name}:{self.model_size}"
+
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+    def connect(self):
+        """Resolve what ``model_name`` needs without loading the model (may block)."""
+
+    def load(self):
+        raise NotImplementedError
+
+    def transcribe(self, audio: np.ndarray, prompt: Optional[str] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def transcribe_batch(self, batch: List[np.ndarray], prompt: Optional[str] = None) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class OpenAIWhisperBackend(WhisperBackend):
+    """Reference openai-whisper model in fp32 (fp16 on GPU)."""
+
+    name = "openai-whisper"
+
+    def __init__(self, model_size: str):
+        super().__init__(model_size)
+        # Decoding installs kv-cache hooks on the shared model, so one decode at a time
+        self._decode_lock = threading.Lock()
+
+    def load(self):
+        import whisper
+
+        self.model = whisper.load_model(self.model_size)
+
+    @property
+    def fp16(self) -> bool:
+        return self.model.device.type == "cuda"
+
+    def transcribe(self, audio: np.ndarray, prompt: Optional[str] = None) -> Dict[str, Any]:
+        with self._decode_lock:
+            result = self.model.transcribe(audio, fp16=self.fp16, initial_prompt=prompt)
+        return {
+            "text": result["text"].strip(),
+            "language": result.get("language"),
+            "segments": [
+                {"start": segment["start"], "end": segment["end"], "text": segment["text"].strip()}
+                for segment in result.get("segments", [])
+            ]
+        }
+
+    def transcribe_batch(self, batch: List[np.ndarray], prompt: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Decode all chunks in one pass over a padded (N, n_mels, 3000) mel batch."""
+        import torch
+        import whisper
+
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=self.model.dims.n_mels)
+            for audio in batch
+        ]).to(self.model.device)
+
+        options = whisper.DecodingOptions(fp16=self.fp16, without_timestamps=True, prompt=prompt)
+        with self._decode_lock:
+            results = whisper.decode(self.model, mels, options)
+        return [
+            {
+                "text": result.text,
+                "language": result.language,
+                "confidence": float(np.exp(result.avg_logprob)),
+                "no_speech_prob": result.no_speech_prob
+            }
+            for result in results
+        ]
+
+
+class TorchQuantizedWhisperBackend(OpenAIWhisperBackend):
+    """openai-whisper with dynamic int8 quantization of all Linear layers (CPU only)."""
+
+    name = "torch-int8"
+
+    def load(self):
+        import torch
+        import whisper
+
+        model = whisper.load_model(self.model_size, device="cpu")
+
+        # whisper.model.Linear only adds dtype casting for fp16; dynamic
+        # quantization only swaps exact nn.Linear modules
+        for module in model.modules():
+            if isinstance(module, whisper.model.Linear):
+                module.__class__ = torch.nn.Linear
+
+        self.model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    @property
+    def fp16(self) -> bool:
+        return False
+
+
+class FasterWhisperBackend(WhisperBackend):
+    """CTranslate2 (faster-whisper) engine, int8 on CPU by default."""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str, compute_type: str = "int8", cpu_threads: int = 0):
+        super().__init__(model_size)
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+
+    @property
+    def model_name(self) -> str:
+        return f"{self.name}:{self.model_size}:{self.compute_type}"
+
+    def load(self):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(
+            self.model_size,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads
+        )
+
+    def transcribe(self, audio: np.ndarray, prompt: Optional[str] = None) -> Dict[str, Any]:
+        segments, info = self.model.transcribe(audio, initial_prompt=prompt)
+        segments = [
+            {"start": segment.start, "end": segment.end, "text": segment.text.strip()}
+            for segment in segments
+        ]
+        return {
+            "text": " ".join(segment["text"] for segment in segments if segment["text"]),
+            "language": info.language,
+            "segments": segments
+        }
+
+    def transcribe_batch(self, batch: List[np.ndarray], prompt: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Decode chunks one at a time; CTranslate2 parallelizes within each call."""
+        results = []
+        for audio in batch:
+            segments, info = self.model.transcribe(
+                audio,
+                initial_prompt=prompt,
+                without_timestamps=True,
+                condition_on_previous_text=False
+            )
+            segments = list(segments)
+            avg_logprob = float(np.mean([s.avg_logprob for s in segments])) if segments else -10.0
+            results.append({
+                "text": " ".join(s.text.strip() for s in segments),
+                "language": info.language,
+                "confidence": float(np.exp(avg_logprob)),
+                "no_speech_prob": max((s.no_speech_prob for s in segments), default=1.0)
+            })
+        return results
+
+
+class RemoteWhisperBackend(WhisperBackend):
+    """Whisper hosted by the shared model server at MODEL_SERVER_SOCKET.
+
+    The engine and model size are whatever the server was started with;
+    ``model_name`` reports them so cache keys match the real model. The
+    name is fetched once by ``connect`` or ``load``; until then (or if the
+    server is unreachable) the locally configured size is reported.
+    """
+
+    name = "remote"
+
+    def __init__(self, model_size: str):
+        super().__init__(model_size)
+        self.socket_path = os.getenv("MODEL_SERVER_SOCKET", "data/model-server.sock")
+        self._remote_name: Optional[str] = None
+
+    def _client(self):
+        from app.services.model_server import ModelClient
+
+        return ModelClient(self.socket_path)
+
+    @property
+    def model_name(self) -> str:
+        # Read on every /metrics and cache key, so never touches the socket
+        return f"{self.name}:{self._remote_name or self.model_size}"
+
+    def connect(self):
+        from app.services.model_server import ModelServerError
+
+        try:
+            self._remote_name = self._client().info()["whisper"]
+        except (OSError, ModelServerError) as e:
+            logger.warning(f"Model server at {self.socket_path} unavailable: {e}")
+
+    def load(self):
+        client = self._client()
+        self._remote_name = client.info()["whisper"]
+        self.model = client
+
+    def transcribe(self, audio: np.ndarray, prompt: Optional[str] = None) -> Dict[str, Any]:
+        return self.model.call("whisper", "transcribe", audio, prompt=prompt)
+
+    def transcribe_batch(self, batch: List[np.ndarray], prompt: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.model.call("whisper", "transcribe_batch", batch, prompt=prompt)
+
+
+WHISPER_BACKENDS: Dict[str, Type[WhisperBackend]] = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    TorchQuantizedWhisperBackend.name: TorchQuantizedWhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    RemoteWhisperBackend.name: RemoteWhisperBackend,
+}
+
+
+def create_backend(name: str, model_size: str) -> WhisperBackend:
+    """Instantiate a configured backend by name."""
+    try:
+        backend_class = WHISPER_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown Whisper backend '{name}'. Choose one of: {', '.join(WHISPER_BACKENDS)}")
+    return backend_class(model_size)
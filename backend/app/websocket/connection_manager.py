@@ -1,8 +1,11 @@
 from fastapi import WebSocket
 from typing import Dict, List, Set
+from datetime import datetime
 import json
 import logging
 
+from app.models import TranscriptionJobResponse
+
 logger = logging.getLogger(__name__)
 
 class ConnectionManager:
@@ -67,13 +70,25 @@ class ConnectionManager:
             # Remove disconnected clients
             for websocket in connections_to_remove:
                 self.meeting_connections[meeting_id].discard(websocket)
-            
-            # Update transcript cache
-            if message.get("type") == "transcript":
-                transcript_text = message.get("data", {}).get("text", "")
-                if meeting_id not in self.meeting_transcripts:
-                    self.meeting_transcripts[meeting_id] = ""
-                self.meeting_transcripts[meeting_id] += f" {transcript_text}"
+        
+        # Update transcript cache, also for speech flushed after the last client left
+        if message.get("type") == "transcript":
+            transcript_text = message.get("data", {}).get("text", "")
+            if meeting_id not in self.meeting_transcripts:
+                self.meeting_transcripts[meeting_id] = ""
+            self.meeting_transcripts[meeting_id] += f" {transcript_text}"
+    
+    async def broadcast_job_progress(self, job: TranscriptionJobResponse):
+        """Push a transcription job's status to its meeting's clients."""
+        await self.broadcast_to_meeting(
+            job.meeting_id,
+            {
+                "type": "job_progress",
+                # JSON mode turns the job's datetimes into strings json.dumps accepts
+                "data": job.model_dump(mode="json"),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
     
     async def broadcast_notes_to_meeting(self, meeting_id: str, message: dict, exclude: WebSocket = None):
         """Broadcast notes updates to all clients except the sender."""
@@ -0,0 +1,131 @@
+"""Compare the torch and ONNX Runtime int8 summarization/sentiment models.
+
+Usage (from the backend directory):
+    python -m scripts.export_onnx
+    python -m benchmarks.bench_ai_runtime transcripts/ --runs 3
+
+Inputs are ``.txt`` transcripts; each is summarized whole by map-reducing
+over token windows (as ``generate_summary`` does, with in-process
+batching) and its sentences are classified for sentiment. Every runtime runs in a fresh process for clean memory numbers.
+Quality is reported against the torch outputs: ROUGE-L of the summaries and
+agreement of sentiment labels.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Dict, List
+
+from benchmarks.common import percentile, rouge_l, rss_mb
+
+
+def load_texts(data_dir: str) -> List[str]:
+    texts = []
+    for name in sorted(os.listdir(data_dir)):
+        if name.endswith(".txt"):
+            with open(os.path.join(data_dir, name)) as f:
+                texts.append(" ".join(f.read().split()))
+    return texts
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in re.split(r"(?<=[.!?])\s+", text) if sentence.strip()]
+
+
+def bench_runtime(runtime: str, onnx_dir: str, texts: List[str], runs: int, threads: int) -> Dict[str, Any]:
+    """Load both pipelines on one runtime and time them (executed in a child process)."""
+    import torch
+
+    from app.services.ai_runtime import SENTIMENT_MODEL, SUMMARIZATION_MODEL, load_pipeline
+    from app.services.summarization import MapReduceSummarizer
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    baseline = rss_mb()
+    started = time.perf_counter()
+    summarizer = load_pipeline("summarization", SUMMARIZATION_MODEL, runtime=runtime, onnx_dir=onnx_dir)
+    sentiment = load_pipeline("sentiment-analysis", SENTIMENT_MODEL, runtime=runtime, onnx_dir=onnx_dir)
+    load_seconds = time.perf_counter() - started
+    loaded = rss_mb()
+
+    window_tokens = int(os.getenv("SUMMARY_WINDOW_TOKENS", "1000"))
+    map_reduce = MapReduceSummarizer(lambda: nullcontext(summarizer), runtime=runtime, window_tokens=window_tokens)
+    windows = sum(len(map_reduce.split(text)) for text in texts)
+    sentences = [sentence for text in texts for sentence in split_sentences(text)]
+
+    summaries = []
+    summary_latencies = []
+    for run in range(runs):
+        for text in texts:
+            started = time.perf_counter()
+            summary = asyncio.run(map_reduce.summarize(text, max_length=150, min_length=30))
+            summary_latencies.append(time.perf_counter() - started)
+            if run == 0:
+                summaries.append(summary)
+
+    started = time.perf_counter()
+    labels = [result["label"] for result in sentiment(sentences, batch_size=32, truncation=True)]
+    sentiment_seconds = time.perf_counter() - started
+
+    return {
+        "runtime": runtime,
+        "load_seconds": load_seconds,
+        "model_rss_mb": loaded - baseline,
+        "peak_rss_mb": rss_mb(),
+        "summary_p50_seconds": percentile(summary_latencies, 50),
+        "summary_p95_seconds": percentile(summary_latencies, 95),
+        "summary_windows": windows,
+        "sentences_per_second": len(sentences) / sentiment_seconds if sentiment_seconds else None,
+        "summaries": summaries,
+        "labels": labels
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_dir", help="Directory of .txt meeting transcripts")
+    parser.add_argument("--onnx-dir", default=os.getenv("ONNX_MODEL_DIR", "data/onnx"))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0, help="Torch intra-op threads (0 = default)")
+    args = parser.parse_args()
+
+    texts = load_texts(args.data_dir)
+    if not texts:
+        raise SystemExit(f"No .txt transcripts in {args.data_dir}")
+
+    reports = {}
+    for runtime in ("torch", "onnx"):
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            reports[runtime] = pool.submit(bench_runtime, runtime, args.onnx_dir, texts, args.runs, args.threads).result()
+
+    reference, candidate = reports["torch"], reports["onnx"]
+    quality = {
+        "summary_rouge_l_vs_torch": sum(
+            rouge_l(ref, cand) for ref, cand in zip(reference["summaries"], candidate["summaries"])
+        ) / len(texts),
+        "sentiment_label_agreement": sum(
+            ref == cand for ref, cand in zip(reference["labels"], candidate["labels"])
+        ) / max(1, len(reference["labels"]))
+    }
+
+    for report in reports.values():
+        del report["summaries"], report["labels"]
+
+    print(json.dumps({
+        "transcripts": len(texts),
+        "runtimes": reports,
+        "summary_speedup": reference["summary_p50_seconds"] / candidate["summary_p50_seconds"],
+        "memory_saved_mb": reference["model_rss_mb"] - candidate["model_rss_mb"],
+        "quality": quality
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
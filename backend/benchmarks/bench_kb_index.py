@@ -0,0 +1,137 @@
+"""Compare knowledge base index types: recall@k against flat search and QPS.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_kb_index --synthetic 200000 --dim 384
+    python -m benchmarks.bench_kb_index --kb-path data/knowledge_base --nprobe 8,32 --ef-search 32,128
+
+Vectors come from an existing knowledge base (its base and segments) or a
+synthetic clustered set. Queries are stored vectors plus noise, searched one
+at a time as ``get_rag_insights`` does. Every index type is built once and
+searched at each of its search settings; ``flat`` is the ground truth.
+"""
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+import faiss
+import numpy as np
+
+from app.services.vector_index import IndexSettings, build_index, set_search_params
+from benchmarks.common import percentile
+
+
+def load_kb_vectors(path: str) -> np.ndarray:
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    parts = []
+    if manifest["base"]:
+        parts.append(np.load(os.path.join(path, f"{manifest['base']}.npy")))
+    parts.extend(np.load(os.path.join(path, f"{segment}.npy")) for segment in manifest["segments"])
+    return np.concatenate(parts).astype(np.float32)
+
+
+def synthetic_vectors(count: int, dim: int, clusters: int = 256) -> np.ndarray:
+    """Gaussian clusters, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, count)
+    return centers[labels] + 0.3 * rng.standard_normal((count, dim)).astype(np.float32)
+
+
+def make_queries(vectors: np.ndarray, count: int) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    picked = vectors[rng.choice(len(vectors), min(count, len(vectors)), replace=False)]
+    noise = rng.standard_normal(picked.shape).astype(np.float32) * picked.std() * 0.1
+    return np.ascontiguousarray(picked + noise, dtype=np.float32)
+
+
+def run_queries(index: Any, queries: np.ndarray, k: int) -> Dict[str, Any]:
+    latencies = []
+    results = []
+    for query in queries:
+        started = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - started)
+        results.append(ids[0])
+    total = sum(latencies)
+    return {
+        "ids": np.stack(results),
+        "qps": len(queries) / total if total else None,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000
+    }
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(row[row >= 0]) & set(expected)) for row, expected in zip(found, truth))
+    return hits / truth.size
+
+
+def parse_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--kb-path", help="Knowledge base directory to take vectors from")
+    source.add_argument("--synthetic", type=int, help="Number of synthetic vectors")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic vector dimension (all-MiniLM-L6-v2: 384)")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=3, help="Neighbours per query (get_rag_insights uses 3)")
+    parser.add_argument("--nlist", type=int, default=0)
+    parser.add_argument("--pq-m", type=int, default=48)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--nprobe", default="1,4,16,64", help="IVF-PQ nprobe values to try")
+    parser.add_argument("--ef-search", default="16,64,256", help="HNSW efSearch values to try")
+    parser.add_argument("--threads", type=int, default=1, help="FAISS OpenMP threads")
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(args.threads)
+    vectors = load_kb_vectors(args.kb_path) if args.kb_path else synthetic_vectors(args.synthetic, args.dim)
+    queries = make_queries(vectors, args.queries)
+
+    reports = []
+    truth = None
+    for index_type, knob, values in (
+        ("flat", None, [None]),
+        ("ivfpq", "nprobe", parse_list(args.nprobe)),
+        ("hnsw", "ef_search", parse_list(args.ef_search))
+    ):
+        settings = IndexSettings(index_type=index_type, nlist=args.nlist, pq_m=args.pq_m, hnsw_m=args.hnsw_m)
+        started = time.perf_counter()
+        index = build_index(vectors, settings)
+        build_seconds = time.perf_counter() - started
+        index_mb = len(faiss.serialize_index(index)) / 2 ** 20
+
+        for value in values:
+            if knob:
+                setattr(settings, knob, value)
+                set_search_params(index, settings)
+            run = run_queries(index, queries, args.k)
+            if truth is None:
+                truth = run["ids"]
+            reports.append({
+                "index_type": index_type,
+                **({knob: value} if knob else {}),
+                "build_seconds": build_seconds,
+                "index_mb": index_mb,
+                f"recall_at_{args.k}": recall_at_k(run["ids"], truth),
+                "qps": run["qps"],
+                "p50_ms": run["p50_ms"],
+                "p95_ms": run["p95_ms"]
+            })
+
+    print(json.dumps({
+        "vectors": len(vectors),
+        "dimension": vectors.shape[1],
+        "queries": len(queries),
+        "k": args.k,
+        "results": reports
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark parallel long-file transcription against a single Whisper call.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_long_form recording.wav --model base --workers 4
+
+Reports wall time, real-time factor and the speed-up of the silence-split
+process-pool path over ``model.transcribe(file_path)``.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.services.audio_io import load_audio_mmap
+from app.services.long_form import ParallelTranscriber, find_silence_cuts
+from app.services.vad import VoiceActivityDetector
+
+
+def run_single(model_size: str, path: str) -> float:
+    import whisper
+
+    model = whisper.load_model(model_size)
+    started = time.perf_counter()
+    model.transcribe(path, fp16=False)
+    return time.perf_counter() - started
+
+
+async def run_parallel(backend: str, model_size: str, path: str, workers: int, segment_seconds: float) -> float:
+    audio = load_audio_mmap(path)
+    transcriber = ParallelTranscriber(backend, model_size, workers)
+    try:
+        segments = find_silence_cuts(audio, VoiceActivityDetector(), segment_seconds)
+
+        # Warm up every worker on one second of audio so model loading is not counted
+        warmup = (0, min(len(audio), audio.sample_rate))
+        await transcriber.transcribe(audio, [warmup] * workers)
+
+        started = time.perf_counter()
+        await transcriber.transcribe(audio, segments)
+        return time.perf_counter() - started
+    finally:
+        transcriber.shutdown()
+        audio.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", help="Audio file to transcribe")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--backend", default="openai-whisper", help="Backend used by the pool workers")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--segment-seconds", type=float, default=120.0)
+    parser.add_argument("--skip-single", action="store_true", help="Only run the parallel path")
+    args = parser.parse_args()
+
+    audio = load_audio_mmap(args.audio)
+    duration = audio.duration
+    audio.close()
+
+    report = {"audio_seconds": duration, "model": args.model, "backend": args.backend, "workers": args.workers}
+
+    if not args.skip_single:
+        single = run_single(args.model, args.audio)
+        report["single_seconds"] = single
+        report["single_rtf"] = single / duration
+
+    parallel = asyncio.run(run_parallel(args.backend, args.model, args.audio, args.workers, args.segment_seconds))
+    report["parallel_seconds"] = parallel
+    report["parallel_rtf"] = parallel / duration
+
+    if "single_seconds" in report:
+        report["speedup"] = report["single_seconds"] / parallel
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Measure DistilBERT sentiment throughput by batch size on CPU.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_sentiment --sentences 256 --batch-sizes 1,8,32
+
+Runs the sentiment pipeline directly at each batch size, then pushes the
+same sentences through the MicroBatcher front end from concurrent callers
+the way AIService does. Sentences come from a text file (one per line) or
+are generated meeting-style lines.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+
+from app.services.batching import MicroBatcher
+
+MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+TEMPLATES = [
+    "I think we should {verb} the {thing} before the end of the {period}.",
+    "Honestly the {thing} has been a {adjective} experience for the whole team.",
+    "Can someone follow up with {person} about the {thing} next {period}?",
+    "We are still blocked on the {thing}, which is {adjective}.",
+    "Great work on the {thing}, the customers really noticed.",
+]
+WORDS = {
+    "verb": ["ship", "review", "rewrite", "postpone", "test"],
+    "thing": ["release", "migration", "dashboard", "budget", "onboarding flow"],
+    "period": ["week", "sprint", "quarter", "month"],
+    "adjective": ["frustrating", "smooth", "painful", "surprisingly good", "slow"],
+    "person": ["finance", "the design team", "legal", "support"],
+}
+
+
+def make_sentences(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(**{key: rng.choice(values) for key, values in WORDS.items()})
+        for _ in range(count)
+    ]
+
+
+def bench_direct(classifier, sentences: List[str], batch_size: int) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(sentences), batch_size):
+        batch = sentences[start:start + batch_size]
+        classifier(batch, batch_size=len(batch), truncation=True)
+    return len(sentences) / (time.perf_counter() - started)
+
+
+async def bench_batcher(classifier, sentences: List[str], batch_size: int) -> dict:
+    batcher = MicroBatcher(
+        "sentiment",
+        lambda texts: classifier(texts, batch_size=len(texts), truncation=True),
+        max_batch_size=batch_size,
+        max_wait_ms=20
+    )
+    started = time.perf_counter()
+    await asyncio.gather(*(batcher.submit(sentence) for sentence in sentences))
+    elapsed = time.perf_counter() - started
+    stats = batcher.get_stats()
+    await batcher.stop()
+    return {
+        "sentences_per_second": len(sentences) / elapsed,
+        "mean_batch_size": stats["mean_batch_size"],
+        "p95_latency_seconds": stats["p95_latency_seconds"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=256)
+    parser.add_argument("--input", help="Text file with one sentence per line")
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--threads", type=int, default=0, help="Torch intra-op threads (0 = default)")
+    args = parser.parse_args()
+
+    import torch
+    from transformers import pipeline
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    if args.input:
+        with open(args.input) as f:
+            sentences = [line.strip() for line in f if line.strip()][:args.sentences]
+    else:
+        sentences = make_sentences(args.sentences)
+
+    classifier = pipeline("sentiment-analysis", model=MODEL, device=-1)
+    # Warm up so the first batch does not pay for lazy initialization
+    classifier(sentences[:8], batch_size=8, truncation=True)
+
+    report = {"sentences": len(sentences), "threads": torch.get_num_threads(), "direct": {}, "batcher": {}}
+    for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+        report["direct"][batch_size] = {"sentences_per_second": bench_direct(classifier, sentences, batch_size)}
+        report["batcher"][batch_size] = asyncio.run(bench_batcher(classifier, sentences, batch_size))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
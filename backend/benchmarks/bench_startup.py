@@ -0,0 +1,153 @@
+"""Measure API import time and staged startup.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --eager   # MODEL_LAZY_LOADING=false
+
+Import time is ``import main`` in a fresh interpreter, with the packages
+that took longest to import (own time from ``-X importtime``, summed per
+top-level package) and a check that no heavy ML package was imported.
+Startup runs uvicorn in a subprocess and reports the time until ``/``
+answers (CRUD routes are up) and until ``/health`` shows every
+model-backed service finished loading, with each service's own load
+duration.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import percentile
+
+# Packages that must only be imported on first use
+HEAVY_MODULES = ("torch", "transformers", "sentence_transformers", "whisper", "faster_whisper", "langchain", "faiss")
+
+_REPORT_HEAVY = (
+    "import json, sys, main; "
+    f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+)
+
+
+def time_import(env: Dict[str, str]) -> Dict[str, Any]:
+    """Import main once in a fresh interpreter; return wall time and the slowest packages."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _REPORT_HEAVY],
+        capture_output=True, text=True, env=env, check=True
+    )
+    seconds = time.perf_counter() - started
+
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    packages: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(own) / 1e6
+
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        "seconds": seconds,
+        "heavy_modules_imported": json.loads(result.stdout.strip().splitlines()[-1]),
+        "slowest_packages": dict(slowest)
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get_json(url: str) -> Optional[Dict[str, Any]]:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return json.load(response)
+    except OSError:
+        return None
+
+
+def time_startup(env: Dict[str, str], timeout: float) -> Dict[str, Any]:
+    """Start the API under uvicorn and time its readiness stages."""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    first_request = None
+    services: Dict[str, Any] = {}
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+
+            if first_request is None:
+                if _get_json(f"{base_url}/") is not None:
+                    first_request = time.perf_counter() - started
+                else:
+                    time.sleep(0.02)
+                    continue
+
+            health = _get_json(f"{base_url}/health") or {}
+            services = {
+                name: service for name, service in health.get("services", {}).items()
+                if isinstance(service, dict)
+            }
+            if services and all(service["status"] in ("ready", "failed") for service in services.values()):
+                break
+            time.sleep(0.1)
+        else:
+            raise RuntimeError(f"Services not ready after {timeout:.0f}s")
+
+        return {
+            "first_request_seconds": first_request,
+            "services_ready_seconds": time.perf_counter() - started,
+            "services": {
+                name: {"status": service["status"], "load_seconds": service["load_seconds"]}
+                for name, service in services.items()
+            }
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {"p50": percentile(values, 50), "max": max(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--eager", action="store_true", help="Preload all models (MODEL_LAZY_LOADING=false)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds to wait for services to load")
+    args = parser.parse_args()
+
+    env = dict(os.environ, MODEL_LAZY_LOADING="false" if args.eager else "true")
+
+    imports = [time_import(env) for _ in range(args.runs)]
+    startups = [time_startup(env, args.timeout) for _ in range(args.runs)]
+
+    print(json.dumps({
+        "runs": args.runs,
+        "lazy_loading": not args.eager,
+        "import_seconds": summarize([run["seconds"] for run in imports]),
+        "heavy_modules_imported": imports[-1]["heavy_modules_imported"],
+        "slowest_packages": imports[-1]["slowest_packages"],
+        "first_request_seconds": summarize([run["first_request_seconds"] for run in startups]),
+        "services_ready_seconds": summarize([run["services_ready_seconds"] for run in startups]),
+        "services": startups[-1]["services"]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Compare Whisper backends on a fixed local audio set.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_whisper_backends data/bench_audio --model base
+
+The data directory holds audio files plus a reference transcript with the
+same stem and a ``.txt`` extension (``call1.wav`` + ``call1.txt``). Each
+backend runs in a fresh process so its memory is measured in isolation.
+Reports load time, resident memory, real-time factor and WER.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.common import rss_mb, word_error_rate
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg", ".webm"}
+
+
+def find_audio_set(data_dir: str) -> List[Tuple[str, str]]:
+    """Return (audio_path, reference_text) pairs for files with a reference."""
+    pairs = []
+    for name in sorted(os.listdir(data_dir)):
+        stem, extension = os.path.splitext(name)
+        reference = os.path.join(data_dir, f"{stem}.txt")
+        if extension.lower() in AUDIO_EXTENSIONS and os.path.exists(reference):
+            with open(reference) as f:
+                pairs.append((os.path.join(data_dir, name), f.read()))
+    return pairs
+
+
+def bench_backend(backend_name: str, model_size: str, audio_set: List[Tuple[str, str]], threads: int) -> Dict[str, Any]:
+    """Run one backend over the audio set (executed in a child process)."""
+    import torch
+
+    from app.services.audio_io import load_audio_mmap
+    from app.services.whisper_backends import create_backend
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    baseline = rss_mb()
+    backend = create_backend(backend_name, model_size)
+    started = time.perf_counter()
+    backend.load()
+    load_seconds = time.perf_counter() - started
+    loaded = rss_mb()
+
+    audio_seconds = 0.0
+    compute_seconds = 0.0
+    errors = []
+    for path, reference in audio_set:
+        audio = load_audio_mmap(path)
+        samples = audio.window(0, len(audio))
+        audio_seconds += audio.duration
+        audio.close()
+
+        started = time.perf_counter()
+        result = backend.transcribe(samples)
+        compute_seconds += time.perf_counter() - started
+        errors.append(word_error_rate(reference, result["text"]))
+
+    return {
+        "backend": backend.model_name,
+        "load_seconds": load_seconds,
+        "model_rss_mb": loaded - baseline,
+        "peak_rss_mb": rss_mb(),
+        "audio_seconds": audio_seconds,
+        "rtf": compute_seconds / audio_seconds if audio_seconds else None,
+        "wer": sum(errors) / len(errors) if errors else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_dir", help="Directory of audio files with .txt references")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--backends", default="openai-whisper,torch-int8,faster-whisper")
+    parser.add_argument("--threads", type=int, default=0, help="Torch intra-op threads (0 = default)")
+    args = parser.parse_args()
+
+    audio_set = find_audio_set(args.data_dir)
+    if not audio_set:
+        raise SystemExit(f"No audio files with reference transcripts in {args.data_dir}")
+
+    reports = []
+    for backend_name in args.backends.split(","):
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            reports.append(pool.submit(bench_backend, backend_name.strip(), args.model, audio_set, args.threads).result())
+
+    print(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    main()
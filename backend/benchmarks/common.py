@@ -0,0 +1,65 @@
+"""Shared helpers for the benchmark scripts."""
+import os
+import re
+from typing import List
+
+import numpy as np
+
+
+def rss_mb() -> float:
+    """Resident set size of the current process in MiB."""
+    import psutil
+
+    return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase and strip punctuation for word-level comparisons."""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return float(bool(hyp))
+
+    previous = np.arange(len(hyp) + 1)
+    for i, ref_word in enumerate(ref, start=1):
+        current = np.empty_like(previous)
+        current[0] = i
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    return float(previous[-1]) / len(ref)
+
+
+def rouge_l(reference: str, candidate: str) -> float:
+    """ROUGE-L F1: longest common word subsequence against a reference text."""
+    ref = normalize_words(reference)
+    cand = normalize_words(candidate)
+    if not ref or not cand:
+        return 0.0
+
+    previous = [0] * (len(cand) + 1)
+    for ref_word in ref:
+        current = [0]
+        for j, cand_word in enumerate(cand, start=1):
+            current.append(previous[j - 1] + 1 if ref_word == cand_word else max(previous[j], current[j - 1]))
+        previous = current
+
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision = lcs / len(cand)
+    recall = lcs / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
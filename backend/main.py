@@ -1,19 +1,26 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, UploadFile, File
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, Request, UploadFile, File, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlmodel import Session, select
 import asyncio
 import json
 import logging
+import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import os
 from dotenv import load_dotenv
 
-from app.database import create_db_and_tables, get_session
-from app.models import Meeting, MeetingCreate, MeetingResponse, Summary, Note
+from app.database import create_db_and_tables, get_session, engine
+from app.models import Meeting, MeetingCreate, MeetingResponse, Summary, Note, TranscriptionJob, TranscriptionJobResponse
 from app.websocket.connection_manager import ConnectionManager
 from app.services.transcription_service import TranscriptionService
+from app.services.audio_io import UploadTooLargeError, parse_size, spool_upload
+from app.services.model_registry import ModelRegistry
+from app.services.executors import get_executor_stats, shutdown_executors
+from app.services.job_queue import TranscriptionJobQueue
+from app.services.insight_scheduler import InsightScheduler
+from app.services.kb_ingest import directory_records, iter_lines, ndjson_records, sync_iter
 from app.services.ai_service import AIService
 from app.services.calendar_service import CalendarService
 from app.api import meetings, calendar, auth
@@ -48,18 +55,82 @@ app.include_router(auth.router, prefix="/api", tags=["auth"])
 
 # Initialize services
 connection_manager = ConnectionManager()
-transcription_service = TranscriptionService()
-ai_service = AIService()
+# Shared by both services so all models count against one memory budget
+model_registry = ModelRegistry(
+    memory_budget=parse_size(os.getenv("MODEL_MEMORY_BUDGET", "0")),
+    idle_seconds=float(os.getenv("MODEL_IDLE_SECONDS", "900"))
+)
+transcription_service = TranscriptionService(
+    model_size=os.getenv("WHISPER_MODEL_SIZE", "base"),
+    models=model_registry
+)
+ai_service = AIService(models=model_registry)
 calendar_service = CalendarService()
 
+# Upload spooling
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", "data/uploads")
+MAX_UPLOAD_SIZE = parse_size(os.getenv("MAX_UPLOAD_SIZE", "200MB"))
+
+# Directories the bulk ingestion endpoint may read from
+KB_INGEST_DIR = os.getenv("KB_INGEST_DIR", "data/ingest")
+
+# Background startup state of the model-backed services, reported by /health
+service_startup: Dict[str, Dict[str, Any]] = {
+    name: {"status": "pending", "load_seconds": None, "error": None}
+    for name in ("transcription", "ai")
+}
+startup_task: Optional[asyncio.Task] = None
+
+async def start_service(name: str, initialize) -> bool:
+    """Run a service's initialize(), recording its status and duration."""
+    state = service_startup[name]
+    state["status"] = "loading"
+    started = time.perf_counter()
+    try:
+        await initialize()
+        state["status"] = "ready"
+    except Exception as e:
+        logger.error(f"Error starting {name} service: {e}")
+        state["status"] = "failed"
+        state["error"] = str(e)
+    state["load_seconds"] = time.perf_counter() - started
+    return state["status"] == "ready"
+
+async def load_services():
+    """Initialize the services concurrently while the API is already serving."""
+    started = time.perf_counter()
+    transcription_ready, _ = await asyncio.gather(
+        start_service("transcription", transcription_service.initialize),
+        start_service("ai", ai_service.initialize)
+    )
+    # Uploads accepted in the meantime are stored as queued and picked up here
+    if transcription_ready:
+        await job_queue.start()
+    logger.info(f"Services loaded in {time.perf_counter() - started:.1f}s")
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database and services on startup."""
+    """Initialize the database and start loading services in the background."""
+    global startup_task
     create_db_and_tables()
-    await transcription_service.initialize()
-    await ai_service.initialize()
+    model_registry.start()
+    # Model and knowledge base loading must not hold up the meeting/calendar/auth routes
+    startup_task = asyncio.create_task(load_services())
     logger.info("Application startup complete")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background service tasks on shutdown."""
+    if startup_task and not startup_task.done():
+        startup_task.cancel()
+        await asyncio.gather(startup_task, return_exceptions=True)
+    await job_queue.stop()
+    await insight_scheduler.stop()
+    await transcription_service.shutdown()
+    await ai_service.shutdown()
+    await model_registry.stop()
+    shutdown_executors()
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -72,45 +143,90 @@ async def health_check():
         "status": "healthy",
         "timestamp": datetime.utcnow(),
         "services": {
-            "transcription": transcription_service.is_ready(),
-            "ai": ai_service.is_ready(),
+            "transcription": {
+                "ready": transcription_service.is_ready(),
+                **service_startup["transcription"],
+                "models": transcription_service.get_model_stats()
+            },
+            "ai": {
+                "ready": ai_service.is_ready(),
+                **service_startup["ai"],
+                "models": ai_service.get_model_stats()
+            },
             "database": True
         }
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics for the inference pipeline."""
+    return {
+        "timestamp": datetime.utcnow(),
+        "transcription": transcription_service.get_stats(),
+        "transcription_jobs": job_queue.get_stats(),
+        "ai": ai_service.get_stats(),
+        "models": model_registry.get_summary(),
+        "insights": insight_scheduler.get_stats(),
+        "executors": get_executor_stats()
+    }
+
 @app.websocket("/ws/meeting/{meeting_id}")
 async def websocket_meeting(websocket: WebSocket, meeting_id: str):
     """WebSocket endpoint for real-time meeting updates."""
     await connection_manager.connect(websocket, meeting_id)
     
+    async def handle_transcript(transcript_chunk: Dict[str, Any]):
+        if transcript_chunk.get("status") == "partial":
+            # Partial hypotheses are only shown live; they are not stored or analyzed
+            await connection_manager.broadcast_to_meeting(
+                meeting_id,
+                {
+                    "type": "transcript_partial",
+                    "data": transcript_chunk,
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+            )
+            return
+        
+        # Broadcast transcript to all connected clients
+        await connection_manager.broadcast_to_meeting(
+            meeting_id,
+            {
+                "type": "transcript",
+                "data": transcript_chunk,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+        
+        # Queue AI processing; chunks arriving while a run is pending are coalesced
+        insight_scheduler.trigger(meeting_id, transcript_chunk)
+    
+    transcription_service.open_session(meeting_id, on_transcript=handle_transcript)
+    # Each connection carries its own WebM/Opus stream
+    decoder = transcription_service.create_decoder()
+    
     try:
         while True:
             # Receive audio data from client
             data = await websocket.receive_bytes()
             
-            # Process audio for transcription
-            transcript_chunk = await transcription_service.process_audio_chunk(data)
-            
-            if transcript_chunk:
-                # Broadcast transcript to all connected clients
-                await connection_manager.broadcast_to_meeting(
-                    meeting_id,
-                    {
-                        "type": "transcript",
-                        "data": transcript_chunk,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                )
-                
-                # Trigger AI processing
-                asyncio.create_task(process_ai_insights(meeting_id, transcript_chunk))
+            # Decode into the meeting's transcription session
+            await transcription_service.process_audio_chunk(meeting_id, data, decoder)
                 
     except WebSocketDisconnect:
-        connection_manager.disconnect(websocket, meeting_id)
         logger.info(f"Client disconnected from meeting {meeting_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         await connection_manager.send_error(websocket, str(e))
+    finally:
+        connection_manager.disconnect(websocket, meeting_id)
+        # Flushes trailing speech after the last client; it still lands in the meeting transcript
+        await transcription_service.close_session(meeting_id)
+        # Nobody is left to receive insights for this meeting; a dropped socket
+        # may never send meeting-end, so its rolling summary is released here too
+        if connection_manager.get_connection_count(meeting_id) == 0:
+            insight_scheduler.cancel(meeting_id)
+            ai_service.discard_meeting_summary(meeting_id)
 
 @app.websocket("/ws/notes/{meeting_id}")
 async def websocket_notes(websocket: WebSocket, meeting_id: str):
@@ -140,15 +256,25 @@ async def websocket_notes(websocket: WebSocket, meeting_id: str):
     except Exception as e:
         logger.error(f"Notes WebSocket error: {e}")
 
-async def process_ai_insights(meeting_id: str, transcript_chunk: Dict[str, Any]):
-    """Process AI insights for transcript chunk."""
+async def process_ai_insights(meeting_id: str, transcript_chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """Process AI insights for transcript chunk.
+    
+    Returns the broadcast insights keyed by message type.
+    """
+    insights = {}
     try:
         # Get full transcript for context
         full_transcript = await get_meeting_transcript(meeting_id)
         
-        # Generate summary if enough content
-        if len(full_transcript.split()) > 50:  # Minimum words for summary
-            summary = await ai_service.generate_summary(full_transcript)
+        text = transcript_chunk.get("text", "")
+        if transcript_chunk.get("complete"):
+            # A whole transcript (upload): map-reduce over all of it
+            summary = await ai_service.generate_summary(text) if len(text.split()) > 50 else None
+        else:
+            # Fold the chunk into the meeting's rolling summary (None until enough content)
+            summary = await ai_service.update_meeting_summary(meeting_id, text)
+        if summary:
+            insights["summary"] = summary
             
             await connection_manager.broadcast_to_meeting(
                 meeting_id,
@@ -161,6 +287,7 @@ async def process_ai_insights(meeting_id: str, transcript_chunk: Dict[str, Any])
         
         # Sentiment analysis
         sentiment = await ai_service.analyze_sentiment(transcript_chunk.get("text", ""))
+        insights["sentiment"] = sentiment
         
         await connection_manager.broadcast_to_meeting(
             meeting_id,
@@ -171,10 +298,14 @@ async def process_ai_insights(meeting_id: str, transcript_chunk: Dict[str, Any])
             }
         )
         
-        # RAG-enhanced insights
-        rag_insights = await ai_service.get_rag_insights(full_transcript)
+        # RAG-enhanced insights (live meetings use their rolling summary, uploads the whole text)
+        if transcript_chunk.get("complete"):
+            rag_insights = await ai_service.get_rag_insights(full_transcript)
+        else:
+            rag_insights = await ai_service.get_rag_insights(full_transcript, meeting_id=meeting_id)
         
         if rag_insights:
+            insights["rag_insights"] = rag_insights
             await connection_manager.broadcast_to_meeting(
                 meeting_id,
                 {
@@ -186,6 +317,27 @@ async def process_ai_insights(meeting_id: str, transcript_chunk: Dict[str, Any])
             
     except Exception as e:
         logger.error(f"Error processing AI insights: {e}")
+    
+    return insights
+
+async def replay_ai_insights(meeting_id: str, insights: Dict[str, Any]):
+    """Re-broadcast previously computed insights (e.g. for a cached transcript)."""
+    for message_type, data in insights.items():
+        await connection_manager.broadcast_to_meeting(
+            meeting_id,
+            {
+                "type": message_type,
+                "data": data,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+
+# AI insights run at most once at a time per meeting, debounced
+insight_scheduler = InsightScheduler(
+    process_ai_insights,
+    debounce_ms=float(os.getenv("INSIGHT_DEBOUNCE_MS", "2000")),
+    max_wait_ms=float(os.getenv("INSIGHT_MAX_WAIT_MS", "10000"))
+)
 
 async def get_meeting_transcript(meeting_id: str) -> str:
     """Get full transcript for a meeting."""
@@ -220,40 +372,171 @@ async def save_meeting_notes(meeting_id: str, content: str):
     except Exception as e:
         logger.error(f"Error saving meeting notes: {e}")
 
-@app.post("/api/meetings/{meeting_id}/upload-audio")
-async def upload_audio(
-    meeting_id: str,
-    audio_file: UploadFile = File(...),
-    session: Session = Depends(get_session)
-):
-    """Upload and process audio file for transcription."""
+async def report_job_progress(job: TranscriptionJob):
+    """Push transcription job status to the meeting's clients."""
+    await connection_manager.broadcast_job_progress(TranscriptionJobResponse(**job.dict()))
+
+async def handle_completed_job(job: TranscriptionJob, result: Dict[str, Any]):
+    """Store a finished upload transcript and start AI processing."""
+    transcript = result["text"]
+    
+    with Session(engine) as session:
+        meeting = session.get(Meeting, job.meeting_id)
+        if meeting:
+            meeting.transcript = transcript
+            meeting.updated_at = datetime.utcnow()
+            session.commit()
+    
+    # A cached transcript already has its insights; otherwise compute and keep them
+    if result.get("insights"):
+        asyncio.create_task(replay_ai_insights(job.meeting_id, result["insights"]))
+    else:
+        asyncio.create_task(process_upload_insights(job.meeting_id, transcript, result.get("cache_key")))
+
+async def process_upload_insights(meeting_id: str, transcript: str, cache_key: Optional[str] = None):
+    """Run AI processing for an uploaded transcript and cache what was sent."""
     try:
-        # Save uploaded file temporarily
-        temp_path = f"/tmp/{audio_file.filename}"
-        with open(temp_path, "wb") as f:
-            content = await audio_file.read()
-            f.write(content)
+        insights = await insight_scheduler.trigger(meeting_id, {"text": transcript, "complete": True})
+    except asyncio.CancelledError:
+        return
+    await transcription_service.store_insights(cache_key, insights)
+
+async def handle_meeting_end(meeting_id: str):
+    """Stop live insights and write the final summary of an ended meeting."""
+    # Pending live insights are stale once the meeting is over
+    insight_scheduler.cancel(meeting_id)
+    asyncio.create_task(finalize_meeting_summary(meeting_id))
+
+async def finalize_meeting_summary(meeting_id: str):
+    """Summarize the complete meeting transcript and store it."""
+    try:
+        transcript = (await get_meeting_transcript(meeting_id)).strip()
+        with Session(engine) as session:
+            meeting = session.get(Meeting, meeting_id)
+            if meeting and not transcript:
+                transcript = meeting.transcript or ""
         
-        # Process with Whisper
-        transcript = await transcription_service.transcribe_file(temp_path)
+        ai_service.discard_meeting_summary(meeting_id)
+        if len(transcript.split()) <= 50:
+            return
         
-        # Clean up temp file
-        os.remove(temp_path)
+        summary = await ai_service.generate_summary(transcript)
         
-        # Save transcript to database
-        meeting = session.get(Meeting, meeting_id)
-        if meeting:
-            meeting.transcript = transcript
-            meeting.updated_at = datetime.utcnow()
+        with Session(engine) as session:
+            meeting = session.get(Meeting, meeting_id)
+            if meeting:
+                meeting.summary = summary["summary"]
+                meeting.transcript = meeting.transcript or transcript
+                meeting.updated_at = datetime.utcnow()
+            session.add(Summary(meeting_id=meeting_id, content=summary["summary"], summary_type="full"))
+            if summary["action_items"]:
+                session.add(Summary(
+                    meeting_id=meeting_id,
+                    content="\n".join(summary["action_items"]),
+                    summary_type="action_items"
+                ))
             session.commit()
         
-        # Trigger AI processing
-        asyncio.create_task(process_ai_insights(meeting_id, {"text": transcript}))
+        await connection_manager.broadcast_to_meeting(
+            meeting_id,
+            {
+                "type": "summary",
+                "data": summary,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+        logger.info(f"Stored final summary for meeting {meeting_id}")
+        
+    except Exception as e:
+        logger.error(f"Error generating final summary for meeting {meeting_id}: {e}")
+
+app.state.on_meeting_end = handle_meeting_end
+
+# Background transcription jobs for uploaded audio
+job_queue = TranscriptionJobQueue(
+    transcription_service,
+    on_progress=report_job_progress,
+    on_complete=handle_completed_job
+)
+
+@app.post("/api/meetings/{meeting_id}/upload-audio", status_code=status.HTTP_202_ACCEPTED)
+async def upload_audio(
+    meeting_id: str,
+    audio_file: UploadFile = File(...)
+):
+    """Upload audio and queue it for background transcription."""
+    try:
+        # Stream the upload to a unique spool file in fixed-size chunks
+        spool_path = await spool_upload(audio_file, UPLOAD_SPOOL_DIR, MAX_UPLOAD_SIZE)
         
-        return {"transcript": transcript, "message": "Audio processed successfully"}
+        # The job owns the spool file from here and removes it when done
+        job = await job_queue.submit(meeting_id, spool_path, audio_file.filename)
         
+        return {
+            "job_id": job.id,
+            "status": job.status,
+            "message": "Audio queued for transcription"
+        }
+        
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error queuing uploaded audio: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/jobs/{job_id}", response_model=TranscriptionJobResponse)
+async def get_transcription_job(job_id: str):
+    """Get the status and progress of a transcription job."""
+    job = job_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return TranscriptionJobResponse(**job.dict())
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_transcription_job_result(job_id: str):
+    """Get the transcript of a completed transcription job."""
+    job = job_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if job.status != "completed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is {job.status}")
+    
+    result = job_queue.get_result(job)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job result not found")
+    return result
+
+@app.post("/api/knowledge/ingest")
+async def ingest_knowledge(request: Request):
+    """Bulk-add documents to the knowledge base.
+    
+    Send NDJSON (``Content-Type: application/x-ndjson``), one
+    ``{"text": ..., "metadata": {...}}`` object per line, read as it
+    streams in; or JSON ``{"directory": "..."}`` naming a folder of
+    .txt/.md files under KB_INGEST_DIR.
+    """
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        # The ingestion thread pulls the body from the event loop as it needs it
+        records = ndjson_records(iter_lines(sync_iter(request.stream(), asyncio.get_event_loop())))
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected NDJSON or a JSON object")
+        root = os.path.realpath(KB_INGEST_DIR)
+        directory = os.path.realpath(os.path.join(root, str(body.get("directory", "")) if isinstance(body, dict) else ""))
+        if os.path.commonpath([root, directory]) != root or not os.path.isdir(directory):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Not a directory under {KB_INGEST_DIR}")
+        records = directory_records(directory)
+    
+    try:
+        return await ai_service.ingest_knowledge(records)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
-        logger.error(f"Error processing uploaded audio: {e}")
+        logger.error(f"Error ingesting knowledge: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+"""Export the summarization and sentiment models to int8 ONNX Runtime.
+
+Usage (from the backend directory):
+    python -m scripts.export_onnx --output data/onnx --arch avx2
+
+Each model is exported to ONNX, every graph (encoder and decoders for BART)
+is dynamically quantized to int8, and the result is written with its config
+and tokenizer to ``<output>/<model name>``, where ``AI_RUNTIME=onnx`` loads
+it from.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from app.services.ai_runtime import SENTIMENT_MODEL, SUMMARIZATION_MODEL, onnx_model_path
+
+
+def export_model(model_name: str, task: str, output_dir: str, arch: str, quantize: bool = True):
+    from optimum.onnxruntime import (
+        ORTModelForSeq2SeqLM,
+        ORTModelForSequenceClassification,
+        ORTQuantizer,
+    )
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    model_class = ORTModelForSeq2SeqLM if task == "summarization" else ORTModelForSequenceClassification
+    target = onnx_model_path(output_dir, model_name)
+    os.makedirs(target, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as export_dir:
+        print(f"Exporting {model_name} to ONNX...")
+        model = model_class.from_pretrained(model_name, export=True)
+        model.save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(target)
+
+        graphs = sorted(name for name in os.listdir(export_dir) if name.endswith(".onnx"))
+        if not quantize:
+            for name in os.listdir(export_dir):
+                shutil.copy(os.path.join(export_dir, name), target)
+            return target
+
+        config = getattr(AutoQuantizationConfig, arch)(is_static=False, per_channel=False)
+        for graph in graphs:
+            print(f"Quantizing {graph} ({arch}, dynamic int8)...")
+            quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=graph)
+            # An empty suffix keeps the file names the ORT model classes expect
+            quantizer.quantize(save_dir=target, quantization_config=config, file_suffix="")
+
+        for name in os.listdir(export_dir):
+            if name.endswith(".json") and not os.path.exists(os.path.join(target, name)):
+                shutil.copy(os.path.join(export_dir, name), target)
+
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=os.getenv("ONNX_MODEL_DIR", "data/onnx"))
+    parser.add_argument(
+        "--arch",
+        default="avx2",
+        choices=["avx2", "avx512", "avx512_vnni", "arm64"],
+        help="Instruction set the int8 kernels are tuned for"
+    )
+    parser.add_argument("--no-quantize", action="store_true", help="Keep fp32 ONNX weights")
+    parser.add_argument("--only", choices=["summarization", "sentiment"], help="Export a single model")
+    args = parser.parse_args()
+
+    models = {
+        "summarization": SUMMARIZATION_MODEL,
+        "sentiment": SENTIMENT_MODEL,
+    }
+    for task, model_name in models.items():
+        if args.only and args.only != task:
+            continue
+        pipeline_task = "summarization" if task == "summarization" else "sentiment-analysis"
+        path = export_model(model_name, pipeline_task, args.output, args.arch, quantize=not args.no_quantize)
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Bulk-ingest documents into the knowledge base.
+
+Usage (from the backend directory):
+    python -m scripts.ingest_kb docs/handbook
+    python -m scripts.ingest_kb exports/wiki.ndjson --batch-size 512 --workers 4
+    cat records.ndjson | python -m scripts.ingest_kb -
+
+A directory is ingested file by file (.txt and .md, with the relative path
+as ``source`` metadata); NDJSON input has one ``{"text", "metadata"}``
+object per line. Chunks already in the knowledge base are skipped, so an
+interrupted run can simply be started again. Progress goes to stderr and
+the final report to stdout. Running API workers see the new chunks once
+they restart; use ``POST /api/knowledge/ingest`` to add them live.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+from app.services.ai_runtime import load_embeddings
+from app.services.kb_ingest import KnowledgeIngestor, directory_records, ndjson_records
+from app.services.knowledge_store import KnowledgeStore
+from app.services.vector_index import IndexSettings
+
+KNOWLEDGE_BASE_PATH = "data/knowledge_base"
+
+
+def print_progress(report):
+    print(
+        f"batch {report['batches']}: {report['documents']} documents, {report['added']} chunks added, "
+        f"{report['duplicates']} duplicates, {report['chunks_per_second']:.1f} chunks/s",
+        file=sys.stderr
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Directory of text files, NDJSON file, or - for NDJSON on stdin")
+    parser.add_argument("--path", default=KNOWLEDGE_BASE_PATH, help="Knowledge base directory")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("KB_INGEST_BATCH_SIZE", "256")),
+                        help="Chunks per embedding batch and segment")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("KB_INGEST_WORKERS", "2")),
+                        help="Document-splitting processes (0 = split in this process)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    store = KnowledgeStore(
+        args.path,
+        load_embeddings(),
+        compact_segments=int(os.getenv("KB_COMPACT_SEGMENTS", "16")),
+        settings=IndexSettings.from_env()
+    )
+    store.open("Meeting assistant knowledge base initialized.", {"source": "system", "type": "init"})
+    ingestor = KnowledgeIngestor(store, batch_size=args.batch_size, workers=args.workers, progress=print_progress)
+
+    if args.source == "-":
+        report = ingestor.ingest(ndjson_records(sys.stdin))
+    elif os.path.isdir(args.source):
+        report = ingestor.ingest(directory_records(args.source))
+    else:
+        with open(args.source) as f:
+            report = ingestor.ingest(ndjson_records(f))
+
+    # The ingestor compacts at the threshold; fold any remaining segments too
+    if store.manifest["segments"]:
+        store.compact()
+    print(json.dumps({**report, "knowledge_base": store.get_stats()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Inspect or rebuild the knowledge base's FAISS index.
+
+Usage (from the backend directory):
+    python -m scripts.kb_index info
+    python -m scripts.kb_index rebuild --type ivfpq --nlist 4096 --pq-m 48
+    python -m scripts.kb_index rebuild --type hnsw --hnsw-m 32
+
+``rebuild`` folds the base and every segment into a new base whose index
+is built (and for IVF-PQ, trained) from the stored raw vectors; nothing is
+re-embedded. Settings not given on the command line come from the KB_*
+environment variables. Running API workers keep their loaded index until
+they restart; search parameters (``KB_IVF_NPROBE``, ``KB_HNSW_EF_SEARCH``)
+apply at load time and need no rebuild.
+"""
+import argparse
+import json
+import logging
+import os
+
+from app.services.knowledge_store import KnowledgeStore
+from app.services.vector_index import INDEX_TYPES, IndexSettings
+
+KNOWLEDGE_BASE_PATH = "data/knowledge_base"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("info", "rebuild"))
+    parser.add_argument("--path", default=KNOWLEDGE_BASE_PATH, help="Knowledge base directory")
+    parser.add_argument("--type", choices=INDEX_TYPES, help="Index type (default KB_INDEX_TYPE)")
+    parser.add_argument("--nlist", type=int, help="IVF lists (0 = about 4 * sqrt(vectors))")
+    parser.add_argument("--pq-m", type=int, help="PQ subquantizers per vector")
+    parser.add_argument("--pq-bits", type=int, help="Bits per PQ code")
+    parser.add_argument("--hnsw-m", type=int, help="HNSW neighbours per node")
+    parser.add_argument("--ef-construction", type=int, help="HNSW build beam width")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "info":
+        with open(os.path.join(args.path, "manifest.json")) as f:
+            print(json.dumps(json.load(f), indent=2))
+        return
+
+    settings = IndexSettings.from_env()
+    overrides = {
+        "index_type": args.type,
+        "nlist": args.nlist,
+        "pq_m": args.pq_m,
+        "pq_bits": args.pq_bits,
+        "hnsw_m": args.hnsw_m,
+        "ef_construction": args.ef_construction
+    }
+    settings = IndexSettings(**{**settings.to_dict(), **{k: v for k, v in overrides.items() if v is not None}})
+
+    store = KnowledgeStore(args.path, settings=settings)
+    if not store.rebuild():
+        raise SystemExit(f"Nothing to rebuild in {args.path}")
+    print(json.dumps({"manifest": store.manifest, "settings": settings.to_dict()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
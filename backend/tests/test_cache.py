@@ -0,0 +1,43 @@
+import asyncio
+
+from app.services.cache import DiskLRUCache, ResultCache
+
+
+def test_uncounted_lookups_are_recorded_once(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), 1024 * 1024)
+    cache.set("pcm", {"text": "hello"})
+    cache.set("file", {"key": "pcm"})
+
+    # A cold request probes two keys but is one miss
+    assert cache.get("other-file", count=False) is None
+    assert cache.get("other-pcm", count=False) is None
+    cache.record(False)
+
+    # An alias hit reads two entries but is one hit
+    assert cache.get("file", count=False) == {"key": "pcm"}
+    assert cache.get("pcm", count=False) == {"text": "hello"}
+    cache.record(True)
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_waiters_recompute_when_the_leader_is_cancelled():
+    cache = ResultCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "summary"
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(run()) == "summary"
+    assert len(calls) == 2
@@ -0,0 +1,56 @@
+import asyncio
+import json
+from datetime import datetime
+
+from app.models import TranscriptionJobResponse
+from app.websocket.connection_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.sent.append(json.loads(text))
+
+
+def test_job_progress_keeps_clients_connected():
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    job = TranscriptionJobResponse(
+        id="job-1",
+        meeting_id="meeting-1",
+        status="running",
+        progress=0.5,
+        attempts=1,
+        created_at=datetime(2024, 1, 1, 9, 0),
+        updated_at=datetime(2024, 1, 1, 9, 5)
+    )
+
+    async def run():
+        await manager.connect(websocket, "meeting-1")
+        await manager.broadcast_job_progress(job)
+
+    asyncio.run(run())
+
+    assert manager.get_connection_count("meeting-1") == 1
+    assert websocket.sent[0]["type"] == "job_progress"
+    assert websocket.sent[0]["data"]["created_at"] == "2024-01-01T09:00:00"
+
+
+def test_transcript_is_kept_after_last_client_disconnects():
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+
+    async def run():
+        await manager.connect(websocket, "meeting-1")
+        manager.disconnect(websocket, "meeting-1")
+        await manager.broadcast_to_meeting("meeting-1", {"type": "transcript", "data": {"text": "closing words"}})
+
+    asyncio.run(run())
+
+    assert manager.get_meeting_transcript("meeting-1").strip() == "closing words"
+    assert websocket.sent == []
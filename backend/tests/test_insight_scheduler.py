@@ -0,0 +1,54 @@
+import asyncio
+
+from app.services.insight_scheduler import InsightScheduler
+
+
+def run_scheduler(debounce_ms, max_wait_ms, gaps):
+    """Trigger one chunk per gap (seconds slept before it); returns the runs."""
+    runs = []
+
+    async def process(meeting_id, chunk):
+        runs.append(chunk["text"])
+        return {"text": chunk["text"]}
+
+    async def run():
+        scheduler = InsightScheduler(process, debounce_ms=debounce_ms, max_wait_ms=max_wait_ms)
+        futures = []
+        for number, gap in enumerate(gaps):
+            await asyncio.sleep(gap)
+            futures.append(scheduler.trigger("meeting-1", {"text": str(number)}))
+        await asyncio.gather(*futures)
+
+    asyncio.run(run())
+    return runs
+
+
+def test_each_chunk_restarts_the_debounce():
+    # Chunks 30 ms apart never leave a 50 ms quiet gap, so they share one run
+    assert run_scheduler(50, 10000, [0, 0.03, 0.03, 0.03]) == ["0 1 2 3"]
+
+
+def test_max_wait_bounds_a_busy_meeting():
+    runs = run_scheduler(50, 80, [0] + [0.03] * 5)
+    assert len(runs) == 2
+    assert " ".join(runs).split() == [str(number) for number in range(6)]
+
+
+def test_complete_transcript_is_not_coalesced_with_live_chunks():
+    runs = []
+
+    async def process(meeting_id, chunk):
+        runs.append((chunk["text"], bool(chunk.get("complete"))))
+        return {}
+
+    async def run():
+        scheduler = InsightScheduler(process, debounce_ms=20, max_wait_ms=1000)
+        await asyncio.gather(
+            scheduler.trigger("meeting-1", {"text": "live one"}),
+            scheduler.trigger("meeting-1", {"text": "whole upload", "complete": True}),
+            scheduler.trigger("meeting-1", {"text": "live two"}),
+            scheduler.trigger("meeting-1", {"text": "live three"})
+        )
+
+    asyncio.run(run())
+    assert runs == [("live one", False), ("whole upload", True), ("live two live three", False)]
@@ -0,0 +1,23 @@
+import numpy as np
+
+from app.services.audio_io import MappedAudio
+from app.services.long_form import find_silence_cuts
+from app.services.vad import VoiceActivityDetector
+
+
+def test_cuts_advance_past_leading_silence(tmp_path):
+    sample_rate = 16000
+    # 20 s of silence, then 20 s of noise; the target is far below the search span
+    samples = np.zeros(40 * sample_rate, dtype=np.float32)
+    samples[20 * sample_rate:] = np.random.default_rng(0).uniform(-0.5, 0.5, 20 * sample_rate)
+    mapped = np.memmap(tmp_path / "audio.f32", dtype=np.float32, mode="w+", shape=samples.shape)
+    mapped[:] = samples
+    audio = MappedAudio(mapped, sample_rate)
+
+    segments = find_silence_cuts(audio, VoiceActivityDetector(sample_rate), target_seconds=2.0, search_seconds=10.0)
+
+    assert segments[0][0] == 0
+    assert segments[-1][1] == len(audio)
+    for (start, end), (next_start, _) in zip(segments, segments[1:]):
+        assert end == next_start
+    assert all(end - start >= sample_rate for start, end in segments[:-1])
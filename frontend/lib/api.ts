@@ -130,6 +130,14 @@ export class APIService {
     })
   }
 
+  static async getTranscriptionJob(jobId: string): Promise<any> {
+    return this.request<any>(`/api/jobs/${jobId}`)
+  }
+
+  static async getTranscriptionJobResult(jobId: string): Promise<any> {
+    return this.request<any>(`/api/jobs/${jobId}/result`)
+  }
+
   // Calendar API
   static async getCalendarAuthUrl(): Promise<{ auth_url: string }> {
     return this.request<{ auth_url: string }>('/api/calendar/auth', {
@@ -1,5 +1,5 @@
 export interface WebSocketMessage {
-  type: 'transcript' | 'summary' | 'sentiment' | 'rag_insights' | 'error' | 'connection_status'
+  type: 'transcript' | 'transcript_partial' | 'summary' | 'sentiment' | 'rag_insights' | 'job_progress' | 'error' | 'connection_status'
   data: any
   timestamp: string
 }
@@ -9,6 +9,8 @@ export interface TranscriptMessage {
   speaker?: string
   confidence?: number
   language?: string
+  status?: 'partial' | 'final'
+  segment_id?: number
 }
 
 export interface SummaryMessage {
@@ -30,6 +32,15 @@ export interface RAGInsightsMessage {
   context_sources: any[]
 }
 
+export interface JobProgressMessage {
+  id: string
+  meeting_id: string
+  status: 'queued' | 'running' | 'completed' | 'failed'
+  progress: number
+  filename?: string
+  error?: string
+}
+
 export class WebSocketService {
   private ws: WebSocket | null = null
   private meetingId: string | null = null
@@ -40,9 +51,11 @@ export class WebSocketService {
 
   // Event handlers
   private onTranscriptHandler?: (data: TranscriptMessage) => void
+  private onPartialTranscriptHandler?: (data: TranscriptMessage) => void
   private onSummaryHandler?: (data: SummaryMessage) => void
   private onSentimentHandler?: (data: SentimentMessage) => void
   private onRAGInsightsHandler?: (data: RAGInsightsMessage) => void
+  private onJobProgressHandler?: (data: JobProgressMessage) => void
   private onErrorHandler?: (error: string) => void
   private onConnectionStatusHandler?: (status: string) => void
 
@@ -129,6 +142,9 @@ export class WebSocketService {
         case 'transcript':
           this.onTranscriptHandler?.(message.data)
           break
+        case 'transcript_partial':
+          this.onPartialTranscriptHandler?.(message.data)
+          break
         case 'summary':
           this.onSummaryHandler?.(message.data)
           break
@@ -138,6 +154,9 @@ export class WebSocketService {
         case 'rag_insights':
           this.onRAGInsightsHandler?.(message.data)
           break
+        case 'job_progress':
+          this.onJobProgressHandler?.(message.data)
+          break
         case 'error':
           this.onErrorHandler?.(message.data)
           break
@@ -201,6 +220,10 @@ export class WebSocketService {
     this.onTranscriptHandler = handler
   }
 
+  onPartialTranscript(handler: (data: TranscriptMessage) => void): void {
+    this.onPartialTranscriptHandler = handler
+  }
+
   onSummary(handler: (data: SummaryMessage) => void): void {
     this.onSummaryHandler = handler
   }
@@ -213,6 +236,10 @@ export class WebSocketService {
     this.onRAGInsightsHandler = handler
   }
 
+  onJobProgress(handler: (data: JobProgressMessage) => void): void {
+    this.onJobProgressHandler = handler
+  }
+
   onError(handler: (error: string) => void): void {
     this.onErrorHandler = handler
   }